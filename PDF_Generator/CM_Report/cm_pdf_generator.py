@@ -15,6 +15,8 @@ import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 from config import config
+from render_control import RenderCancelled, checkpoint, discard_partial_output
+from image_prep import prepare_image
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +37,8 @@ class CMReportPDFGenerator:
             spaceAfter=18,
         )
         self.header_image_path = Path(__file__).parent.parent / "resources" / "willowglen_letterhead.png"
+        # Cancellation token of the render in progress (checked on every page)
+        self.cancel_token = None
         self.section_header = ParagraphStyle(
             "CMSectionHeader",
             parent=self.styles["Heading2"],
@@ -122,6 +126,7 @@ class CMReportPDFGenerator:
         )
 
     def _create_header_canvas(self, canvas, doc):
+        checkpoint(self.cancel_token, f"page {doc.page}")
         try:
             if self.header_image_path.exists():
                 page_width, page_height = A4
@@ -185,8 +190,20 @@ class CMReportPDFGenerator:
         doc.addPageTemplates([template])
         return doc
 
-    def generate_pdf(self, report_data: dict, job_no: str, report_type: str = "CM") -> Path:
-        pdf_path = self.config.get_pdf_path(job_no, report_type)
+    def generate_pdf(self, report_data: dict, job_no: str, report_type: str = "CM", cancel_token=None,
+                     output_dir=None) -> Path:
+        pdf_path = self.config.get_pdf_path(job_no, report_type, output_dir)
+        self.cancel_token = cancel_token
+        try:
+            return self._render(report_data, job_no, pdf_path, cancel_token)
+        except RenderCancelled:
+            logger.info("[CM PDF] Render cancelled for job %s", job_no)
+            discard_partial_output(pdf_path)
+            raise
+        finally:
+            self.cancel_token = None
+
+    def _render(self, report_data: dict, job_no: str, pdf_path: str, cancel_token) -> Path:
         doc = self._build_document(pdf_path)
 
         story = []
@@ -200,15 +217,19 @@ class CMReportPDFGenerator:
         story.append(Spacer(1, 60))
         story.append(PageBreak())
 
+        checkpoint(cancel_token, "timeline section")
         story.extend(self._build_timeline_section(cm_form))
         story.append(PageBreak())
 
+        checkpoint(cancel_token, "issue section")
         story.extend(self._build_issue_section(cm_form, report_data.get("beforeIssueImages", [])))
         story.append(PageBreak())
 
+        checkpoint(cancel_token, "action section")
         story.extend(self._build_action_section(cm_form, report_data.get("afterActionImages", [])))
         story.append(PageBreak())
 
+        checkpoint(cancel_token, "material section")
         story.extend(
             self._build_material_section(
                 report_data.get("materialUsed", []),
@@ -218,6 +239,7 @@ class CMReportPDFGenerator:
         )
         story.append(PageBreak())
 
+        checkpoint(cancel_token, "status section")
         story.extend(self._build_status_section(cm_form))
         
         # Check if we have signature images for final report
@@ -233,6 +255,7 @@ class CMReportPDFGenerator:
             story.append(Spacer(1, 24))
             story.extend(self._build_signature_section(cm_form, signature_images))
 
+        checkpoint(cancel_token, "doc.build")
         doc.build(story)
         logger.info("[CM PDF] Generated CM report at %s", pdf_path)
         return Path(pdf_path)
@@ -759,7 +782,7 @@ class CMReportPDFGenerator:
             scale = min(max_width / width, max_height / height, 1)
             adjusted_width = width * scale
             adjusted_height = height * scale
-            return Image(str(image_path), width=adjusted_width, height=adjusted_height)
+            return Image(prepare_image(image_path, adjusted_width, adjusted_height), width=adjusted_width, height=adjusted_height)
         except Exception as exc:
             logger.warning("Unable to render CM image %s: %s", image_path, exc)
             return None
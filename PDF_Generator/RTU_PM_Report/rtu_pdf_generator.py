@@ -25,6 +25,8 @@ import sys
 from pathlib import Path as PathLib
 sys.path.append(str(PathLib(__file__).parent.parent))
 from config import config
+from render_control import RenderCancelled, checkpoint, discard_partial_output
+from image_prep import prepare_image
 
 logger = logging.getLogger(__name__)
 
@@ -113,9 +115,23 @@ class RTUPMPDFGenerator:
             textColor=colors.HexColor("#37474f"),
         )
         self.header_image_path = PathLib(__file__).parent.parent / "resources" / "willowglen_letterhead.png"
+        # Cancellation token of the render in progress (checked on every page)
+        self.cancel_token = None
 
-    def generate_pdf(self, report_data: dict, job_no: str, report_type: str = "RTU_PM") -> Path:
-        pdf_path = self.config.get_pdf_path(job_no, report_type)
+    def generate_pdf(self, report_data: dict, job_no: str, report_type: str = "RTU_PM", cancel_token=None,
+                     output_dir=None) -> Path:
+        pdf_path = self.config.get_pdf_path(job_no, report_type, output_dir)
+        self.cancel_token = cancel_token
+        try:
+            return self._render(report_data, job_no, pdf_path, cancel_token)
+        except RenderCancelled:
+            logger.info("[RTU PDF] Render cancelled for job %s", job_no)
+            discard_partial_output(pdf_path)
+            raise
+        finally:
+            self.cancel_token = None
+
+    def _render(self, report_data: dict, job_no: str, pdf_path: str, cancel_token) -> Path:
         doc = self._build_document(pdf_path)
 
         story = []
@@ -131,6 +147,7 @@ class RTUPMPDFGenerator:
         story.append(PageBreak())
 
         # Add all technical sections first
+        checkpoint(cancel_token, "main cabinet section")
         story.extend(
             self._build_main_cabinet_section(
                 report_data.get("pmMainRtuCabinet", []),
@@ -138,6 +155,7 @@ class RTUPMPDFGenerator:
             )
         )
 
+        checkpoint(cancel_token, "chamber section")
         story.extend(
             self._build_chamber_section(
                 report_data.get("pmChamberMagneticContact", []),
@@ -145,6 +163,7 @@ class RTUPMPDFGenerator:
             )
         )
 
+        checkpoint(cancel_token, "cooling section")
         story.extend(
             self._build_cooling_section(
                 report_data.get("pmRTUCabinetCooling", []),
@@ -152,6 +171,7 @@ class RTUPMPDFGenerator:
             )
         )
 
+        checkpoint(cancel_token, "DVR section")
         story.extend(
             self._build_dvr_section(
                 report_data.get("pmDVREquipment", []),
@@ -163,6 +183,7 @@ class RTUPMPDFGenerator:
         story.append(PageBreak())
         story.extend(self._build_final_summary_page(rtu_form, signature_images, has_signatures))
 
+        checkpoint(cancel_token, "doc.build")
         doc.build(story)
         logger.info("[RTU PDF] Generated RTU PM report at %s", pdf_path)
         return Path(pdf_path)
@@ -191,6 +212,7 @@ class RTUPMPDFGenerator:
         return doc
 
     def _create_header_canvas(self, canvas, doc):
+        checkpoint(self.cancel_token, f"page {doc.page}")
         try:
             if self.header_image_path.exists():
                 page_width, page_height = A4
@@ -715,7 +737,7 @@ class RTUPMPDFGenerator:
             scale = min(max_width / width, max_height / height, 1)
             adjusted_width = width * scale
             adjusted_height = height * scale
-            return Image(str(image_path), width=adjusted_width, height=adjusted_height)
+            return Image(prepare_image(image_path, adjusted_width, adjusted_height), width=adjusted_width, height=adjusted_height)
         except Exception as exc:
             logger.warning("Unable to render RTU image %s: %s", image_path, exc)
             return None
@@ -17,6 +17,8 @@ import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 from config import config
+from render_control import RenderCancelled, checkpoint, discard_partial_output
+from image_prep import prepare_image
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -31,7 +33,9 @@ class ServerPMPDFGenerator:
         
         # Set up header image path (use shared resources)
         self.header_image_path = os.path.join(os.path.dirname(__file__), '..', 'resources', 'willowglen_letterhead.png')
-        # Known Yes/No GUID fallbacks from API responses
+        # Reference tables of the render in progress (see reference_data.py), keyed by lower-cased ID
+        self.reference_data = {}
+        # Known Yes/No GUID fallbacks from API responses, used when no reference data was passed
         self.yes_no_guid_map = {
             'b1b20965-91d2-428f-8cc0-292fec170515': 'Yes',
             'd2a176eb-272f-43e1-85e0-23f8b60fcb92': 'No'
@@ -43,9 +47,12 @@ class ServerPMPDFGenerator:
             'rtuStatus': [],
             'sumpPitCCTV': []
         }
+        # Cancellation token of the render in progress (checked on every page)
+        self.cancel_token = None
         
     def _create_header_canvas(self, canvas, doc):
         """Draw header image on every page with white background and footer"""
+        checkpoint(self.cancel_token, f"page {doc.page}")
         try:
             if os.path.exists(self.header_image_path):
                 # Calculate image dimensions and position
@@ -198,8 +205,11 @@ class ServerPMPDFGenerator:
             logger.error(f"Error parsing JSON string: {str(e)}")
             return None
 
-    def generate_comprehensive_pdf(self, api_response, job_no, report_type="Server_PM"):
+    def generate_comprehensive_pdf(self, api_response, job_no, report_type="Server_PM", cancel_token=None,
+                                   output_dir=None):
         """Generate comprehensive PDF with each component on separate pages matching API response structure"""
+        pdf_path = None
+        self.cancel_token = cancel_token
         try:
             # Convert API response data to JSON format and back for consistency
             logger.info("Converting API response data to JSON format...")
@@ -217,7 +227,7 @@ class ServerPMPDFGenerator:
             logger.info("JSON conversion and parsing completed successfully")
             
             # Get PDF file path
-            pdf_path = self.config.get_pdf_path(job_no, report_type)
+            pdf_path = self.config.get_pdf_path(job_no, report_type, output_dir)
             
             # Create custom PDF document with header image on every page
             doc = self._create_custom_doc_template(pdf_path)
@@ -227,6 +237,8 @@ class ServerPMPDFGenerator:
             print ("******** API RESPONSE **************");
             print(processed_data);
             
+            self.reference_data = processed_data.get("referenceData") or {}
+            
             # Extract Willowlynx images if available
             self.willowlynx_images = processed_data.get("willowlynxImages", {
                 'processStatus': [],
@@ -281,22 +293,31 @@ class ServerPMPDFGenerator:
             ]
             
             for component_title, data_key, page_creator in components:
+                checkpoint(cancel_token, component_title)
                 component_data = processed_data.get(data_key, [])
                 if component_data or True:  # Always create pages even if no data
                     story.append(PageBreak())
                     story.extend(page_creator(component_title, component_data, processed_data))
             
             # Build PDF
+            checkpoint(cancel_token, "doc.build")
             doc.build(story)
             
             logger.info(f"PDF generated successfully: {pdf_path}")
             return str(pdf_path)
             
+        except RenderCancelled:
+            logger.info(f"[Server PM PDF] Render cancelled for job {job_no}")
+            discard_partial_output(pdf_path)
+            raise
         except Exception as e:
             import traceback
             logger.error(f"Error generating PDF: {str(e)}")
             logger.error(f"Traceback: {traceback.format_exc()}")
             return None
+        finally:
+            self.cancel_token = None
+            self.reference_data = {}
 
     def _create_first_page(self, report_data):
         """Create the first page with report information matching the screenshot layout"""
@@ -2368,7 +2389,7 @@ class ServerPMPDFGenerator:
         try:
             import os
             if os.path.exists(image_path):
-                img = Image(str(image_path), width=width, height=height)
+                img = Image(prepare_image(image_path, width, height), width=width, height=height)
                 img.hAlign = 'CENTER'
                 frame = Table([[img]], colWidths=[6*inch])
                 frame.setStyle(TableStyle([
@@ -2465,6 +2486,9 @@ class ServerPMPDFGenerator:
 
         status_id = self._get_value(source, 'yesNoStatusID', 'YesNoStatusID')
         if status_id:
+            label = self._reference_label('yes_no_statuses', status_id)
+            if label:
+                return label
             key = str(status_id).lower()
             if key in self.yes_no_guid_map:
                 return self.yes_no_guid_map[key]
@@ -2682,12 +2706,20 @@ class ServerPMPDFGenerator:
             return data
         return {}
 
+    def _reference_label(self, table, status_id):
+        """Look up an ID in a reference table passed with the report data"""
+        return self.reference_data.get(table, {}).get(str(status_id).strip().lower())
+
     def _get_status_label(self, status_id):
         """Get status label from status ID"""
         if not status_id:
             return ''
         
-        # Common status mappings (you may need to adjust based on your actual data)
+        label = self._reference_label('result_statuses', status_id) or self._reference_label('yes_no_statuses', status_id)
+        if label:
+            return label
+        
+        # Fallback when no reference data was loaded (you may need to adjust based on your actual data)
         status_mappings = {
             1: 'Pass',
             2: 'Fail',
@@ -0,0 +1,66 @@
+"""
+Concurrent data acquisition for a render.
+
+The fetches a report needs (API payload, signature images, Willowlynx
+images) are all keyed by report_id, so they are declared as a small
+dependency graph and every stage starts as soon as the stages it depends on
+have finished. The slowest chain sets the latency instead of the sum of all
+fetches, and each stage's own duration is recorded.
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Sequence
+
+
+class AcquisitionFailed(Exception):
+    """Raised by a stage whose data is required but could not be fetched"""
+
+
+class AcquisitionGraph:
+    """Named async stages with dependencies, run concurrently"""
+
+    def __init__(self):
+        self._stages = {}
+        self.timings: Dict[str, float] = {}
+
+    def add(self, name: str, fetch: Callable[..., Awaitable[Any]], depends_on: Sequence[str] = ()):
+        """
+        Add a stage.
+
+        Args:
+            name: Stage name, used for results and timings
+            fetch: Coroutine function called with the results of depends_on,
+                in that order
+            depends_on: Names of stages that must finish first
+        """
+        for dependency in depends_on:
+            if dependency not in self._stages:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{dependency}'")
+        self._stages[name] = (fetch, tuple(depends_on))
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Run every stage and return their results by name.
+        If any stage fails, the others are cancelled and the error propagates.
+        """
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def _run_stage(name, fetch, depends_on):
+            inputs = [await tasks[dependency] for dependency in depends_on]
+            started = time.monotonic()
+            try:
+                return await fetch(*inputs)
+            finally:
+                self.timings[name] = round(time.monotonic() - started, 3)
+
+        for name, (fetch, depends_on) in self._stages.items():
+            tasks[name] = asyncio.ensure_future(_run_stage(name, fetch, depends_on))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        return {name: task.result() for name, task in tasks.items()}
@@ -0,0 +1,236 @@
+"""
+Shared HTTP client for the ControlTower API.
+
+One aiohttp ClientSession (and one TCPConnector) lives for the whole
+service, so jobs reuse keep-alive connections instead of paying a TCP and
+TLS handshake per request. Connection reuse is counted through aiohttp's
+tracing hooks.
+
+TokenManager keeps the API's JWT: a single sign-in in flight at a time,
+proactive refresh ahead of expiresAt, and optional persistence on disk.
+"""
+import asyncio
+import json
+import logging
+import os
+import ssl
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+def create_ssl_context(verify: bool) -> ssl.SSLContext:
+    """Build the SSL context shared by every API connection"""
+    ssl_context = ssl.create_default_context()
+    if not verify:
+        # The API runs on localhost with a development certificate
+        ssl_context.check_hostname = False
+        ssl_context.verify_mode = ssl.CERT_NONE
+    return ssl_context
+
+
+class ApiHttpClient:
+    """Pooled aiohttp session with connection-reuse counters"""
+
+    def __init__(self, config):
+        self.config = config
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._counters = {
+            'requests': 0,
+            'connections_created': 0,
+            'connections_reused': 0,
+            'dns_cache_hits': 0,
+            'dns_cache_misses': 0,
+        }
+
+    async def start(self):
+        """Create the pooled session; must be called on the service event loop"""
+        connector = aiohttp.TCPConnector(
+            ssl=create_ssl_context(self.config.API_SSL_VERIFY),
+            limit=self.config.API_MAX_CONNECTIONS,
+            limit_per_host=self.config.API_MAX_CONNECTIONS_PER_HOST,
+            keepalive_timeout=self.config.API_KEEPALIVE_SECONDS,
+            use_dns_cache=True,
+            ttl_dns_cache=self.config.API_DNS_CACHE_SECONDS,
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.config.API_TIMEOUT),
+            trace_configs=[self._trace_config()],
+        )
+        logger.info(
+            f"[HTTP] Pooled API session ready (max {self.config.API_MAX_CONNECTIONS} connections, "
+            f"{self.config.API_MAX_CONNECTIONS_PER_HOST} per host, keep-alive {self.config.API_KEEPALIVE_SECONDS}s)"
+        )
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace_config = aiohttp.TraceConfig()
+
+        def counter(name):
+            async def _increment(session, context, params):
+                self._counters[name] += 1
+            return _increment
+
+        trace_config.on_request_start.append(counter('requests'))
+        trace_config.on_connection_create_end.append(counter('connections_created'))
+        trace_config.on_connection_reuseconn.append(counter('connections_reused'))
+        trace_config.on_dns_cache_hit.append(counter('dns_cache_hits'))
+        trace_config.on_dns_cache_miss.append(counter('dns_cache_misses'))
+        return trace_config
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of the connection-reuse counters"""
+        stats = dict(self._counters)
+        acquired = stats['connections_created'] + stats['connections_reused']
+        stats['reuse_ratio'] = round(stats['connections_reused'] / acquired, 3) if acquired else 0.0
+        return stats
+
+    async def close(self):
+        if self.session and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+
+def parse_expires_at(expires_at: Optional[str]) -> Optional[datetime]:
+    """Parse the API's expiresAt (ISO 8601, possibly with a trailing Z)"""
+    if not expires_at:
+        return None
+    parsed = datetime.fromisoformat(expires_at.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+class TokenManager:
+    """
+    Single-flight JWT holder.
+
+    Callers ask for a token with get_token(); if it is missing or within
+    refresh_margin_seconds of expiring, one sign-in is started and every
+    other caller awaits that same sign-in. A background refresher renews the
+    token ahead of expiry so jobs normally never wait for it.
+    """
+
+    def __init__(self, sign_in: Callable[[], Awaitable[Optional[Tuple[str, Optional[datetime]]]]],
+                 refresh_margin_seconds: float = 300, cache_path: Optional[str] = None):
+        self.sign_in = sign_in
+        self.refresh_margin = timedelta(seconds=max(0, refresh_margin_seconds))
+        self.cache_path = cache_path
+        self.token: Optional[str] = None
+        self.expires_at: Optional[datetime] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._refresher: Optional[asyncio.Task] = None
+        self.sign_ins = 0
+
+    def is_valid(self, margin: Optional[timedelta] = None) -> bool:
+        """True if there is a token that does not expire within margin"""
+        if not self.token:
+            return False
+        if self.expires_at is None:
+            return True
+        return datetime.now(timezone.utc) + (margin or timedelta(0)) < self.expires_at
+
+    async def get_token(self) -> Optional[str]:
+        """Current token, refreshing first if it is missing or about to expire"""
+        if self.is_valid(self.refresh_margin):
+            return self.token
+        if self.is_valid():
+            # Still usable: refresh in the background, don't make the caller wait
+            self._start_refresh()
+            return self.token
+        return await self.refresh()
+
+    async def refresh(self, stale_token: Optional[str] = None) -> Optional[str]:
+        """
+        Sign in again, joining a sign-in that is already in flight.
+
+        Args:
+            stale_token: Token the caller saw rejected; if another caller has
+                replaced it meanwhile the new token is returned without signing in
+        """
+        if stale_token is not None and self.token != stale_token and self.is_valid():
+            return self.token
+        return await asyncio.shield(self._start_refresh())
+
+    def _start_refresh(self) -> asyncio.Task:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.get_running_loop().create_task(self._sign_in())
+        return self._refresh_task
+
+    async def _sign_in(self) -> Optional[str]:
+        self.sign_ins += 1
+        result = await self.sign_in()
+        if not result:
+            return None
+        self.token, self.expires_at = result
+        self._save()
+        return self.token
+
+    def start_refresher(self):
+        """Renew the token refresh_margin ahead of expiry for as long as the service runs"""
+        self._refresher = asyncio.get_running_loop().create_task(self._run_refresher())
+
+    async def _run_refresher(self):
+        retry_delay = 30.0
+        failed = False
+        while True:
+            delay = 60.0
+            if self.expires_at is not None:
+                refresh_at = self.expires_at - self.refresh_margin
+                delay = max(1.0, (refresh_at - datetime.now(timezone.utc)).total_seconds())
+            if failed:
+                delay = max(delay, retry_delay)
+            await asyncio.sleep(delay)
+            if not self.is_valid(self.refresh_margin):
+                logger.info("[AUTH] Refreshing API token ahead of expiry")
+                try:
+                    failed = await self.refresh() is None
+                except Exception as e:
+                    failed = True
+                    logger.error(f"[AUTH] Proactive token refresh failed: {str(e)}")
+
+    def stop(self):
+        if self._refresher:
+            self._refresher.cancel()
+            self._refresher = None
+
+    def load(self) -> bool:
+        """Reuse a token persisted by a previous run if it is still valid"""
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return False
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            self.token = cached.get('token')
+            self.expires_at = parse_expires_at(cached.get('expiresAt'))
+        except (OSError, ValueError) as e:
+            logger.warning(f"[AUTH] Ignoring unreadable token cache {self.cache_path}: {str(e)}")
+            self.token, self.expires_at = None, None
+            return False
+        if self.is_valid(self.refresh_margin):
+            logger.info(f"[AUTH] Reusing cached API token (expires at {self.expires_at.isoformat() if self.expires_at else 'unknown'})")
+            return True
+        self.token, self.expires_at = None, None
+        return False
+
+    def _save(self):
+        if not self.cache_path:
+            return
+        try:
+            target = Path(self.cache_path)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = target.with_suffix(target.suffix + '.tmp')
+            # The token grants API access: keep the file private to the service account
+            fd = os.open(str(temp_path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'token': self.token,
+                    'expiresAt': self.expires_at.isoformat() if self.expires_at else None,
+                }, f)
+            os.replace(temp_path, target)
+        except OSError as e:
+            logger.warning(f"[AUTH] Could not persist API token to {self.cache_path}: {str(e)}")
@@ -3,7 +3,9 @@ PDF Generator Configuration
 All changeable values in one place
 """
 import os
+import socket
 from pathlib import Path
+from typing import Optional
 
 class Config:
     """Centralized configuration for PDF generation service"""
@@ -16,6 +18,23 @@ class Config:
     API_TIMEOUT = int(os.getenv('API_TIMEOUT', '60'))
     API_AUTH_EMAIL = os.getenv('API_AUTH_EMAIL', 'system@gmail.com')
     API_AUTH_PASSWORD = os.getenv('API_AUTH_PASSWORD', '12345')
+    # Certificate verification is off by default for the localhost development certificate
+    API_SSL_VERIFY = os.getenv('API_SSL_VERIFY', 'false').lower() == 'true'
+    # Pooled HTTP connections shared by every job
+    API_MAX_CONNECTIONS = int(os.getenv('API_MAX_CONNECTIONS', '20'))
+    API_MAX_CONNECTIONS_PER_HOST = int(os.getenv('API_MAX_CONNECTIONS_PER_HOST', '8'))
+    API_KEEPALIVE_SECONDS = float(os.getenv('API_KEEPALIVE_SECONDS', '60'))
+    API_DNS_CACHE_SECONDS = int(os.getenv('API_DNS_CACHE_SECONDS', '300'))
+    # The JWT is renewed this long before its expiresAt
+    API_TOKEN_REFRESH_MARGIN_SECONDS = int(os.getenv('API_TOKEN_REFRESH_MARGIN_SECONDS', '300'))
+    # Persist the JWT here so restarts skip sign-in while it is valid (empty disables)
+    API_TOKEN_CACHE_FILE = os.getenv('API_TOKEN_CACHE_FILE', '')
+    # Report payload cache: revalidated with ETag/Last-Modified when the API sends them
+    API_CACHE_ENABLED = os.getenv('API_CACHE_ENABLED', 'true').lower() == 'true'
+    API_CACHE_MAX_ENTRIES = int(os.getenv('API_CACHE_MAX_ENTRIES', '200'))
+    API_CACHE_MAX_MB = int(os.getenv('API_CACHE_MAX_MB', '64'))
+    # Reuse window for responses without validators
+    API_CACHE_TTL_SECONDS = float(os.getenv('API_CACHE_TTL_SECONDS', '10'))
     
     # ============================================
     # MQTT Configuration
@@ -26,6 +45,17 @@ class Config:
     MQTT_PASSWORD = os.getenv('MQTT_PASSWORD', None)
     MQTT_KEEPALIVE = int(os.getenv('MQTT_KEEPALIVE', '60'))
     
+    # ============================================
+    # MQTT Clustering (several service instances behind one broker)
+    # ============================================
+    # Uses MQTT 5 shared subscriptions ($share/<group>/...) so each request goes to one instance
+    MQTT_CLUSTER_MODE = os.getenv('MQTT_CLUSTER_MODE', 'false').lower() == 'true'
+    MQTT_SHARED_GROUP = os.getenv('MQTT_SHARED_GROUP', 'pdf-generator')
+    MQTT_CLIENT_ID = os.getenv('MQTT_CLIENT_ID') or f"pdf-generator-{socket.gethostname()}-{os.getpid()}"
+    # Jobs an instance may hold beyond its running ones before it leaves the group
+    MQTT_CLUSTER_MAX_BACKLOG = int(os.getenv('MQTT_CLUSTER_MAX_BACKLOG', '2'))
+    MQTT_CLUSTER_PAUSE_WHEN_FULL = os.getenv('MQTT_CLUSTER_PAUSE_WHEN_FULL', 'true').lower() == 'true'
+    
     # ============================================
     # MQTT Topics - Regular PDF Generation (while editing)
     # ============================================
@@ -48,6 +78,35 @@ class Config:
     DB_USERNAME = os.getenv('DB_USERNAME', 'opmadmin')
     DB_PASSWORD = os.getenv('DB_PASSWORD', 'Willowglen@12345')
     DB_DRIVER = os.getenv('DB_DRIVER', 'ODBC Driver 17 for SQL Server')
+    # Connection pool shared by every database query
+    DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', '1'))
+    DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', '5'))
+    DB_POOL_IDLE_TIMEOUT = int(os.getenv('DB_POOL_IDLE_TIMEOUT', '300'))
+    DB_POOL_CHECKOUT_TIMEOUT = int(os.getenv('DB_POOL_CHECKOUT_TIMEOUT', '30'))
+    # Threads running blocking pyodbc calls (defaults to DB_POOL_MAX_SIZE)
+    DB_EXECUTOR_WORKERS = int(os.getenv('DB_EXECUTOR_WORKERS', '0'))
+    # Server-side timeout for a single statement in seconds (0 = none)
+    DB_QUERY_TIMEOUT = int(os.getenv('DB_QUERY_TIMEOUT', '30'))
+    # Send the Server PM child-table queries as one batch instead of one query each
+    DB_BATCH_CHILD_QUERIES = os.getenv('DB_BATCH_CHILD_QUERIES', 'true').lower() == 'true'
+    # Reports per set-based query when loading many Server PM reports (max 2000)
+    DB_BULK_CHUNK_SIZE = int(os.getenv('DB_BULK_CHUNK_SIZE', '1000'))
+    # Image types, form types and status labels cached in memory and reloaded on this interval
+    REFERENCE_DATA_ENABLED = os.getenv('REFERENCE_DATA_ENABLED', 'true').lower() == 'true'
+    REFERENCE_DATA_TTL_SECONDS = int(os.getenv('REFERENCE_DATA_TTL_SECONDS', '3600'))
+    # Status lookup tables (ID, Name columns); unset = found by name (YesNoStatuses, ResultStatuses),
+    # and built-in status labels if there is no such table
+    REFERENCE_YES_NO_STATUS_TABLE = os.getenv('REFERENCE_YES_NO_STATUS_TABLE', '')
+    REFERENCE_RESULT_STATUS_TABLE = os.getenv('REFERENCE_RESULT_STATUS_TABLE', '')
+    # Where report data is read from: api, db (falls back to the API) or parity
+    # (render from the API, log differences with the database). Only Server PM supports db.
+    # db compares with the API, rendering from the API on any difference, until
+    # REPORT_DB_VERIFY_REPORTS reports in a row matched.
+    REPORT_DATA_SOURCE_SERVER_PM = os.getenv('REPORT_DATA_SOURCE_SERVER_PM', 'api')
+    REPORT_DATA_SOURCE_CM = os.getenv('REPORT_DATA_SOURCE_CM', 'api')
+    REPORT_DATA_SOURCE_RTU_PM = os.getenv('REPORT_DATA_SOURCE_RTU_PM', 'api')
+    REPORT_PARITY_MAX_DIFFERENCES = int(os.getenv('REPORT_PARITY_MAX_DIFFERENCES', '20'))
+    REPORT_DB_VERIFY_REPORTS = int(os.getenv('REPORT_DB_VERIFY_REPORTS', '20'))
     
     @property
     def DATABASE_CONFIG(self):
@@ -57,7 +116,15 @@ class Config:
             'database': self.DB_NAME,
             'username': self.DB_USERNAME,
             'password': self.DB_PASSWORD,
-            'driver': self.DB_DRIVER
+            'driver': self.DB_DRIVER,
+            'pool_min_size': self.DB_POOL_MIN_SIZE,
+            'pool_max_size': self.DB_POOL_MAX_SIZE,
+            'pool_idle_timeout': self.DB_POOL_IDLE_TIMEOUT,
+            'pool_checkout_timeout': self.DB_POOL_CHECKOUT_TIMEOUT,
+            'executor_workers': self.DB_EXECUTOR_WORKERS,
+            'query_timeout': self.DB_QUERY_TIMEOUT,
+            'batch_child_queries': self.DB_BATCH_CHILD_QUERIES,
+            'bulk_chunk_size': self.DB_BULK_CHUNK_SIZE,
         }
     
     # ============================================
@@ -87,7 +154,82 @@ class Config:
     # PDF Generation Settings
     # ============================================
     PDF_PAGE_SIZE = 'A4'
+    # Deadline for a whole job (data fetch + render), enforced by the watchdog
     PDF_TIMEOUT_SECONDS = int(os.getenv('PDF_TIMEOUT_SECONDS', '120'))
+    PDF_WATCHDOG_INTERVAL_SECONDS = float(os.getenv('PDF_WATCHDOG_INTERVAL_SECONDS', '5'))
+    # Render workers still busy this long after their job was abandoned are killed
+    PDF_WATCHDOG_KILL_GRACE_SECONDS = float(os.getenv('PDF_WATCHDOG_KILL_GRACE_SECONDS', '30'))
+    
+    # ============================================
+    # Image Preparation
+    # ============================================
+    # Uploaded photos are resampled to this resolution for the box they are drawn in
+    IMAGE_PREP_ENABLED = os.getenv('IMAGE_PREP_ENABLED', 'true').lower() == 'true'
+    IMAGE_PREP_DPI = int(os.getenv('IMAGE_PREP_DPI', '150'))
+    IMAGE_PREP_JPEG_QUALITY = int(os.getenv('IMAGE_PREP_JPEG_QUALITY', '80'))
+    
+    # ============================================
+    # Render Worker Pool
+    # ============================================
+    PDF_MAX_CONCURRENT_JOBS = int(os.getenv('PDF_MAX_CONCURRENT_JOBS', '2'))
+    PDF_QUEUE_MAX_SIZE = int(os.getenv('PDF_QUEUE_MAX_SIZE', '50'))
+    # A waiting job moves up one priority class per this many seconds
+    PDF_PRIORITY_AGING_SECONDS = int(os.getenv('PDF_PRIORITY_AGING_SECONDS', '30'))
+    # Edit-triggered (non-signature) renders wait this long for a newer request; 0 disables
+    PDF_DEBOUNCE_SECONDS = float(os.getenv('PDF_DEBOUNCE_SECONDS', '2'))
+    # Abort a running draft render when a newer request arrives after its data was fetched
+    PDF_PREEMPT_STALE_RENDERS = os.getenv('PDF_PREEMPT_STALE_RENDERS', 'true').lower() == 'true'
+    
+    # ============================================
+    # Render Backend
+    # ============================================
+    # 'thread' renders inside the service process, 'process' uses warm worker processes
+    PDF_RENDER_MODE = os.getenv('PDF_RENDER_MODE', 'thread')
+    PDF_RENDER_PROCESSES = int(os.getenv('PDF_RENDER_PROCESSES', '2'))
+    PDF_RENDER_MAX_JOBS_PER_WORKER = int(os.getenv('PDF_RENDER_MAX_JOBS_PER_WORKER', '50'))
+    PDF_RENDER_TIMEOUT_SECONDS = int(os.getenv('PDF_RENDER_TIMEOUT_SECONDS', '90'))
+    
+    # ============================================
+    # Restart / Reload
+    # ============================================
+    # Running jobs get this long to finish before a restart or reload interrupts them
+    PDF_DRAIN_GRACE_SECONDS = float(os.getenv('PDF_DRAIN_GRACE_SECONDS', '60'))
+    # Jobs left over by a drain are kept here and replayed on the next start
+    PDF_PENDING_JOBS_FILE = os.getenv('PDF_PENDING_JOBS_FILE', str(BASE_DIR / 'pending_jobs.json'))
+    
+    # ============================================
+    # Speculative Pre-rendering
+    # ============================================
+    # Render recently changed reports ahead of their request (see prerender.py)
+    PRERENDER_ENABLED = os.getenv('PRERENDER_ENABLED', 'false').lower() == 'true'
+    PRERENDER_POLL_INTERVAL_SECONDS = float(os.getenv('PRERENDER_POLL_INTERVAL_SECONDS', '30'))
+    PRERENDER_POLL_BATCH_SIZE = int(os.getenv('PRERENDER_POLL_BATCH_SIZE', '100'))
+    # On startup, reports changed this many minutes ago are picked up too
+    PRERENDER_LOOKBACK_MINUTES = int(os.getenv('PRERENDER_LOOKBACK_MINUTES', '60'))
+    # Share of one render worker pre-rendering may keep busy (0-1]
+    PRERENDER_MAX_CPU_FRACTION = float(os.getenv('PRERENDER_MAX_CPU_FRACTION', '0.25'))
+    # Topics rendered ahead of time; final reports are the ones users wait on
+    PRERENDER_TOPICS = [
+        topic.strip()
+        for topic in os.getenv(
+            'PRERENDER_TOPICS',
+            f"{TOPIC_SERVER_PM_SIGNATURE},{TOPIC_CM_SIGNATURE},{TOPIC_RTU_PM_SIGNATURE}",
+        ).split(',')
+        if topic.strip()
+    ]
+    PRERENDER_CACHE_DIR = os.getenv('PRERENDER_CACHE_DIR', str(BASE_DIR / 'prerender_cache'))
+    PRERENDER_CACHE_MAX_ENTRIES = int(os.getenv('PRERENDER_CACHE_MAX_ENTRIES', '100'))
+    
+    # ============================================
+    # Job Journal
+    # ============================================
+    PDF_JOURNAL_ENABLED = os.getenv('PDF_JOURNAL_ENABLED', 'true').lower() == 'true'
+    PDF_JOURNAL_PATH = os.getenv('PDF_JOURNAL_PATH', str(BASE_DIR / 'job_journal.db'))
+    # Journal writes are committed (and fsynced) together at most this often
+    PDF_JOURNAL_COMMIT_INTERVAL_MS = int(os.getenv('PDF_JOURNAL_COMMIT_INTERVAL_MS', '50'))
+    # A replayed job that has already been started this many times is failed instead
+    PDF_JOURNAL_MAX_ATTEMPTS = int(os.getenv('PDF_JOURNAL_MAX_ATTEMPTS', '3'))
+    PDF_JOURNAL_RETENTION_DAYS = int(os.getenv('PDF_JOURNAL_RETENTION_DAYS', '7'))
     
     # ============================================
     # Logging Configuration
@@ -99,13 +241,14 @@ class Config:
     # ============================================
     # Helper Methods
     # ============================================
-    def get_pdf_path(self, job_no: str, report_type: str) -> str:
+    def get_pdf_path(self, job_no: str, report_type: str, output_dir: Optional[str] = None) -> str:
         """
         Generate PDF file path.
         
         Args:
             job_no: Job number
             report_type: Type of report (CM, Server_PM, RTU_PM, CM_FinalReport, etc.)
+            output_dir: Directory to write to instead of PDF_OUTPUT_DIR
             
         Returns:
             Full path to PDF file
@@ -113,11 +256,12 @@ class Config:
         from datetime import datetime
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"{report_type}_Report_{job_no}_{timestamp}.pdf"
+        directory = Path(output_dir or self.PDF_OUTPUT_DIR)
         
         # Ensure output directory exists
-        Path(self.PDF_OUTPUT_DIR).mkdir(parents=True, exist_ok=True)
+        directory.mkdir(parents=True, exist_ok=True)
         
-        return str(Path(self.PDF_OUTPUT_DIR) / filename)
+        return str(directory / filename)
     
     def get_mqtt_topics(self, report_type: str, is_signature: bool = False):
         """
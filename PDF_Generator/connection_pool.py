@@ -0,0 +1,236 @@
+"""
+Thread-safe pool of pyodbc connections.
+
+Opening a connection to SQL Server (SQLEXPRESS in particular) costs far
+more than the image lookups and report queries it serves, so connections
+are kept open and handed out per query. Idle connections are health-checked
+on checkout and closed after sitting unused for idle_timeout seconds, down
+to min_size.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available within the checkout timeout"""
+
+
+class ConnectionPool:
+    """Bounded pool of DB-API connections with health checks and idle eviction"""
+
+    def __init__(self, connect: Callable[[], Any], min_size: int = 1, max_size: int = 5,
+                 idle_timeout: float = 300, checkout_timeout: float = 30,
+                 health_check_after: float = 10, health_check_query: str = "SELECT 1"):
+        """
+        Args:
+            connect: Opens a new connection
+            min_size: Connections kept open even when idle
+            max_size: Upper bound on open connections
+            idle_timeout: Idle connections beyond min_size are closed after this many seconds
+            checkout_timeout: How long acquire() waits for a free connection
+            health_check_after: Connections idle longer than this are pinged on checkout
+            health_check_query: Query used to ping a connection
+        """
+        self._connect = connect
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size, self.min_size)
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self.health_check_after = health_check_after
+        self.health_check_query = health_check_query
+        self._idle = deque()  # (connection, returned_at), most recently returned last
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._counters = {
+            'checkouts': 0,
+            'created': 0,
+            'closed': 0,
+            'health_check_failures': 0,
+            'evicted_idle': 0,
+            'waits': 0,
+            'timeouts': 0,
+        }
+        self._wait_seconds = 0.0
+
+    def prefill(self):
+        """Open connections up to min_size"""
+        opened = []
+        try:
+            while True:
+                with self._condition:
+                    if self._size + len(opened) >= self.min_size:
+                        break
+                    self._size += 1
+                try:
+                    opened.append(self._open())
+                except Exception:
+                    with self._condition:
+                        self._size -= 1
+                    raise
+        finally:
+            with self._condition:
+                now = time.monotonic()
+                self._idle.extend((connection, now) for connection in opened)
+                self._condition.notify_all()
+
+    def acquire(self, timeout: float = None):
+        """Check out a healthy connection, opening one if the pool has room"""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        waited_from = None
+        while True:
+            self.evict_idle()
+            with self._condition:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+                if self._idle:
+                    connection, returned_at = self._idle.pop()
+                elif self._size < self.max_size:
+                    self._size += 1
+                    connection, returned_at = None, None
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._counters['timeouts'] += 1
+                        raise PoolTimeoutError(
+                            f"No database connection available within {timeout}s "
+                            f"({self._size} open, max {self.max_size})"
+                        )
+                    if waited_from is None:
+                        waited_from = time.monotonic()
+                        self._counters['waits'] += 1
+                    self._condition.wait(remaining)
+                    continue
+
+            if connection is None:
+                try:
+                    connection = self._open()
+                except Exception:
+                    with self._condition:
+                        self._size -= 1
+                        self._condition.notify()
+                    raise
+            elif time.monotonic() - returned_at > self.health_check_after and not self._is_healthy(connection):
+                with self._condition:
+                    self._counters['health_check_failures'] += 1
+                logger.warning("[DB POOL] Discarding a connection that failed its health check")
+                self._discard(connection)
+                continue
+
+            with self._condition:
+                self._counters['checkouts'] += 1
+                if waited_from is not None:
+                    self._wait_seconds += time.monotonic() - waited_from
+            return connection
+
+    def release(self, connection, discard: bool = False):
+        """Return a connection; discarded connections are closed instead"""
+        if not discard:
+            try:
+                # End the implicit transaction pyodbc opens for every statement
+                connection.rollback()
+            except Exception:
+                discard = True
+        if discard or self._closed:
+            self._discard(connection)
+            return
+        with self._condition:
+            self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for the duration of a with block"""
+        connection = self.acquire()
+        try:
+            yield connection
+        except Exception:
+            # The connection may be in an unknown state; don't hand it out again
+            self.release(connection, discard=True)
+            raise
+        else:
+            self.release(connection)
+
+    def evict_idle(self):
+        """Close connections idle for longer than idle_timeout (keeping min_size)"""
+        with self._condition:
+            evicted = self._evict_idle_locked()
+        # Closing talks to the server, so it happens outside the lock
+        for connection in evicted:
+            self._close_quietly(connection)
+
+    def close(self):
+        """Close every idle connection; checked-out ones are closed on release"""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._condition.notify_all()
+        for connection, _ in idle:
+            self._discard(connection)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool metrics"""
+        with self._condition:
+            stats = dict(self._counters)
+            stats.update({
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                'max_size': self.max_size,
+                'avg_wait_ms': round(self._wait_seconds * 1000 / stats['waits'], 1) if stats['waits'] else 0.0,
+            })
+        return stats
+
+    def _evict_idle_locked(self) -> list:
+        """Take expired idle connections out of the pool; the caller closes them"""
+        now = time.monotonic()
+        evicted = []
+        # Oldest connections sit at the left end
+        while self._idle and self._size > self.min_size and now - self._idle[0][1] > self.idle_timeout:
+            connection, _ = self._idle.popleft()
+            self._size -= 1
+            self._counters['evicted_idle'] += 1
+            self._counters['closed'] += 1
+            evicted.append(connection)
+        if evicted:
+            self._condition.notify_all()
+        return evicted
+
+    def _open(self):
+        connection = self._connect()
+        with self._condition:
+            self._counters['created'] += 1
+        return connection
+
+    def _discard(self, connection):
+        self._close_quietly(connection)
+        with self._condition:
+            self._size -= 1
+            self._counters['closed'] += 1
+            self._condition.notify()
+
+    def _is_healthy(self, connection) -> bool:
+        try:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(self.health_check_query)
+                cursor.fetchall()
+            finally:
+                cursor.close()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_quietly(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
@@ -1,21 +1,312 @@
 import asyncio
 import logging
 import pyodbc
-from typing import Dict, List, Optional, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Sequence
 from datetime import datetime
 
+from connection_pool import ConnectionPool
+
 logger = logging.getLogger(__name__)
 
+# Child tables of a Server PM report, in report order: key -> (table, columns).
+# Every table hangs off PMReportFormServers through PMReportFormServerID.
+SERVER_PM_CHILD_TABLES = {
+    'server_health_data': ('PMServerHealths', 'ServerName, Result, Remarks'),
+    'hard_drive_health_data': ('PMServerHardDriveHealths', 'ServerName, HardDrive, Status, Remarks'),
+    'disk_usage_data': ('PMServerDiskUsages', 'ServerName, Disk, TotalSize, UsedSize, FreeSize, UsagePercentage, Status, Remarks'),
+    'cpu_ram_usage_data': ('PMServerCPUAndRAMUsages', 'ServerName, CPUUsage, RAMUsage, Remarks'),
+    'network_health_data': ('PMServerNetworkHealths', 'ServerName, NetworkInterface, Status, IPAddress, Remarks'),
+    'willowlynx_process_status_data': ('PMServerWillowlynxProcessStatuses', 'ProcessName, Status, Remarks'),
+    'willowlynx_network_status_data': ('PMServerWillowlynxNetworkStatuses', 'NetworkComponent, Status, Remarks'),
+    'willowlynx_rtu_status_data': ('PMServerWillowlynxRTUStatuses', 'RTUName, Status, Remarks'),
+    'willowlynx_historical_trend_data': ('PMServerWillowlynxHistoricalTrends', 'TrendName, Status, Remarks'),
+    'willowlynx_historical_report_data': ('PMServerWillowlynxHistoricalReports', 'ReportName, Status, Remarks'),
+    'willowlynx_cctv_camera_data': ('PMServerWillowlynxCCTVCameras', 'CameraName, Status, Remarks'),
+    'monthly_database_creation_data': ('PMServerMonthlyDatabaseCreations', 'DatabaseName, CreationDate, Status, Remarks'),
+    'database_backup_data': ('PMServerDatabaseBackups', 'DatabaseName, BackupDate, BackupSize, Status, Remarks'),
+    'time_sync_data': ('PMServerTimeSyncs', 'ServerName, TimeSyncStatus, LastSyncTime, Remarks'),
+    'hot_fixes_data': ('PMServerHotFixes', 'HotFixID, Description, InstallationDate, Status, Remarks'),
+    'auto_fail_over_data': ('PMServerFailOvers', 'ComponentName, FailOverStatus, LastTestDate, Remarks'),
+    'asa_firewall_data': ('PMServerASAFirewalls', 'FirewallName, Status, LastUpdateDate, Remarks'),
+    'software_patch_data': ('PMServerSoftwarePatchSummaries', 'PatchName, InstallationDate, Status, Remarks'),
+}
+
+# Per-report queries; each takes the PMReportFormServerID as its only
+# parameter, so they can be sent as one batch.
+SERVER_PM_CHILD_QUERIES = {
+    key: f"""
+        SELECT {columns}
+        FROM {table}
+        WHERE PMReportFormServerID = ?
+        ORDER BY ID
+    """
+    for key, (table, columns) in SERVER_PM_CHILD_TABLES.items()
+}
+
+# Set-based variant for many reports: the parent id comes first so rows can be
+# partitioned per report. {parents} is an IN-list or a subquery.
+SERVER_PM_CHILD_BULK_QUERY = """
+        SELECT PMReportFormServerID, {columns}
+        FROM {table}
+        WHERE PMReportFormServerID IN ({parents})
+        ORDER BY PMReportFormServerID, ID
+"""
+
+# Report form plus its PMReportFormServers row; {condition} selects the reports.
+# The two type names are joined in ({type_names}/{type_joins}) unless the
+# reference-data cache can resolve them from the type IDs.
+SERVER_PM_MAIN_QUERY = """
+            SELECT 
+                rf.ID as ReportFormID,
+                rf.JobNo,
+                rf.SystemNameWarehouseID,
+                rf.StationNameWarehouseID,
+                rf.CreatedDate,
+                rf.UpdatedDate,
+                sw_system.Name as SystemDescription,
+                sw_station.Name as StationName,
+                rf.ReportFormTypeID,
+                
+                -- PM Report Form Server data
+                pmrfs.ID as PMReportFormServerID,
+                pmrfs.PMReportFormTypeID,
+                pmrfs.ProjectNo,
+                pmrfs.Customer,
+                pmrfs.ReportTitle,
+                pmrfs.DateOfService,
+                
+                -- Sign Off Data
+                pmrfs.AttendedBy,
+                pmrfs.WitnessedBy,
+                pmrfs.StartDate,
+                pmrfs.CompletionDate,
+                pmrfs.ApprovedBy,
+                pmrfs.Remarks as SignOffRemarks{type_names}
+                
+            FROM ReportForms rf
+            LEFT JOIN PMReportFormServers pmrfs ON rf.ID = pmrfs.ReportFormID{type_joins}
+            LEFT JOIN SystemWarehouses sw_system ON rf.SystemNameWarehouseID = sw_system.ID
+            LEFT JOIN SystemWarehouses sw_station ON rf.StationNameWarehouseID = sw_station.ID
+            WHERE {condition}
+"""
+
+_SERVER_PM_TYPE_NAMES = """,
+                rft.Name as ReportFormTypeName,
+                pmrft.Name as PMReportFormTypeName"""
+_SERVER_PM_TYPE_JOINS = """
+            LEFT JOIN PMReportFormTypes pmrft ON pmrfs.PMReportFormTypeID = pmrft.ID
+            LEFT JOIN ReportFormTypes rft ON rf.ReportFormTypeID = rft.ID"""
+
+# Tables behind each collection of the Server PM API response, as the API
+# nests them: collection -> (header table, {DTO list: (detail table, column
+# referencing the header row)}). Header rows belong to a report through
+# PMReportFormServerID. Whole rows are read; the status names the API adds
+# next to each *StatusID come from the reference-data cache.
+SERVER_PM_SECTION_TABLES = {
+    'pmServerHealths': ('PMServerHealths', {
+        'details': ('PMServerHealthDetails', 'PMServerHealthID'),
+    }),
+    'pmServerHardDriveHealths': ('PMServerHardDriveHealths', {
+        'details': ('PMServerHardDriveHealthDetails', 'PMServerHardDriveHealthID'),
+    }),
+    'pmServerDiskUsageHealths': ('PMServerDiskUsageHealths', {
+        'details': ('PMServerDiskUsageHealthDetails', 'PMServerDiskUsageHealthID'),
+    }),
+    'pmServerCPUAndMemoryUsages': ('PMServerCPUAndMemoryUsages', {
+        'memoryUsageDetails': ('PMServerMemoryUsageDetails', 'PMServerCPUAndMemoryUsageID'),
+        'cpuUsageDetails': ('PMServerCPUUsageDetails', 'PMServerCPUAndMemoryUsageID'),
+    }),
+    'pmServerNetworkHealths': ('PMServerNetworkHealths', {}),
+    'pmServerWillowlynxProcessStatuses': ('PMServerWillowlynxProcessStatuses', {}),
+    'pmServerWillowlynxNetworkStatuses': ('PMServerWillowlynxNetworkStatuses', {}),
+    'pmServerWillowlynxRTUStatuses': ('PMServerWillowlynxRTUStatuses', {}),
+    'pmServerWillowlynxHistoricalTrends': ('PMServerWillowlynxHistoricalTrends', {}),
+    'pmServerWillowlynxHistoricalReports': ('PMServerWillowlynxHistoricalReports', {}),
+    'pmServerWillowlynxCCTVCameras': ('PMServerWillowlynxCCTVCameras', {}),
+    'pmServerMonthlyDatabaseCreations': ('PMServerMonthlyDatabaseCreations', {
+        'details': ('PMServerMonthlyDatabaseCreationDetails', 'PMServerMonthlyDatabaseCreationID'),
+    }),
+    'pmServerDatabaseBackups': ('PMServerDatabaseBackups', {
+        'mssqlDatabaseBackupDetails': ('PMServerMSSQLDatabaseBackupDetails', 'PMServerDatabaseBackupID'),
+        'scadaDataBackupDetails': ('PMServerSCADADataBackupDetails', 'PMServerDatabaseBackupID'),
+    }),
+    'pmServerTimeSyncs': ('PMServerTimeSyncs', {
+        'details': ('PMServerTimeSyncDetails', 'PMServerTimeSyncID'),
+    }),
+    'pmServerHotFixes': ('PMServerHotFixes', {
+        'details': ('PMServerHotFixesDetails', 'PMServerHotFixesID'),
+    }),
+    'pmServerFailOvers': ('PMServerFailOvers', {
+        'details': ('PMServerFailOverDetails', 'PMServerFailOverID'),
+    }),
+    'pmServerASAFirewalls': ('PMServerASAFirewalls', {}),
+    'pmServerSoftwarePatchSummaries': ('PMServerSoftwarePatchSummaries', {
+        'details': ('PMServerSoftwarePatchDetails', 'PMServerSoftwarePatchSummaryID'),
+    }),
+}
+
+# Both take the PMReportFormServerID as their only parameter
+SERVER_PM_SECTION_QUERY = """
+        SELECT *
+        FROM {table}
+        WHERE PMReportFormServerID = ?
+        ORDER BY ID
+"""
+SERVER_PM_SECTION_DETAIL_QUERY = """
+        SELECT *
+        FROM {detail_table}
+        WHERE {parent_column} IN (SELECT ID FROM {table} WHERE PMReportFormServerID = ?)
+        ORDER BY {parent_column}, ID
+"""
+
+# SQL Server accepts at most 2100 parameters per request
+MAX_BULK_CHUNK_SIZE = 2000
+
+
+
+class QueryHandle:
+    """Tracks the cursor of a query running on the DB executor so it can be cancelled"""
+    
+    def __init__(self):
+        self.cursor = None
+        self.cancelled = False
+        
+    def cancel(self):
+        self.cancelled = True
+        cursor = self.cursor
+        if cursor is not None:
+            try:
+                # Asks SQL Server to abort the statement; the worker then sees an error
+                cursor.cancel()
+            except Exception as e:
+                logger.warning(f"Could not cancel running query: {str(e)}")
+
+
+
+# Result modes for execute_query / execute_batch
+RESULT_DICTS = 'dicts'      # list of {column: value}, one dict per row
+RESULT_TUPLES = 'tuples'    # QueryResult: raw rows plus one shared column index
+RESULT_COLUMNS = 'columns'  # {column: [values]}, column-oriented
+RESULT_FRAME = 'frame'      # pandas DataFrame
+
+
+class QueryResult:
+    """
+    Rows as returned by the driver plus a single column-name -> position map.
+    Avoids building a dict per row; rows unpack like tuples.
+    """
+    
+    __slots__ = ('columns', 'index', 'rows')
+    
+    def __init__(self, columns: List[str], rows: List[Sequence], index: Optional[Dict[str, int]] = None):
+        self.columns = columns
+        self.index = index if index is not None else {name: position for position, name in enumerate(columns)}
+        self.rows = rows
+        
+    def __iter__(self) -> Iterator[Sequence]:
+        return iter(self.rows)
+        
+    def __len__(self) -> int:
+        return len(self.rows)
+        
+    def value(self, row: Sequence, column: str) -> Any:
+        return row[self.index[column]]
+        
+    def column(self, column: str) -> List[Any]:
+        position = self.index[column]
+        return [row[position] for row in self.rows]
+        
+    def as_dicts(self) -> List[Dict]:
+        return [dict(zip(self.columns, row)) for row in self.rows]
+
+
+def _column_names(cursor) -> List[str]:
+    return [column[0] for column in cursor.description]
+
+
+def _fetch_dicts(cursor) -> List[Dict]:
+    """Fetch the current result set as a list of dictionaries"""
+    columns = _column_names(cursor)
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def _fetch_tuples(cursor) -> QueryResult:
+    return QueryResult(_column_names(cursor), cursor.fetchall())
+
+
+def _fetch_columns(cursor) -> Dict[str, List]:
+    columns = _column_names(cursor)
+    rows = cursor.fetchall()
+    values = list(zip(*rows)) if rows else [()] * len(columns)
+    return {name: list(column_values) for name, column_values in zip(columns, values)}
+
+
+def _fetch_frame(cursor):
+    try:
+        import pandas as pd
+    except ImportError as e:
+        raise RuntimeError("The 'frame' result mode requires pandas") from e
+    columns = _column_names(cursor)
+    return pd.DataFrame.from_records([tuple(row) for row in cursor.fetchall()], columns=columns)
+
+
+_FETCHERS = {
+    RESULT_DICTS: _fetch_dicts,
+    RESULT_TUPLES: _fetch_tuples,
+    RESULT_COLUMNS: _fetch_columns,
+    RESULT_FRAME: _fetch_frame,
+}
+
+
+def _bulk_key(value: Any) -> str:
+    """Match key for ids and job numbers: GUIDs come back upper-case from the driver"""
+    return str(value).strip().lower()
+
+
+def _unique_keys(values: Sequence[Any]) -> List[Any]:
+    """values without repeats under _bulk_key, first occurrence kept as passed"""
+    unique = {}
+    for value in values:
+        unique.setdefault(_bulk_key(value), value)
+    return list(unique.values())
+
+
+def _fetcher(mode: str) -> Callable:
+    try:
+        return _FETCHERS[mode]
+    except KeyError:
+        raise ValueError(f"Unknown result mode '{mode}' (expected one of {', '.join(_FETCHERS)})") from None
+
+
 class DatabaseManager:
     """Database manager for Server PM Report data retrieval"""
     
     def __init__(self, db_config: Dict[str, Any]):
         self.db_config = db_config
-        self.connection = None
+        # Every query (including the image lookups in main.py) borrows from this pool
+        self.pool = ConnectionPool(
+            self._open_connection,
+            min_size=db_config.get('pool_min_size', 1),
+            max_size=db_config.get('pool_max_size', 5),
+            idle_timeout=db_config.get('pool_idle_timeout', 300),
+            checkout_timeout=db_config.get('pool_checkout_timeout', 30),
+        )
+        # pyodbc blocks, so all DB work runs on this bounded executor and never on the event loop
+        self.executor = ThreadPoolExecutor(
+            max_workers=db_config.get('executor_workers') or self.pool.max_size,
+            thread_name_prefix="db-query",
+        )
+        self.query_timeout = db_config.get('query_timeout', 0)
+        self.batch_child_queries = db_config.get('batch_child_queries', True)
+        # ReferenceDataCache set by the service; resolves type names instead of joining their tables
+        self.reference_data = None
+        self.bulk_chunk_size = min(MAX_BULK_CHUNK_SIZE, max(1, db_config.get('bulk_chunk_size', 1000)))
         
     def get_connection_string(self) -> str:
         """Build connection string from configuration"""
-        if self.db_config.get('trusted_connection'):
+        use_windows_auth = not (self.db_config.get('username') and self.db_config.get('password'))
+        if self.db_config.get('trusted_connection') or use_windows_auth:
             return (
                 f"DRIVER={{{self.db_config['driver']}}};"
                 f"SERVER={self.db_config['server']};"
@@ -33,322 +324,456 @@ class DatabaseManager:
                 f"TrustServerCertificate={'yes' if self.db_config.get('trust_server_certificate') else 'no'};"
             )
     
+    def _open_connection(self):
+        connection = pyodbc.connect(self.get_connection_string())
+        if self.query_timeout:
+            # Server-side statement timeout in seconds
+            connection.timeout = self.query_timeout
+        logger.info("Database connection established")
+        return connection
+        
+    async def run(self, func: Callable, *args):
+        """Run blocking DB code on the DB executor without blocking the event loop"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        
     async def connect(self):
-        """Establish database connection"""
+        """Open the pool's minimum number of connections"""
         try:
-            connection_string = self.get_connection_string()
-            self.connection = pyodbc.connect(connection_string)
-            logger.info("Database connection established")
+            await self.run(self.pool.prefill)
+            logger.info(f"Database connection pool ready ({self.pool.stats()})")
         except Exception as e:
             logger.error(f"Failed to connect to database: {str(e)}")
             raise
             
     async def disconnect(self):
-        """Close database connection"""
-        if self.connection:
-            self.connection.close()
-            self.connection = None
-            logger.info("Database connection closed")
+        """Close pooled database connections"""
+        self.close()
+        logger.info("Database connection pool closed")
+            
+    def connection(self):
+        """Borrow a pooled connection: ``with db_manager.connection() as connection:``"""
+        return self.pool.connection()
+        
+    def pool_stats(self) -> Dict[str, Any]:
+        return self.pool.stats()
+            
+    async def execute_query(self, query: str, params: tuple = None, mode: str = RESULT_DICTS):
+        """
+        Execute a query on the DB executor and return its result set.
+        Cancelling the awaiting task cancels the statement on the server.
+        
+        Args:
+            query: SQL statement
+            params: Statement parameters
+            mode: RESULT_DICTS (list of dictionaries), RESULT_TUPLES (QueryResult),
+                RESULT_COLUMNS (dict of column lists) or RESULT_FRAME (pandas DataFrame)
+        """
+        fetch = _fetcher(mode)
+        handle = QueryHandle()
+        try:
+            return await self.run(self._run_on_cursor, handle, fetch, query, params)
+        except asyncio.CancelledError:
+            handle.cancel()
+            raise
+            
+    async def execute_batch(self, queries: List[str], params: tuple = None, mode: str = RESULT_DICTS,
+                            setup: Sequence[str] = ()) -> List[Any]:
+        """
+        Send several SELECT statements as one batch (one round trip) and return
+        one result per statement, in order, shaped by mode as in execute_query.
+        params holds the parameters of every statement, concatenated.
+        setup statements (e.g. filling a temp table) run first and return no rows.
+        """
+        # NOCOUNT stops row-count messages from showing up as extra result sets
+        batch = "SET NOCOUNT ON;\n" + ";\n".join(statement.strip() for statement in [*setup, *queries])
+        fetch = _fetcher(mode)
+        handle = QueryHandle()
+        try:
+            return await self.run(self._run_on_cursor, handle, self._fetch_result_sets, batch, params, fetch, len(queries))
+        except asyncio.CancelledError:
+            handle.cancel()
+            raise
             
-    async def execute_query(self, query: str, params: tuple = None) -> List[Dict]:
-        """Execute a query and return results as list of dictionaries"""
-        if not self.connection:
-            await self.connect()
+    async def stream_query(self, query: str, params: tuple = None, chunk_size: int = 500) -> AsyncIterator[QueryResult]:
+        """
+        Execute a query and yield its rows in chunks of up to chunk_size
+        (fetchmany), each as a QueryResult sharing one column index.
+        The connection stays checked out until the iteration ends.
+        """
+        handle = QueryHandle()
+        connection = await self.run(self.pool.acquire)
+        cursor = None
+        pending = None
+        discard = False
+        
+        async def call(func, *args):
+            nonlocal pending
+            pending = self.executor.submit(func, *args)
+            return await asyncio.wrap_future(pending)
             
         try:
-            cursor = self.connection.cursor()
+            cursor = handle.cursor = await call(connection.cursor)
             if params:
-                cursor.execute(query, params)
+                await call(cursor.execute, query, params)
             else:
-                cursor.execute(query)
-                
-            # Get column names
-            columns = [column[0] for column in cursor.description]
+                await call(cursor.execute, query)
+            columns = _column_names(cursor)
+            index = {name: position for position, name in enumerate(columns)}
+            while True:
+                rows = await call(cursor.fetchmany, chunk_size)
+                if not rows:
+                    break
+                yield QueryResult(columns, rows, index)
+        except asyncio.CancelledError:
+            discard = True
+            handle.cancel()
+            raise
+        except Exception as e:
+            discard = True
+            logger.error(f"Database query error: {str(e)}")
+            raise
+        finally:
+            handle.cursor = None
             
-            # Fetch all rows and convert to dictionaries
-            rows = cursor.fetchall()
-            result = []
-            for row in rows:
-                row_dict = {}
-                for i, value in enumerate(row):
-                    row_dict[columns[i]] = value
-                result.append(row_dict)
+            def close(_=None):
+                if cursor is not None:
+                    try:
+                        cursor.close()
+                    except Exception:
+                        pass
+                self.pool.release(connection, discard=discard)
                 
-            cursor.close()
-            return result
+            # Never touch the cursor while a fetch may still be running on the executor
+            if pending is not None and not pending.done():
+                pending.add_done_callback(close)
+            else:
+                try:
+                    self.executor.submit(close)
+                except RuntimeError:
+                    close()
+            
+    def _run_on_cursor(self, handle: QueryHandle, fetch: Callable, query: str, params: tuple, *args):
+        """Execute query on a pooled connection and hand the cursor to fetch"""
+        try:
+            if handle.cancelled:
+                raise asyncio.CancelledError()
+            with self.connection() as connection:
+                cursor = handle.cursor = connection.cursor()
+                try:
+                    if params:
+                        cursor.execute(query, params)
+                    else:
+                        cursor.execute(query)
+                    return fetch(cursor, *args)
+                finally:
+                    handle.cursor = None
+                    cursor.close()
             
         except Exception as e:
-            logger.error(f"Database query error: {str(e)}")
+            if handle.cancelled:
+                logger.info("Database query cancelled")
+            else:
+                logger.error(f"Database query error: {str(e)}")
             raise
             
+    @staticmethod
+    def _fetch_result_sets(cursor, fetch: Callable, expected: int) -> List[Any]:
+        result_sets = []
+        while True:
+            if cursor.description is not None:
+                result_sets.append(fetch(cursor))
+            if not cursor.nextset():
+                break
+        if len(result_sets) != expected:
+            raise RuntimeError(f"Batch returned {len(result_sets)} result sets, expected {expected}")
+        return result_sets
+            
     async def get_server_pm_report_data(self, job_no: str) -> Optional[Dict]:
         """Retrieve complete Server PM report data for given job number"""
+        return await self._get_server_pm_report_data('rf.JobNo', job_no, f"Job No: {job_no}")
+        
+    async def get_server_pm_report_data_by_id(self, report_form_id: str) -> Optional[Dict]:
+        """Retrieve complete Server PM report data for given ReportForms.ID (the id used by the API)"""
+        return await self._get_server_pm_report_data('rf.ID', report_form_id, f"Report Form: {report_form_id}")
+        
+    async def get_server_pm_api_data_by_id(self, report_form_id: str) -> Optional[Dict]:
+        """
+        Report form row of a Server PM report plus its sections nested as the
+        API returns them: 'sections' maps each API collection name to header
+        rows, each carrying its detail rows under the DTO list names.
+        """
+        rows = self._with_type_names(
+            await self.execute_query(self._server_pm_main_query("rf.ID = ?"), (report_form_id,))
+        )
+        if not rows:
+            logger.warning(f"No report found for Report Form: {report_form_id}")
+            return None
+        report_data = rows[0]
+        if report_data.get('PMReportFormServerID'):
+            report_data['sections'] = await self.get_server_pm_sections(report_data['PMReportFormServerID'])
+        return report_data
+        
+    async def get_server_pm_sections(self, pm_report_form_server_id: Any) -> Dict[str, List[Dict]]:
+        """Header rows of every section with their detail rows attached, keyed by API collection"""
+        queries, targets = [], []
+        for collection, (table, detail_tables) in SERVER_PM_SECTION_TABLES.items():
+            queries.append(SERVER_PM_SECTION_QUERY.format(table=table))
+            targets.append((collection, None, None))
+            for detail_key, (detail_table, parent_column) in detail_tables.items():
+                queries.append(SERVER_PM_SECTION_DETAIL_QUERY.format(
+                    table=table, detail_table=detail_table, parent_column=parent_column
+                ))
+                targets.append((collection, detail_key, parent_column))
+                
+        if self.batch_child_queries:
+            results = await self.execute_batch(queries, (pm_report_form_server_id,) * len(queries))
+        else:
+            results = await asyncio.gather(*(
+                self.execute_query(query, (pm_report_form_server_id,)) for query in queries
+            ))
+            
+        # Header queries come before their detail queries
+        sections: Dict[str, List[Dict]] = {}
+        headers: Dict[str, Dict[str, Dict]] = {}
+        for (collection, detail_key, parent_column), rows in zip(targets, results):
+            if detail_key is None:
+                detail_keys = SERVER_PM_SECTION_TABLES[collection][1]
+                for row in rows:
+                    row.update({key: [] for key in detail_keys})
+                sections[collection] = rows
+                headers[collection] = {_bulk_key(row['ID']): row for row in rows}
+                continue
+            for row in rows:
+                header = headers[collection].get(_bulk_key(row[parent_column]))
+                if header is not None:
+                    header[detail_key].append(row)
+        return sections
+        
+    async def _get_server_pm_report_data(self, key_column: str, key: Any, description: str) -> Optional[Dict]:
         try:
-            logger.info(f"Fetching Server PM report data for Job No: {job_no}")
+            logger.info(f"Fetching Server PM report data for {description}")
             
-            # Main report form query
-            main_query = """
-            SELECT 
-                rf.ID as ReportFormID,
-                rf.JobNo,
-                rf.SystemNameWarehouseID,
-                rf.StationNameWarehouseID,
-                rf.CreatedDate,
-                rf.UpdatedDate,
-                sw_system.Name as SystemDescription,
-                sw_station.Name as StationName,
-                rft.Name as ReportFormTypeName,
-                
-                -- PM Report Form Server data
-                pmrfs.ID as PMReportFormServerID,
-                pmrfs.PMReportFormTypeID,
-                pmrft.Name as PMReportFormTypeName,
-                pmrfs.ProjectNo,
-                pmrfs.Customer,
-                pmrfs.ReportTitle,
-                pmrfs.DateOfService,
-                
-                -- Sign Off Data
-                pmrfs.AttendedBy,
-                pmrfs.WitnessedBy,
-                pmrfs.StartDate,
-                pmrfs.CompletionDate,
-                pmrfs.ApprovedBy,
-                pmrfs.Remarks as SignOffRemarks
-                
-            FROM ReportForms rf
-            LEFT JOIN PMReportFormServers pmrfs ON rf.ID = pmrfs.ReportFormID
-            LEFT JOIN PMReportFormTypes pmrft ON pmrfs.PMReportFormTypeID = pmrft.ID
-            LEFT JOIN ReportFormTypes rft ON rf.ReportFormTypeID = rft.ID
-            LEFT JOIN SystemWarehouses sw_system ON rf.SystemNameWarehouseID = sw_system.ID
-            LEFT JOIN SystemWarehouses sw_station ON rf.StationNameWarehouseID = sw_station.ID
-            WHERE rf.JobNo = ?
-            """
+            main_query = self._server_pm_main_query(f"{key_column} = ?")
             
-            main_data = await self.execute_query(main_query, (job_no,))
+            main_data = self._with_type_names(await self.execute_query(main_query, (key,)))
             
             if not main_data:
-                logger.warning(f"No report found for Job No: {job_no}")
+                logger.warning(f"No report found for {description}")
                 return None
                 
             report_data = main_data[0]
             pm_report_form_server_id = report_data.get('PMReportFormServerID')
             
             if not pm_report_form_server_id:
-                logger.warning(f"No PM Report Form Server data found for Job No: {job_no}")
+                logger.warning(f"No PM Report Form Server data found for {description}")
                 return report_data
                 
             # Fetch all related data
-            report_data.update({
-                'server_health_data': await self.get_server_health_data(pm_report_form_server_id),
-                'hard_drive_health_data': await self.get_hard_drive_health_data(pm_report_form_server_id),
-                'disk_usage_data': await self.get_disk_usage_data(pm_report_form_server_id),
-                'cpu_ram_usage_data': await self.get_cpu_ram_usage_data(pm_report_form_server_id),
-                'network_health_data': await self.get_network_health_data(pm_report_form_server_id),
-                'willowlynx_process_status_data': await self.get_willowlynx_process_status_data(pm_report_form_server_id),
-                'willowlynx_network_status_data': await self.get_willowlynx_network_status_data(pm_report_form_server_id),
-                'willowlynx_rtu_status_data': await self.get_willowlynx_rtu_status_data(pm_report_form_server_id),
-                'willowlynx_historical_trend_data': await self.get_willowlynx_historical_trend_data(pm_report_form_server_id),
-                'willowlynx_historical_report_data': await self.get_willowlynx_historical_report_data(pm_report_form_server_id),
-                'willowlynx_cctv_camera_data': await self.get_willowlynx_cctv_camera_data(pm_report_form_server_id),
-                'monthly_database_creation_data': await self.get_monthly_database_creation_data(pm_report_form_server_id),
-                'database_backup_data': await self.get_database_backup_data(pm_report_form_server_id),
-                'time_sync_data': await self.get_time_sync_data(pm_report_form_server_id),
-                'hot_fixes_data': await self.get_hot_fixes_data(pm_report_form_server_id),
-                'auto_fail_over_data': await self.get_auto_fail_over_data(pm_report_form_server_id),
-                'asa_firewall_data': await self.get_asa_firewall_data(pm_report_form_server_id),
-                'software_patch_data': await self.get_software_patch_data(pm_report_form_server_id)
-            })
+            report_data.update(await self.get_server_pm_child_data(pm_report_form_server_id))
             
-            logger.info(f"Successfully retrieved complete report data for Job No: {job_no}")
+            logger.info(f"Successfully retrieved complete report data for {description}")
             return report_data
             
         except Exception as e:
-            logger.error(f"Error retrieving report data for Job No {job_no}: {str(e)}")
+            logger.error(f"Error retrieving report data for {description}: {str(e)}")
             raise
             
+    def _resolves_type_names(self) -> bool:
+        cache = self.reference_data
+        return bool(cache and cache.is_loaded('report_form_types') and cache.is_loaded('pm_report_form_types'))
+        
+    def _server_pm_main_query(self, condition: str) -> str:
+        if self._resolves_type_names():
+            return SERVER_PM_MAIN_QUERY.format(condition=condition, type_names='', type_joins='')
+        return SERVER_PM_MAIN_QUERY.format(
+            condition=condition, type_names=_SERVER_PM_TYPE_NAMES, type_joins=_SERVER_PM_TYPE_JOINS
+        )
+        
+    def _with_type_names(self, rows: List[Dict]) -> List[Dict]:
+        """Fill in the type names the main query left to the reference-data cache"""
+        if rows and 'ReportFormTypeName' not in rows[0]:
+            for row in rows:
+                row['ReportFormTypeName'] = self.reference_data.label('report_form_types', row.get('ReportFormTypeID'))
+                row['PMReportFormTypeName'] = self.reference_data.label('pm_report_form_types', row.get('PMReportFormTypeID'))
+        return rows
+        
+    async def get_server_pm_child_data(self, pm_report_form_server_id: int) -> Dict[str, List[Dict]]:
+        """
+        Get every child table of a Server PM report, keyed like report_data.
+        By default all queries go out as one batch on one connection; with
+        batching disabled they run concurrently on pooled connections.
+        """
+        keys = list(SERVER_PM_CHILD_QUERIES)
+        if self.batch_child_queries:
+            params = (pm_report_form_server_id,) * len(keys)
+            results = await self.execute_batch([SERVER_PM_CHILD_QUERIES[key] for key in keys], params)
+        else:
+            results = await asyncio.gather(*(
+                self.execute_query(SERVER_PM_CHILD_QUERIES[key], (pm_report_form_server_id,))
+                for key in keys
+            ))
+        return dict(zip(keys, results))
+        
+    async def get_server_pm_report_data_bulk(self, job_nos: Sequence[str] = None,
+                                             pm_report_form_server_ids: Sequence[Any] = None) -> Dict[Any, Dict]:
+        """
+        Retrieve complete Server PM report data for many reports at once, keyed
+        by job number or PMReportFormServerID (whichever was passed, as the
+        caller passed it; matching ignores case and whitespace). Each value
+        has the shape returned by get_server_pm_report_data; keys with no report
+        are left out.
+        
+        Instead of 19 queries per report, every chunk of up to bulk_chunk_size
+        reports costs one main query plus one set-based query per child table,
+        with the child rows partitioned per report here.
+        """
+        if (job_nos is None) == (pm_report_form_server_ids is None):
+            raise ValueError("Pass either job_nos or pm_report_form_server_ids")
+        if job_nos is not None:
+            key_column, result_key, keys = 'rf.JobNo', 'JobNo', job_nos
+        else:
+            key_column, result_key, keys = 'pmrfs.ID', 'PMReportFormServerID', pm_report_form_server_ids
+        keys = _unique_keys(keys)
+        requested = {_bulk_key(key): key for key in keys}
+        
+        reports: Dict[Any, Dict] = {}
+        for start in range(0, len(keys), self.bulk_chunk_size):
+            chunk = keys[start:start + self.bulk_chunk_size]
+            main_query = self._server_pm_main_query(f"{key_column} IN ({', '.join('?' * len(chunk))})")
+            for row in self._with_type_names(await self.execute_query(main_query, tuple(chunk))):
+                # Like the single-report lookup, the first row wins for a duplicated job number
+                found = row[result_key]
+                reports.setdefault(requested.get(_bulk_key(found), found), row)
+                
+        server_ids = [row['PMReportFormServerID'] for row in reports.values() if row.get('PMReportFormServerID')]
+        children = await self.get_server_pm_child_data_bulk(server_ids)
+        for report_data in reports.values():
+            server_id = report_data.get('PMReportFormServerID')
+            if server_id:
+                report_data.update(children[server_id])
+                
+        missing = len(keys) - len(reports)
+        logger.info(
+            f"Retrieved {len(reports)} Server PM report(s) in bulk"
+            + (f", {missing} not found" if missing else "")
+        )
+        return reports
+        
+    async def get_server_pm_child_data_bulk(self, pm_report_form_server_ids: Sequence[Any]) -> Dict[Any, Dict[str, List[Dict]]]:
+        """
+        Get every child table for many Server PM reports with one query per table
+        (per chunk of ids), partitioned into {PMReportFormServerID: child data}.
+        Batched, the ids are sent once into a temp table that every table query joins.
+        """
+        ids = _unique_keys(pm_report_form_server_ids)
+        keys = list(SERVER_PM_CHILD_TABLES)
+        children = {server_id: {key: [] for key in keys} for server_id in ids}
+        by_parent = {_bulk_key(server_id): data for server_id, data in children.items()}
+        
+        for start in range(0, len(ids), self.bulk_chunk_size):
+            chunk = tuple(ids[start:start + self.bulk_chunk_size])
+            placeholders = ', '.join('?' * len(chunk))
+            if self.batch_child_queries:
+                # Copying PMReportFormServers.ID keeps the temp table's type in step with the schema
+                setup = [
+                    "DROP TABLE IF EXISTS #BulkServerIDs",
+                    f"SELECT ID INTO #BulkServerIDs FROM PMReportFormServers WHERE ID IN ({placeholders})",
+                ]
+                queries = [
+                    SERVER_PM_CHILD_BULK_QUERY.format(table=table, columns=columns, parents="SELECT ID FROM #BulkServerIDs")
+                    for table, columns in SERVER_PM_CHILD_TABLES.values()
+                ]
+                results = await self.execute_batch(queries, chunk, RESULT_TUPLES, setup=setup)
+            else:
+                results = await asyncio.gather(*(
+                    self.execute_query(
+                        SERVER_PM_CHILD_BULK_QUERY.format(table=table, columns=columns, parents=placeholders),
+                        chunk, RESULT_TUPLES,
+                    )
+                    for table, columns in SERVER_PM_CHILD_TABLES.values()
+                ))
+                
+            for key, result in zip(keys, results):
+                columns = result.columns[1:]
+                for row in result:
+                    parent = by_parent.get(_bulk_key(row[0]))
+                    if parent is not None:
+                        parent[key].append(dict(zip(columns, row[1:])))
+        return children
+        
     async def get_server_health_data(self, pm_report_form_server_id: int) -> List[Dict]:
         """Get server health check data"""
-        query = """
-        SELECT ServerName, Result, Remarks
-        FROM PMServerHealths
-        WHERE PMReportFormServerID = ?
-        ORDER BY ID
-        """
-        return await self.execute_query(query, (pm_report_form_server_id,))
+        return await self.execute_query(SERVER_PM_CHILD_QUERIES['server_health_data'], (pm_report_form_server_id,))
         
     async def get_hard_drive_health_data(self, pm_report_form_server_id: int) -> List[Dict]:
         """Get hard drive health check data"""
-        query = """
-        SELECT ServerName, HardDrive, Status, Remarks
-        FROM PMServerHardDriveHealths
-        WHERE PMReportFormServerID = ?
-        ORDER BY ID
-        """
-        return await self.execute_query(query, (pm_report_form_server_id,))
+        return await self.execute_query(SERVER_PM_CHILD_QUERIES['hard_drive_health_data'], (pm_report_form_server_id,))
         
     async def get_disk_usage_data(self, pm_report_form_server_id: int) -> List[Dict]:
         """Get disk usage data"""
-        query = """
-        SELECT ServerName, Disk, TotalSize, UsedSize, FreeSize, UsagePercentage, Status, Remarks
-        FROM PMServerDiskUsages
-        WHERE PMReportFormServerID = ?
-        ORDER BY ID
-        """
-        return await self.execute_query(query, (pm_report_form_server_id,))
+        return await self.execute_query(SERVER_PM_CHILD_QUERIES['disk_usage_data'], (pm_report_form_server_id,))
         
     async def get_cpu_ram_usage_data(self, pm_report_form_server_id: int) -> List[Dict]:
         """Get CPU and RAM usage data"""
-        query = """
-        SELECT ServerName, CPUUsage, RAMUsage, Remarks
-        FROM PMServerCPUAndRAMUsages
-        WHERE PMReportFormServerID = ?
-        ORDER BY ID
-        """
-        return await self.execute_query(query, (pm_report_form_server_id,))
+        return await self.execute_query(SERVER_PM_CHILD_QUERIES['cpu_ram_usage_data'], (pm_report_form_server_id,))
         
     async def get_network_health_data(self, pm_report_form_server_id: int) -> List[Dict]:
         """Get network health data"""
-        query = """
-        SELECT ServerName, NetworkInterface, Status, IPAddress, Remarks
-        FROM PMServerNetworkHealths
-        WHERE PMReportFormServerID = ?
-        ORDER BY ID
-        """
-        return await self.execute_query(query, (pm_report_form_server_id,))
+        return await self.execute_query(SERVER_PM_CHILD_QUERIES['network_health_data'], (pm_report_form_server_id,))
         
     async def get_willowlynx_process_status_data(self, pm_report_form_server_id: int) -> List[Dict]:
         """Get Willowlynx process status data"""
-        query = """
-        SELECT ProcessName, Status, Remarks
-        FROM PMServerWillowlynxProcessStatuses
-        WHERE PMReportFormServerID = ?
-        ORDER BY ID
-        """
-        return await self.execute_query(query, (pm_report_form_server_id,))
+        return await self.execute_query(SERVER_PM_CHILD_QUERIES['willowlynx_process_status_data'], (pm_report_form_server_id,))
         
     async def get_willowlynx_network_status_data(self, pm_report_form_server_id: int) -> List[Dict]:
         """Get Willowlynx network status data"""
-        query = """
-        SELECT NetworkComponent, Status, Remarks
-        FROM PMServerWillowlynxNetworkStatuses
-        WHERE PMReportFormServerID = ?
-        ORDER BY ID
-        """
-        return await self.execute_query(query, (pm_report_form_server_id,))
+        return await self.execute_query(SERVER_PM_CHILD_QUERIES['willowlynx_network_status_data'], (pm_report_form_server_id,))
         
     async def get_willowlynx_rtu_status_data(self, pm_report_form_server_id: int) -> List[Dict]:
         """Get Willowlynx RTU status data"""
-        query = """
-        SELECT RTUName, Status, Remarks
-        FROM PMServerWillowlynxRTUStatuses
-        WHERE PMReportFormServerID = ?
-        ORDER BY ID
-        """
-        return await self.execute_query(query, (pm_report_form_server_id,))
+        return await self.execute_query(SERVER_PM_CHILD_QUERIES['willowlynx_rtu_status_data'], (pm_report_form_server_id,))
         
     async def get_willowlynx_historical_trend_data(self, pm_report_form_server_id: int) -> List[Dict]:
         """Get Willowlynx historical trend data"""
-        query = """
-        SELECT TrendName, Status, Remarks
-        FROM PMServerWillowlynxHistoricalTrends
-        WHERE PMReportFormServerID = ?
-        ORDER BY ID
-        """
-        return await self.execute_query(query, (pm_report_form_server_id,))
+        return await self.execute_query(SERVER_PM_CHILD_QUERIES['willowlynx_historical_trend_data'], (pm_report_form_server_id,))
         
     async def get_willowlynx_historical_report_data(self, pm_report_form_server_id: int) -> List[Dict]:
         """Get Willowlynx historical report data"""
-        query = """
-        SELECT ReportName, Status, Remarks
-        FROM PMServerWillowlynxHistoricalReports
-        WHERE PMReportFormServerID = ?
-        ORDER BY ID
-        """
-        return await self.execute_query(query, (pm_report_form_server_id,))
+        return await self.execute_query(SERVER_PM_CHILD_QUERIES['willowlynx_historical_report_data'], (pm_report_form_server_id,))
         
     async def get_willowlynx_cctv_camera_data(self, pm_report_form_server_id: int) -> List[Dict]:
         """Get Willowlynx CCTV camera data"""
-        query = """
-        SELECT CameraName, Status, Remarks
-        FROM PMServerWillowlynxCCTVCameras
-        WHERE PMReportFormServerID = ?
-        ORDER BY ID
-        """
-        return await self.execute_query(query, (pm_report_form_server_id,))
+        return await self.execute_query(SERVER_PM_CHILD_QUERIES['willowlynx_cctv_camera_data'], (pm_report_form_server_id,))
         
     async def get_monthly_database_creation_data(self, pm_report_form_server_id: int) -> List[Dict]:
         """Get monthly database creation data"""
-        query = """
-        SELECT DatabaseName, CreationDate, Status, Remarks
-        FROM PMServerMonthlyDatabaseCreations
-        WHERE PMReportFormServerID = ?
-        ORDER BY ID
-        """
-        return await self.execute_query(query, (pm_report_form_server_id,))
+        return await self.execute_query(SERVER_PM_CHILD_QUERIES['monthly_database_creation_data'], (pm_report_form_server_id,))
         
     async def get_database_backup_data(self, pm_report_form_server_id: int) -> List[Dict]:
         """Get database backup data"""
-        query = """
-        SELECT DatabaseName, BackupDate, BackupSize, Status, Remarks
-        FROM PMServerDatabaseBackups
-        WHERE PMReportFormServerID = ?
-        ORDER BY ID
-        """
-        return await self.execute_query(query, (pm_report_form_server_id,))
+        return await self.execute_query(SERVER_PM_CHILD_QUERIES['database_backup_data'], (pm_report_form_server_id,))
         
     async def get_time_sync_data(self, pm_report_form_server_id: int) -> List[Dict]:
         """Get time sync data"""
-        query = """
-        SELECT ServerName, TimeSyncStatus, LastSyncTime, Remarks
-        FROM PMServerTimeSyncs
-        WHERE PMReportFormServerID = ?
-        ORDER BY ID
-        """
-        return await self.execute_query(query, (pm_report_form_server_id,))
+        return await self.execute_query(SERVER_PM_CHILD_QUERIES['time_sync_data'], (pm_report_form_server_id,))
         
     async def get_hot_fixes_data(self, pm_report_form_server_id: int) -> List[Dict]:
         """Get hot fixes data"""
-        query = """
-        SELECT HotFixID, Description, InstallationDate, Status, Remarks
-        FROM PMServerHotFixes
-        WHERE PMReportFormServerID = ?
-        ORDER BY ID
-        """
-        return await self.execute_query(query, (pm_report_form_server_id,))
+        return await self.execute_query(SERVER_PM_CHILD_QUERIES['hot_fixes_data'], (pm_report_form_server_id,))
         
     async def get_auto_fail_over_data(self, pm_report_form_server_id: int) -> List[Dict]:
         """Get auto fail over data"""
-        query = """
-        SELECT ComponentName, FailOverStatus, LastTestDate, Remarks
-        FROM PMServerFailOvers
-        WHERE PMReportFormServerID = ?
-        ORDER BY ID
-        """
-        return await self.execute_query(query, (pm_report_form_server_id,))
+        return await self.execute_query(SERVER_PM_CHILD_QUERIES['auto_fail_over_data'], (pm_report_form_server_id,))
         
     async def get_asa_firewall_data(self, pm_report_form_server_id: int) -> List[Dict]:
         """Get ASA firewall data"""
-        query = """
-        SELECT FirewallName, Status, LastUpdateDate, Remarks
-        FROM PMServerASAFirewalls
-        WHERE PMReportFormServerID = ?
-        ORDER BY ID
-        """
-        return await self.execute_query(query, (pm_report_form_server_id,))
+        return await self.execute_query(SERVER_PM_CHILD_QUERIES['asa_firewall_data'], (pm_report_form_server_id,))
         
     async def get_software_patch_data(self, pm_report_form_server_id: int) -> List[Dict]:
         """Get software patch data"""
-        query = """
-        SELECT PatchName, InstallationDate, Status, Remarks
-        FROM PMServerSoftwarePatchSummaries
-        WHERE PMReportFormServerID = ?
-        ORDER BY ID
-        """
-        return await self.execute_query(query, (pm_report_form_server_id,))
+        return await self.execute_query(SERVER_PM_CHILD_QUERIES['software_patch_data'], (pm_report_form_server_id,))
         
     def close(self):
-        """Close database connection"""
-        if self.connection:
-            self.connection.close()
-            self.connection = None
\ No newline at end of file
+        """Close database connections"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.pool.close()
\ No newline at end of file
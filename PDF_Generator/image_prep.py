@@ -0,0 +1,74 @@
+"""
+Image preparation before embedding.
+
+Uploaded photos are often several megapixels but are drawn a few inches
+wide, and ReportLab embeds whatever it is given. Each image is therefore
+resampled to the resolution its box needs (IMAGE_PREP_DPI) and re-encoded
+before it reaches a flowable. JPEGs are decoded at reduced scale with
+Pillow's draft mode, which skips most of the decode work for large photos.
+"""
+import io
+import logging
+import os
+from pathlib import Path
+from typing import Optional, Union
+
+from PIL import Image as PILImage
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+POINTS_PER_INCH = 72
+
+# Images at most this much larger than their box are embedded as they are;
+# re-encoding them would cost quality for little saving
+_MIN_REDUCTION = 0.8
+
+
+def prepare_image(image_path: Union[str, Path], width: float, height: float,
+                  dpi: Optional[int] = None, quality: Optional[int] = None) -> Union[str, io.BytesIO]:
+    """
+    Image source for a flowable drawn width x height points: an in-memory
+    copy resampled to dpi, or the original path when the image is already
+    small enough, preparation is disabled or the image cannot be read.
+    """
+    path = str(image_path)
+    if not config.IMAGE_PREP_ENABLED:
+        return path
+    dpi = dpi or config.IMAGE_PREP_DPI
+    quality = quality or config.IMAGE_PREP_JPEG_QUALITY
+    target_width = max(1, round(width / POINTS_PER_INCH * dpi))
+    target_height = max(1, round(height / POINTS_PER_INCH * dpi))
+
+    try:
+        with PILImage.open(path) as image:
+            original_size = image.size
+            # Keep the aspect ratio and enough pixels on both axes, even when the box stretches the image
+            scale = max(target_width / image.width, target_height / image.height)
+            if scale > _MIN_REDUCTION:
+                return path
+            size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+
+            if image.format == 'JPEG':
+                # Let the decoder scale by 1/2, 1/4 or 1/8 while it decodes (never below size)
+                image.draft(image.mode, size)
+            resized = image.resize(size, PILImage.Resampling.LANCZOS)
+
+        output = io.BytesIO()
+        if resized.mode in ('RGBA', 'LA') or (resized.mode == 'P' and 'transparency' in resized.info):
+            resized.save(output, format='PNG', optimize=True)
+        else:
+            if resized.mode not in ('RGB', 'L'):
+                resized = resized.convert('RGB')
+            resized.save(output, format='JPEG', quality=quality)
+        output.seek(0)
+    except Exception as e:
+        logger.warning(f"[IMAGE] Could not prepare {path}, embedding it unchanged: {str(e)}")
+        return path
+
+    logger.debug(
+        f"[IMAGE] {os.path.basename(path)}: {original_size[0]}x{original_size[1]} -> {size[0]}x{size[1]}, "
+        f"{os.path.getsize(path)} -> {output.getbuffer().nbytes} bytes"
+    )
+    return output
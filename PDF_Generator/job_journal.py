@@ -0,0 +1,207 @@
+"""
+Durable job journal.
+
+Every job's received, started and terminal transitions are appended to a
+local SQLite database (WAL mode, synchronous=FULL). Writes are handed to a
+single writer thread and committed in groups, so one fsync covers every
+event that arrived during the commit interval and callers on the event loop
+never block on disk. On startup the service replays the jobs whose last
+event is not terminal.
+"""
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+EVENT_RECEIVED = 'received'
+EVENT_STARTED = 'started'
+# Terminal events: the client has been sent a final status for the job
+EVENT_COMPLETED = 'completed'
+EVENT_FAILED = 'failed'
+EVENT_SUPERSEDED = 'superseded'
+EVENT_COALESCED = 'coalesced'
+
+TERMINAL_EVENTS = (EVENT_COMPLETED, EVENT_FAILED, EVENT_SUPERSEDED, EVENT_COALESCED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS job_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    event TEXT NOT NULL,
+    report_id TEXT,
+    topic_key TEXT,
+    detail TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_job_events_job_id ON job_events (job_id, id);
+"""
+
+
+class JobJournal:
+    """Append-only, group-committed journal of job state transitions"""
+
+    def __init__(self, path: str, commit_interval_ms: int = 50, max_batch_size: int = 500):
+        self.path = str(path)
+        self.commit_interval = max(0, commit_interval_ms) / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+        self._queue = queue.Queue()
+        self._thread = None
+        self._batches = 0
+        self._events = 0
+
+    def open(self):
+        """Create the database if needed and start the writer thread"""
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with self._session() as connection:
+            connection.executescript(_SCHEMA)
+        self._thread = threading.Thread(target=self._writer, name="job-journal", daemon=True)
+        self._thread.start()
+        logger.info(f"[JOURNAL] Job journal at {self.path} (commit interval: {self.commit_interval * 1000:.0f}ms)")
+
+    def record(self, job, event: str, detail: Optional[Dict[str, Any]] = None):
+        """Queue a transition for the next group commit (never blocks)"""
+        if event == EVENT_RECEIVED:
+            # The received event carries everything needed to rebuild the job
+            detail = dict(detail or {}, job=job.to_record())
+        row = (
+            job.job_id, event, job.report_id, job.topic_key,
+            json.dumps(detail) if detail else None,
+            datetime.now().isoformat(),
+        )
+        self._queue.put(row)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until everything recorded so far is on disk"""
+        if not self._thread or not self._thread.is_alive():
+            return False
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        """Commit outstanding events and stop the writer thread"""
+        if self._thread and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=10)
+        self._thread = None
+
+    def unfinished_jobs(self) -> List[Dict[str, Any]]:
+        """
+        Jobs whose last event is not terminal, oldest first.
+
+        Returns:
+            Job records (as produced by RenderJob.to_record) with an extra
+            'attempts' key counting how often the job was started
+        """
+        query = """
+            SELECT e.job_id, e.detail,
+                   (SELECT COUNT(*) FROM job_events s WHERE s.job_id = e.job_id AND s.event = ?) AS attempts
+            FROM job_events e
+            WHERE e.event = ?
+              AND NOT EXISTS (
+                  SELECT 1 FROM job_events t
+                  WHERE t.job_id = e.job_id AND t.event IN ({})
+              )
+            ORDER BY e.id
+        """.format(','.join('?' * len(TERMINAL_EVENTS)))
+        with self._session() as connection:
+            rows = connection.execute(query, (EVENT_STARTED, EVENT_RECEIVED) + TERMINAL_EVENTS).fetchall()
+
+        records = []
+        for job_id, detail, attempts in rows:
+            try:
+                record = json.loads(detail)['job']
+            except (TypeError, ValueError, KeyError):
+                logger.warning(f"[JOURNAL] Skipping job {job_id} with an unreadable received event")
+                continue
+            record['attempts'] = attempts
+            records.append(record)
+        return records
+
+    def compact(self, retention_days: int):
+        """Delete finished jobs older than retention_days"""
+        cutoff = (datetime.now() - timedelta(days=retention_days)).isoformat()
+        with self._session() as connection:
+            deleted = connection.execute(
+                """
+                DELETE FROM job_events WHERE job_id IN (
+                    SELECT job_id FROM job_events
+                    WHERE event IN ({}) AND created_at < ?
+                )
+                """.format(','.join('?' * len(TERMINAL_EVENTS))),
+                TERMINAL_EVENTS + (cutoff,),
+            ).rowcount
+        if deleted:
+            logger.info(f"[JOURNAL] Compacted {deleted} events of jobs finished before {cutoff}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'events': self._events,
+            'batches': self._batches,
+            'pending': self._queue.qsize(),
+        }
+
+    @contextmanager
+    def _session(self):
+        """Short-lived connection for reads and maintenance outside the writer thread"""
+        connection = self._connect()
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        # FULL makes every commit an fsync; batching keeps that to one per group
+        connection.execute("PRAGMA synchronous=FULL")
+        return connection
+
+    def _writer(self):
+        connection = self._connect()
+        try:
+            stopping = False
+            while not stopping:
+                item = self._queue.get()
+                rows, waiters = [], []
+                deadline = time.monotonic() + self.commit_interval
+                while True:
+                    if item is None:
+                        stopping = True
+                    elif isinstance(item, threading.Event):
+                        waiters.append(item)
+                    else:
+                        rows.append(item)
+                    if stopping or len(rows) >= self.max_batch_size:
+                        break
+                    remaining = deadline - time.monotonic()
+                    try:
+                        item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+
+                if rows:
+                    try:
+                        with connection:
+                            connection.executemany(
+                                "INSERT INTO job_events (job_id, event, report_id, topic_key, detail, created_at) "
+                                "VALUES (?, ?, ?, ?, ?, ?)",
+                                rows,
+                            )
+                        self._batches += 1
+                        self._events += len(rows)
+                    except sqlite3.Error as e:
+                        logger.error(f"[JOURNAL] Failed to write {len(rows)} events: {str(e)}")
+                for waiter in waiters:
+                    waiter.set()
+        finally:
+            connection.close()
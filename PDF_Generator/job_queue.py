@@ -0,0 +1,500 @@
+import asyncio
+import itertools
+import json
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from render_control import CancellationToken
+
+logger = logging.getLogger(__name__)
+
+# Lower value is served first
+PRIORITY_SIGNATURE = 0    # Final reports (CLOSE with signatures)
+PRIORITY_INTERACTIVE = 1  # Draft renders requested while editing
+PRIORITY_BACKGROUND = 2   # Bulk regeneration and other background work
+
+PRIORITY_NAMES = {
+    PRIORITY_SIGNATURE: 'signature',
+    PRIORITY_INTERACTIVE: 'interactive',
+    PRIORITY_BACKGROUND: 'background',
+}
+
+
+def classify_priority(topic_key: str, message_data: Dict[str, Any]) -> int:
+    """Pick the scheduling class for a request"""
+    if 'signature' in (topic_key or ''):
+        return PRIORITY_SIGNATURE
+    requested = str((message_data or {}).get('priority', '')).lower()
+    if requested in ('background', 'bulk', 'low'):
+        return PRIORITY_BACKGROUND
+    return PRIORITY_INTERACTIVE
+
+
+class QueueFullError(Exception):
+    """Raised when the render queue cannot admit another job"""
+
+
+class PoolDrainingError(QueueFullError):
+    """Raised when a job is submitted while the pool is draining"""
+
+
+class RenderJob:
+    """A single PDF generation request admitted to the render queue"""
+
+    def __init__(self, report_id: str, requested_by: str, timestamp: str,
+                 message_data: Dict[str, Any], topic_key: str, priority: Optional[int] = None):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.report_id = report_id
+        self.requested_by = requested_by
+        self.timestamp = timestamp
+        self.message_data = message_data
+        self.topic_key = topic_key
+        self.priority = classify_priority(topic_key, message_data) if priority is None else priority
+        self.received_at = time.monotonic()
+        self.enqueued_at = self.received_at
+        self.started_at = None
+        self.data_fetch_started_at = None
+        self.queue_position = None
+        self.cancel_token = CancellationToken()
+        self.superseded_by = None
+        # Deadline covering data acquisition and render, set when a worker starts the job
+        self.deadline = None
+        self.stage = 'received'
+        self.timed_out = False
+        # Stopped by a drain; the job is persisted and replayed, not reported as failed
+        self.interrupted = False
+        # Last status published for this job (not for its report; a replacement job shares the report)
+        self.last_status = None
+        self.task = None
+        # Times the job was started by this or a previous run (from the journal)
+        self.attempts = 0
+        # Seconds spent in each data-acquisition stage
+        self.fetch_timings = {}
+        # Everyone waiting on this render, including duplicates coalesced into it
+        self.requesters = [(requested_by, timestamp)]
+
+    @property
+    def key(self):
+        """Single-flight key: identical requests share one render"""
+        return (self.topic_key, self.report_id)
+
+    def attach(self, duplicate: "RenderJob"):
+        """Coalesce a duplicate request into this job"""
+        self.requesters.append((duplicate.requested_by, duplicate.timestamp))
+
+    def absorb(self, superseded: "RenderJob"):
+        """Take over the requesters of an older job this one replaces"""
+        self.requesters = superseded.requesters + self.requesters
+
+    def is_stale_for(self, newer: "RenderJob") -> bool:
+        """True if this job read its data before the newer request was made"""
+        return self.data_fetch_started_at is not None and newer.received_at > self.data_fetch_started_at
+
+    def preempt(self, replacement: "RenderJob"):
+        """Abort this job in favour of a newer request for the same report"""
+        self.superseded_by = replacement.job_id
+        replacement.absorb(self)
+        self.cancel_token.cancel("superseded")
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_token.is_cancelled()
+
+    def remaining_seconds(self) -> Optional[float]:
+        """Seconds left before the job's deadline, None if it has no deadline yet"""
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+    def is_overdue(self) -> bool:
+        remaining = self.remaining_seconds()
+        return remaining is not None and remaining <= 0
+
+    def elapsed_seconds(self) -> float:
+        """Seconds since a worker started the job"""
+        if self.started_at is None:
+            return 0.0
+        return time.monotonic() - self.started_at
+
+    def wait_seconds(self) -> float:
+        """Seconds the job spent (or has spent so far) waiting in the queue"""
+        end = self.started_at if self.started_at is not None else time.monotonic()
+        return end - self.enqueued_at
+
+    @property
+    def priority_name(self) -> str:
+        return PRIORITY_NAMES.get(self.priority, str(self.priority))
+
+    def to_record(self) -> Dict[str, Any]:
+        """Serializable form used to persist the job across restarts"""
+        return {
+            'job_id': self.job_id,
+            'report_id': self.report_id,
+            'requested_by': self.requested_by,
+            'timestamp': self.timestamp,
+            'message_data': self.message_data,
+            'topic_key': self.topic_key,
+            'priority': self.priority,
+            'requesters': [list(requester) for requester in self.requesters],
+        }
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "RenderJob":
+        job = cls(
+            record['report_id'], record.get('requested_by', 'Unknown'), record.get('timestamp'),
+            record.get('message_data') or {}, record['topic_key'], record.get('priority'),
+        )
+        job.job_id = record.get('job_id', job.job_id)
+        if record.get('requesters'):
+            job.requesters = [tuple(requester) for requester in record['requesters']]
+        job.attempts = record.get('attempts', 0)
+        return job
+
+    def __repr__(self):
+        return f"RenderJob({self.job_id}, {self.topic_key}/{self.report_id})"
+
+
+def save_pending_jobs(path: str, jobs: List[RenderJob]):
+    """Write jobs that were not rendered before a restart (atomic replace)"""
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = target.with_suffix(target.suffix + '.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump([job.to_record() for job in jobs], f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, target)
+
+
+def load_pending_jobs(path: str) -> List[RenderJob]:
+    """Read and remove the jobs persisted by the previous run, if any"""
+    target = Path(path)
+    if not target.exists():
+        return []
+    try:
+        with open(target, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+        return [RenderJob.from_record(record) for record in records]
+    except (OSError, ValueError, KeyError) as e:
+        logger.error(f"[QUEUE] Could not read pending jobs from {path}: {str(e)}")
+        return []
+    finally:
+        try:
+            target.unlink()
+        except OSError:
+            pass
+
+
+class PriorityJobQueue:
+    """
+    Bounded job queue ordered by priority class, with aging.
+
+    A job's effective priority improves by one class for every aging_seconds
+    it has waited, so background work cannot be starved by a steady stream
+    of signature and interactive requests. Ties are served in arrival order.
+    Not thread-safe: use from the owning event loop only.
+    """
+
+    def __init__(self, maxsize: int, aging_seconds: float):
+        self.maxsize = maxsize
+        self.aging_seconds = aging_seconds
+        self._jobs = []
+        self._sequence = itertools.count()
+        self._getters = deque()
+
+    def qsize(self) -> int:
+        return len(self._jobs)
+
+    def full(self) -> bool:
+        return len(self._jobs) >= self.maxsize
+
+    def put_nowait(self, job: RenderJob):
+        job.sequence = next(self._sequence)
+        self._jobs.append(job)
+        self._wakeup_next()
+
+    async def get(self) -> RenderJob:
+        while not self._jobs:
+            waiter = asyncio.get_running_loop().create_future()
+            self._getters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._getters:
+                    self._getters.remove(waiter)
+                elif self._jobs:
+                    # We were woken but will not consume, pass it on
+                    self._wakeup_next()
+                raise
+        job = min(self._jobs, key=self._sort_key(time.monotonic()))
+        self._jobs.remove(job)
+        return job
+
+    def evict_for(self, job: RenderJob) -> Optional[RenderJob]:
+        """
+        Make room for job in a full queue: remove and return the most recently
+        queued job of the lowest priority class, if that class is below job's
+        """
+        candidates = [waiting for waiting in self._jobs if waiting.priority > job.priority]
+        if not candidates:
+            return None
+        victim = max(candidates, key=lambda waiting: (waiting.priority, waiting.sequence))
+        self._jobs.remove(victim)
+        return victim
+
+    def drain_nowait(self) -> List[RenderJob]:
+        """Remove and return every waiting job in service order"""
+        jobs = sorted(self._jobs, key=self._sort_key(time.monotonic()))
+        self._jobs = []
+        return jobs
+
+    def position(self, job: RenderJob) -> Optional[int]:
+        """1-based position the job would be served in right now"""
+        if job not in self._jobs:
+            return None
+        ordered = sorted(self._jobs, key=self._sort_key(time.monotonic()))
+        return ordered.index(job) + 1
+
+    def effective_priority(self, job: RenderJob, now: float) -> float:
+        if self.aging_seconds <= 0:
+            return job.priority
+        return job.priority - (now - job.enqueued_at) / self.aging_seconds
+
+    def _sort_key(self, now: float):
+        return lambda job: (self.effective_priority(job, now), job.sequence)
+
+    def _wakeup_next(self):
+        while self._getters:
+            waiter = self._getters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+
+class RequestDebouncer:
+    """
+    Per-report debounce window for edit-triggered renders.
+
+    A request is held for window_seconds; if a newer request for the same
+    report arrives meanwhile, the held one is superseded and the window
+    restarts. Only the latest request in the window is released.
+    Not thread-safe: use from the owning event loop only.
+    """
+
+    def __init__(self, window_seconds: float,
+                 on_release: Callable[[RenderJob], None],
+                 on_superseded: Callable[[RenderJob, RenderJob], None]):
+        self.window_seconds = window_seconds
+        self.on_release = on_release
+        self.on_superseded = on_superseded
+        self._pending = {}
+
+    def offer(self, job: RenderJob):
+        """Hold a job, superseding any request already held for the same report"""
+        held = self._pending.pop(job.key, None)
+        if held:
+            previous, handle = held
+            handle.cancel()
+            job.absorb(previous)
+            self.on_superseded(previous, job)
+        handle = asyncio.get_running_loop().call_later(self.window_seconds, self._release, job.key)
+        self._pending[job.key] = (job, handle)
+
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def flush(self) -> List[RenderJob]:
+        """Drop the debounce windows and return the jobs that were being held"""
+        jobs = []
+        for job, handle in self._pending.values():
+            handle.cancel()
+            jobs.append(job)
+        self._pending = {}
+        return jobs
+
+    def _release(self, key):
+        held = self._pending.pop(key, None)
+        if held:
+            self.on_release(held[0])
+
+
+class RenderWorkerPool:
+    """
+    Bounded pool of worker tasks consuming a priority render queue.
+
+    The pool lives on the service-wide event loop; blocking work inside the
+    handler is expected to be pushed to an executor by the handler itself.
+    Callers on other threads (paho callbacks) must go through
+    call_threadsafe.
+    """
+
+    def __init__(self, handler: Callable[[RenderJob], Awaitable[None]],
+                 max_workers: int, max_queue_size: int, aging_seconds: float = 30,
+                 job_timeout: Optional[float] = None, name: str = "pdf-worker"):
+        self.handler = handler
+        self.max_workers = max(1, max_workers)
+        self.max_queue_size = max(1, max_queue_size)
+        self.aging_seconds = aging_seconds
+        self.job_timeout = job_timeout
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[PriorityJobQueue] = None
+        self._workers = []
+        self._running = set()
+        self._draining = False
+        self._active = 0
+        self._completed = 0
+        self._rejected = 0
+        self._evicted = 0
+
+    def start(self):
+        """Start the worker tasks on the running event loop"""
+        self._loop = asyncio.get_running_loop()
+        self._queue = PriorityJobQueue(self.max_queue_size, self.aging_seconds)
+        for index in range(self.max_workers):
+            task = self._loop.create_task(self._worker(f"{self.name}-{index + 1}"))
+            self._workers.append(task)
+        logger.info(f"[QUEUE] Started {self.max_workers} render workers (max queue size: {self.max_queue_size})")
+
+    def submit(self, job: RenderJob,
+               on_admitted: Optional[Callable[[RenderJob, int], None]] = None,
+               on_evicted: Optional[Callable[[RenderJob, RenderJob], None]] = None) -> int:
+        """
+        Admit a job to the queue. Must be called on the pool's event loop.
+        When the queue is full, a job of a higher priority class takes the
+        place of the most recently queued job of the lowest class below it.
+
+        Args:
+            job: Job to admit
+            on_admitted: Called with (job, position) before any worker can pick
+                the job up, so a "queued" status always precedes "processing"
+            on_evicted: Called with (evicted_job, job) when a waiting job is
+                dropped to make room
+
+        Returns:
+            1-based position of the job in the queue
+
+        Raises:
+            QueueFullError: If the queue is at capacity
+            PoolDrainingError: If the pool is draining
+        """
+        if self._draining:
+            raise PoolDrainingError("Render pool is draining")
+        if self._queue.full():
+            evicted = self._queue.evict_for(job)
+            if evicted is None:
+                self._rejected += 1
+                raise QueueFullError(
+                    f"Render queue is full ({self.max_queue_size} jobs waiting)"
+                )
+            self._evicted += 1
+            logger.warning(f"[QUEUE] Queue full, evicting {evicted} ({evicted.priority_name}) for {job} ({job.priority_name})")
+            if on_evicted:
+                on_evicted(evicted, job)
+        job.enqueued_at = time.monotonic()
+        self._queue.put_nowait(job)
+        position = self._queue.position(job)
+        job.queue_position = position
+        if on_admitted:
+            # Workers only run once we yield, so this still precedes "processing"
+            on_admitted(job, position)
+        logger.info(f"[QUEUE] Admitted {job} ({job.priority_name}) at position {position} (depth: {self.queue_depth()}, active: {self.active_count()})")
+        return position
+
+    def call_threadsafe(self, callback: Callable[..., Any], *args):
+        """Schedule callback(*args) on the pool's event loop from any thread"""
+        self._loop.call_soon_threadsafe(callback, *args)
+
+    def position(self, job: RenderJob) -> Optional[int]:
+        """Current 1-based queue position of a waiting job, None once it has started"""
+        return self._queue.position(job) if self._queue else None
+
+    def queue_depth(self) -> int:
+        """Number of jobs waiting for a worker"""
+        return self._queue.qsize() if self._queue else 0
+
+    def running_jobs(self):
+        """Jobs currently held by a worker"""
+        return list(self._running)
+
+    def active_count(self) -> int:
+        """Number of jobs currently being processed"""
+        return self._active
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of pool counters for status payloads and logging"""
+        return {
+            'workers': self.max_workers,
+            'active': self._active,
+            'queue_depth': self.queue_depth(),
+            'max_queue_size': self.max_queue_size,
+            'completed': self._completed,
+            'rejected': self._rejected,
+            'evicted': self._evicted,
+        }
+
+    @property
+    def draining(self) -> bool:
+        return self._draining
+
+    async def drain(self, grace_seconds: float) -> List[RenderJob]:
+        """
+        Stop admitting work and give running jobs grace_seconds to finish.
+
+        Returns:
+            Running jobs interrupted at the end of the grace period (they are the
+            oldest and were already started), followed by jobs that did not get
+            to run, in service order
+        """
+        self._draining = True
+        pending = self._queue.drain_nowait() if self._queue else []
+        running = [job.task for job in self._running if job.task]
+        logger.info(f"[DRAIN] Waiting up to {grace_seconds}s for {len(running)} running job(s); {len(pending)} queued job(s) set aside")
+        if running:
+            await asyncio.wait(running, timeout=grace_seconds)
+
+        interrupted = [job for job in self._running if job.task and not job.task.done()]
+        for job in interrupted:
+            logger.warning(f"[DRAIN] {job} did not finish within the grace period, interrupting during {job.stage}")
+            job.interrupted = True
+            job.cancel_token.cancel("interrupted")
+            job.task.cancel()
+        if interrupted:
+            await asyncio.wait([job.task for job in interrupted])
+        return interrupted + pending
+
+    async def stop(self):
+        """Cancel the worker tasks; jobs still queued are abandoned"""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _worker(self, worker_name: str):
+        while True:
+            job = await self._queue.get()
+            job.started_at = time.monotonic()
+            if self.job_timeout:
+                job.deadline = job.started_at + self.job_timeout
+            self._active += 1
+            self._running.add(job)
+            logger.info(f"[QUEUE] {worker_name} picked up {job} ({job.priority_name}) after {job.wait_seconds():.2f}s in queue")
+            # Run the job as its own task so a watchdog can cancel it without
+            # taking the worker down with it
+            job.task = self._loop.create_task(self.handler(job))
+            try:
+                await asyncio.wait({job.task})
+                if not job.task.cancelled() and job.task.exception() is not None:
+                    logger.error(f"[QUEUE] Unhandled error in {job}: {str(job.task.exception())}")
+            except asyncio.CancelledError:
+                job.task.cancel()
+                raise
+            finally:
+                self._running.discard(job)
+                self._active -= 1
+                self._completed += 1
@@ -1,17 +1,21 @@
 import asyncio
+import importlib
 import json
 import logging
 import os
+import shutil
 import sys
 import threading
+import time
 import urllib3
-from datetime import datetime, timezone
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import aiohttp
-import ssl
 
 import paho.mqtt.client as mqtt
+from paho.mqtt.packettypes import PacketTypes
+from paho.mqtt.properties import Properties
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
@@ -21,10 +25,29 @@ urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 # Import local modules
 from config import config
-from database_manager import DatabaseManager
-from Server_PM_Report.server_pm_pdf_generator import ServerPMPDFGenerator
-from CM_Report.cm_pdf_generator import CMReportPDFGenerator
-from RTU_PM_Report.rtu_pdf_generator import RTUPMPDFGenerator
+from database_manager import DatabaseManager, RESULT_TUPLES
+from api_client import ApiHttpClient, TokenManager, parse_expires_at
+from response_cache import ResponseCache
+from reference_data import ReferenceDataCache
+from prerender import PrerenderCache, PrerenderWatcher
+from report_sources import (
+    DATA_SOURCE_API, DATA_SOURCE_DB, DATA_SOURCE_PARITY,
+    parity_differences, resolve_data_source, server_pm_api_payload,
+)
+from acquisition import AcquisitionGraph, AcquisitionFailed
+from job_queue import (
+    RenderJob, RenderWorkerPool, RequestDebouncer, QueueFullError,
+    save_pending_jobs, load_pending_jobs,
+)
+from render_pool import (
+    create_render_backend, RenderTimeoutError,
+    REPORT_KIND_SERVER_PM, REPORT_KIND_CM, REPORT_KIND_RTU_PM,
+)
+from render_control import RenderCancelled
+from job_journal import (
+    JobJournal, EVENT_RECEIVED, EVENT_STARTED, EVENT_COMPLETED, EVENT_FAILED,
+    EVENT_SUPERSEDED, EVENT_COALESCED,
+)
 
 # Configure logging
 logging.basicConfig(
@@ -48,6 +71,25 @@ CM_SIGNATURE_REPORT_TOPIC = config.TOPIC_CM_SIGNATURE
 SERVER_SIGNATURE_REPORT_TOPIC = config.TOPIC_SERVER_PM_SIGNATURE
 RTU_SIGNATURE_REPORT_TOPIC = config.TOPIC_RTU_PM_SIGNATURE
 
+# ReportFormImageTypes.ImageTypeName values split out of the image manifest
+SIGNATURE_IMAGE_TYPES = ('ApprovedBySignature', 'AttendedBySignature')
+WILLOWLYNX_IMAGE_TYPES = {
+    'WillowlynxNetworkStatus': 'networkStatus',
+    'WillowlynxProcessStatusCheck': 'processStatus',
+    'WillowlynxRTUStatusCheck': 'rtuStatus',
+    'WillowlynxSumpPitCCTVCamera': 'sumpPitCCTV',
+}
+
+# Modules reloaded by an in-place reload, dependencies first: generators import
+# config and image_prep, and image_prep binds config when it is imported
+RELOADABLE_MODULES = (
+    'config',
+    'image_prep',
+    'Server_PM_Report.server_pm_pdf_generator',
+    'CM_Report.cm_pdf_generator',
+    'RTU_PM_Report.rtu_pdf_generator',
+)
+
 class ServerPMPDFService:
     """Main service class for Server PM Report PDF generation via MQTT"""
     
@@ -55,12 +97,35 @@ class ServerPMPDFService:
         self.config = config  # Use global config instance
         self.mqtt_client = None
         self.db_manager = None
-        self.pdf_generator = None
-        self.cm_pdf_generator = None
-        self.rtu_pdf_generator = None
+        self.reference_data = None  # Cached image types, form types and status tables
+        self.db_parity_streaks = {}  # base_topic -> consecutive reports whose database payload matched the API
+        self.prerender_cache = None  # Speculatively rendered PDFs, see prerender.py
+        self.prerender_watcher = None
+        self.renderer = None  # Thread or process render backend
         self.session = None
-        self.jwt_token = None  # Store JWT token for API authentication
-        self.token_expires_at = None  # Track token expiration
+        self.api_client = None  # Pooled aiohttp session shared by every API call
+        self.response_cache = None  # Conditional-fetch cache of report payloads
+        if self.config.API_CACHE_ENABLED:
+            self.response_cache = ResponseCache(
+                max_entries=self.config.API_CACHE_MAX_ENTRIES,
+                max_bytes=self.config.API_CACHE_MAX_MB * 1024 * 1024,
+                ttl_seconds=self.config.API_CACHE_TTL_SECONDS,
+            )
+        # Single-flight JWT for API authentication, refreshed ahead of expiry
+        self.token_manager = TokenManager(
+            self._sign_in,
+            refresh_margin_seconds=self.config.API_TOKEN_REFRESH_MARGIN_SECONDS,
+            cache_path=self.config.API_TOKEN_CACHE_FILE or None,
+        )
+        self.loop = None  # Service-wide event loop, owned by start_service
+        self.worker_pool = None  # Bounded render worker pool
+        self.inflight_jobs = {}  # (topic_key, report_id) -> queued or running RenderJob
+        self.debouncer = None  # Per-report debounce for edit-triggered renders
+        self.watchdog_task = None  # Enforces per-job deadlines
+        self.draining = False  # True while a restart/reload is draining the pool
+        self.drain_backlog = []  # Requests that arrived while draining
+        self.journal = None  # Durable record of job transitions, replayed on startup
+        self.intake_paused = False  # Clustered mode: shared subscriptions dropped while at capacity
         self.setup_http_session()
         
     def setup_http_session(self):
@@ -75,8 +140,12 @@ class ServerPMPDFService:
         self.session.mount("http://", adapter)
         self.session.mount("https://", adapter)
         
-    async def authenticate_api(self):
-        """Authenticate with the API and get JWT token"""
+    async def authenticate_api(self) -> bool:
+        """Authenticate with the API, joining a sign-in already in flight"""
+        return await self.token_manager.refresh() is not None
+
+    async def _sign_in(self):
+        """Sign in against the API; returns (token, expires_at) or None"""
         try:
             logger.info("")
             logger.info("[AUTH] Authenticating with API...")
@@ -87,64 +156,55 @@ class ServerPMPDFService:
                 "password": self.config.API_AUTH_PASSWORD
             }
             
-            # Create SSL context that ignores certificate verification for localhost
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            
-            connector = aiohttp.TCPConnector(ssl=ssl_context)
-            timeout = aiohttp.ClientTimeout(total=self.config.API_TIMEOUT)
+            session = self.api_client.session
+            logger.info(f"[AUTH] POST {auth_url}")
+            logger.info(f"[AUTH] Email: {self.config.API_AUTH_EMAIL}")
             
-            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-                logger.info(f"[AUTH] POST {auth_url}")
-                logger.info(f"[AUTH] Email: {self.config.API_AUTH_EMAIL}")
+            async with session.post(auth_url, json=auth_data) as response:
+                logger.info("")
+                logger.info(f"[AUTH] Response Status: {response.status}")
                 
-                async with session.post(auth_url, json=auth_data) as response:
-                    logger.info("")
-                    logger.info(f"[AUTH] Response Status: {response.status}")
+                if response.status == 200:
+                    auth_response = await response.json()
+                    token = auth_response.get('token')
+                    expires_at = auth_response.get('expiresAt')
                     
-                    if response.status == 200:
-                        auth_response = await response.json()
-                        self.jwt_token = auth_response.get('token')
-                        expires_at = auth_response.get('expiresAt')
-                        
-                        if self.jwt_token:
-                            logger.info("")
-                            logger.info("[AUTH] Authentication successful")
-                            logger.info(f"[AUTH] Token expires at: {expires_at}")
-                            self.token_expires_at = datetime.fromisoformat(expires_at.replace('Z', '+00:00')) if expires_at else None
-                            return True
-                        else:
-                            logger.info("")
-                            logger.error("[AUTH] No token received in response")
-                            return False
+                    if token:
+                        logger.info("")
+                        logger.info("[AUTH] Authentication successful")
+                        logger.info(f"[AUTH] Token expires at: {expires_at}")
+                        return token, parse_expires_at(expires_at)
                     else:
-                        error_text = await response.text()
                         logger.info("")
-                        logger.error(f"[AUTH] Authentication failed: Status {response.status}")
-                        logger.error(f"[AUTH] Response: {error_text}")
-                        return False
-                        
+                        logger.error("[AUTH] No token received in response")
+                        return None
+                else:
+                    error_text = await response.text()
+                    logger.info("")
+                    logger.error(f"[AUTH] Authentication failed: Status {response.status}")
+                    logger.error(f"[AUTH] Response: {error_text}")
+                    return None
+                    
         except Exception as e:
             logger.info("")
             logger.error(f"[AUTH] Authentication error: {str(e)}")
-            return False
+            return None
     
     def is_token_valid(self):
         """Check if current JWT token is still valid"""
-        if not self.jwt_token:
-            return False
-        
-        if self.token_expires_at and datetime.now(timezone.utc) >= self.token_expires_at:
-            logger.info("")
-            logger.info("[AUTH] Token has expired")
-            return False
-            
-        return True
+        return self.token_manager.is_valid()
         
     def setup_mqtt_client(self):
         """Setup MQTT client with callbacks"""
-        self.mqtt_client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+        if self.config.MQTT_CLUSTER_MODE:
+            # Shared subscriptions need MQTT 5
+            self.mqtt_client = mqtt.Client(
+                mqtt.CallbackAPIVersion.VERSION2,
+                client_id=self.config.MQTT_CLIENT_ID,
+                protocol=mqtt.MQTTv5,
+            )
+        else:
+            self.mqtt_client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
         self.mqtt_client.on_connect = self.on_mqtt_connect
         self.mqtt_client.on_message = self.on_mqtt_message
         self.mqtt_client.on_disconnect = self.on_mqtt_disconnect
@@ -161,36 +221,68 @@ class ServerPMPDFService:
         if reason_code == 0:
             logger.info("")
             logger.info("Connected to MQTT broker successfully")
+            if self.draining:
+                logger.info("[DRAIN] Not subscribing while the service is draining")
+                return
             
-            # Subscribe to regular report PDF topics (for editing/downloading)
-            topic = f"controltower/{SERVER_REPORT_TOPIC}/+"
-            client.subscribe(topic)
-            logger.info(f"Subscribed to topic: {topic}")
-
-            cm_topic = f"controltower/{CM_REPORT_TOPIC}/+"
-            client.subscribe(cm_topic)
-            logger.info(f"Subscribed to topic: {cm_topic}")
-
-            rtu_topic = f"controltower/{RTU_REPORT_TOPIC}/+"
-            client.subscribe(rtu_topic)
-            logger.info(f"Subscribed to topic: {rtu_topic}")
-            
-            # Subscribe to signature-based final report PDF topics (for CLOSE status)
-            cm_sig_topic = f"controltower/{CM_SIGNATURE_REPORT_TOPIC}/+"
-            client.subscribe(cm_sig_topic)
-            logger.info(f"Subscribed to signature topic: {cm_sig_topic}")
-            
-            server_sig_topic = f"controltower/{SERVER_SIGNATURE_REPORT_TOPIC}/+"
-            client.subscribe(server_sig_topic)
-            logger.info(f"Subscribed to signature topic: {server_sig_topic}")
-            
-            rtu_sig_topic = f"controltower/{RTU_SIGNATURE_REPORT_TOPIC}/+"
-            client.subscribe(rtu_sig_topic)
-            logger.info(f"Subscribed to signature topic: {rtu_sig_topic}")
+            if self.intake_paused:
+                logger.info("[CLUSTER] At capacity, subscriptions resume once a worker frees up")
+                return
+            self.subscribe_request_topics()
         else:
             logger.info("")
             logger.error(f"Failed to connect to MQTT broker. Return code: {reason_code}")
             
+    def request_topic_patterns(self) -> List[str]:
+        """
+        Every request topic the service subscribes to. In clustered mode these
+        are MQTT 5 shared subscriptions, so the broker hands each request to
+        exactly one instance of the group.
+        """
+        prefix = f"$share/{self.config.MQTT_SHARED_GROUP}/" if self.config.MQTT_CLUSTER_MODE else ""
+        return [
+            f"{prefix}controltower/{topic}/+"
+            for topic in (
+                SERVER_REPORT_TOPIC, CM_REPORT_TOPIC, RTU_REPORT_TOPIC,
+                CM_SIGNATURE_REPORT_TOPIC, SERVER_SIGNATURE_REPORT_TOPIC, RTU_SIGNATURE_REPORT_TOPIC,
+            )
+        ]
+
+    def subscribe_request_topics(self):
+        """Subscribe to regular (editing) and signature (CLOSE) request topics"""
+        qos = 1 if self.config.MQTT_CLUSTER_MODE else 0
+        for topic in self.request_topic_patterns():
+            self.mqtt_client.subscribe(topic, qos=qos)
+            logger.info(f"Subscribed to topic: {topic}")
+
+    def unsubscribe_request_topics(self):
+        for topic in self.request_topic_patterns():
+            self.mqtt_client.unsubscribe(topic)
+
+    def update_intake(self):
+        """
+        Clustered mode: leave the shared subscription group while this instance
+        is at capacity, so the broker sends new requests to the other
+        instances, and rejoin once a worker is free. Runs on the service loop.
+        """
+        if not (self.config.MQTT_CLUSTER_MODE and self.config.MQTT_CLUSTER_PAUSE_WHEN_FULL):
+            return
+        if self.draining or not self.mqtt_client or not self.worker_pool:
+            return
+        load = self.worker_pool.active_count() + self.worker_pool.queue_depth()
+        if self.debouncer:
+            load += self.debouncer.pending_count()
+        capacity = self.worker_pool.max_workers
+        if not self.intake_paused and load >= capacity + self.config.MQTT_CLUSTER_MAX_BACKLOG:
+            self.intake_paused = True
+            self.unsubscribe_request_topics()
+            logger.info(f"[CLUSTER] {self.config.MQTT_CLIENT_ID} at capacity ({load} jobs), leaving the shared subscription group")
+        elif self.intake_paused and load < capacity:
+            self.intake_paused = False
+            if self.mqtt_client.is_connected():
+                self.subscribe_request_topics()
+            logger.info(f"[CLUSTER] {self.config.MQTT_CLIENT_ID} has free capacity ({load} jobs), rejoined the shared subscription group")
+
     def on_mqtt_disconnect(self, client, userdata, disconnect_flags, reason_code, properties):
         """Callback for MQTT disconnection"""
         if reason_code != 0:
@@ -226,29 +318,164 @@ class ServerPMPDFService:
             requested_by = message_data.get('requested_by', 'Unknown')
             timestamp = message_data.get('timestamp', datetime.now().isoformat())
             
-            # Process the PDF generation request in a separate thread
-            import threading
-            thread = threading.Thread(
-                target=self._run_async_process,
-                args=(report_id, requested_by, timestamp, message_data, report_type_key)
-            )
-            thread.daemon = True
-            thread.start()
+            # Hand the request to the worker pool on the service event loop
+            job = RenderJob(report_id, requested_by, timestamp, message_data, report_type_key.lower())
+            self.worker_pool.call_threadsafe(self.accept_job, job)
             
         except Exception as e:
             logger.info("")
             logger.error(f"Error processing MQTT message: {str(e)}")
             
-    def _run_async_process(self, report_id: str, requested_by: str, 
-                          timestamp: str, message_data: Dict[str, Any], report_topic_key: str):
-        """Helper method to run async process in a new event loop"""
+    def accept_job(self, job: RenderJob):
+        """
+        Entry point for new requests on the service event loop.
+        Signature reports go straight to the queue; edit-triggered renders
+        wait out a short per-report debounce window first, and abort a
+        running render of the same report that is working from older data.
+        """
+        self.journal_event(job, EVENT_RECEIVED)
+        if self.prerender_watcher:
+            # Client work always wins over speculative renders
+            self.prerender_watcher.yield_to_requests()
+        if self.draining:
+            # Messages already delivered before we unsubscribed; keep them for the next run
+            self.drain_backlog.append(job)
+            return
+
+        is_signature = 'signature' in job.topic_key
+        existing = self.inflight_jobs.get(job.key)
+        queued_duplicate = existing is not None and existing.started_at is None
+        if is_signature or queued_duplicate:
+            # A job that has not started yet will read the latest data anyway
+            self.submit_job(job)
+            return
+
+        if (existing is not None and not existing.cancelled and self.config.PDF_PREEMPT_STALE_RENDERS
+                and existing.is_stale_for(job)):
+            logger.info(f"[PREEMPT] Aborting {existing}: newer request {job} arrived after its data was fetched")
+            existing.preempt(job)
+
+        if self.debouncer is None:
+            self.submit_job(job)
+            return
+
+        self.debouncer.offer(job)
+        logger.info(f"[DEBOUNCE] Holding {job} for {self.debouncer.window_seconds}s")
+
+    def _on_job_superseded(self, superseded: RenderJob, replacement: RenderJob):
+        """Tell the requester of a debounced job which render replaced it"""
+        logger.info(f"[DEBOUNCE] {superseded} superseded by {replacement}")
+        self.journal_event(superseded, EVENT_SUPERSEDED, {'superseded_by': replacement.job_id})
+        self.publish_status(
+            superseded.report_id,
+            "superseded",
+            "PDF request superseded by a newer request for the same report",
+            topic_key=superseded.topic_key,
+            extra={'job_id': superseded.job_id, 'superseded_by': replacement.job_id},
+            job=superseded,
+        )
+
+    def submit_job(self, job: RenderJob) -> bool:
+        """
+        Admit a job to the worker pool, publishing a queued (or rejected) status.
+        A duplicate of a job that is already queued or running is attached to
+        it instead, so identical requests never cost more than one render.
+        Runs on the service event loop.
+        """
+        existing = self.inflight_jobs.get(job.key)
+        if existing and not existing.cancelled:
+            existing.attach(job)
+            state = "processing" if existing.started_at is not None else "queued"
+            logger.info(f"[QUEUE] Coalesced duplicate request for {job.report_id} into {existing} ({len(existing.requesters)} requesters)")
+            self.journal_event(job, EVENT_COALESCED, {'into': existing.job_id})
+            # Coalescing is per instance; in clustered mode duplicates landing on
+            # other instances render separately
+            self.publish_status(
+                job.report_id,
+                state,
+                "PDF request attached to an in-flight generation",
+                topic_key=job.topic_key,
+                extra={
+                    'job_id': existing.job_id,
+                    'coalesced': True,
+                    'priority': existing.priority_name,
+                    'queue_position': self.worker_pool.position(existing),
+                },
+                job=existing,
+            )
+            return True
+
+        def _on_admitted(admitted_job: RenderJob, position: int):
+            self.publish_status(
+                admitted_job.report_id,
+                "queued",
+                f"PDF request queued at position {position}",
+                topic_key=admitted_job.topic_key,
+                extra={
+                    'job_id': admitted_job.job_id,
+                    'priority': admitted_job.priority_name,
+                    'queue_position': position,
+                    'queue_depth': self.worker_pool.queue_depth(),
+                },
+                job=admitted_job,
+            )
+
+        def _on_evicted(evicted_job: RenderJob, admitted_job: RenderJob):
+            # A higher-priority request needed the slot; the evicted one gets the same answer as a rejection
+            if self.inflight_jobs.get(evicted_job.key) is evicted_job:
+                del self.inflight_jobs[evicted_job.key]
+            self.journal_event(evicted_job, EVENT_FAILED, {'reason': 'evicted', 'evicted_by': admitted_job.job_id})
+            self.publish_status(
+                evicted_job.report_id,
+                "failed",
+                "PDF service is busy, please try again shortly",
+                topic_key=evicted_job.topic_key,
+                extra={'job_id': evicted_job.job_id, 'queue_depth': self.worker_pool.queue_depth()},
+                job=evicted_job,
+            )
+
         try:
-            asyncio.run(self.process_pdf_request(report_id, requested_by, timestamp, message_data, report_topic_key))
-        except Exception as e:
-            logger.error(f"Error in async process: {str(e)}")
+            self.worker_pool.submit(job, on_admitted=_on_admitted, on_evicted=_on_evicted)
+            self.inflight_jobs[job.key] = job
+            self.update_intake()
+            return True
+        except QueueFullError as e:
+            logger.warning(f"[QUEUE] Rejected {job}: {str(e)}")
+            self.journal_event(job, EVENT_FAILED, {'reason': str(e)})
+            self.publish_status(
+                job.report_id,
+                "failed",
+                "PDF service is busy, please try again shortly",
+                topic_key=job.topic_key,
+                extra={'queue_depth': self.worker_pool.queue_depth()},
+                job=job,
+            )
+            return False
+
+    async def _process_job(self, job: RenderJob):
+        """Worker pool handler for a single admitted job"""
+        self.journal_event(job, EVENT_STARTED)
+        try:
+            await self.process_pdf_request(
+                job.report_id, job.requested_by, job.timestamp, job.message_data, job.topic_key, job=job
+            )
+            if not job.interrupted:
+                # Whatever status went out last for this job is the client's terminal status
+                status = job.last_status
+                event = {
+                    'completed': EVENT_COMPLETED,
+                    'superseded': EVENT_SUPERSEDED,
+                }.get(status, EVENT_FAILED)
+                self.journal_event(job, event, {'status': status})
+        finally:
+            if self.inflight_jobs.get(job.key) is job:
+                del self.inflight_jobs[job.key]
+            # The worker is released right after this returns
+            self.loop.call_soon(self.update_intake)
 
     async def process_pdf_request(self, report_id: str, requested_by: str,
-                          timestamp: str, message_data: Dict[str, Any], report_topic_key: str):
+                          timestamp: str, message_data: Dict[str, Any], report_topic_key: str,
+                          job: Optional[RenderJob] = None):
         """Process PDF generation request"""
         try:
             topic_key = (report_topic_key or SERVER_REPORT_TOPIC).lower()
@@ -266,211 +493,609 @@ class ServerPMPDFService:
                 CM_SIGNATURE_REPORT_TOPIC, SERVER_SIGNATURE_REPORT_TOPIC, RTU_SIGNATURE_REPORT_TOPIC
             )
             if topic_key not in all_topics:
-                await self.send_status_update(report_id, "failed", f"Unsupported report type: {topic_key}", topic_key=topic_key)
+                await self.send_status_update(report_id, "failed", f"Unsupported report type: {topic_key}", topic_key=topic_key, job=job)
                 return
 
-            await self.send_status_update(report_id, "processing", "PDF generation started", topic_key=topic_key)
-
-            if not self.db_manager:
-                logger.info("")
-                logger.info(f"[STEP 3] Initializing database manager...")
-                self.db_manager = DatabaseManager(self.config.DATABASE_CONFIG)
+            await self.send_status_update(
+                report_id, "processing", "PDF generation started", topic_key=topic_key,
+                extra={'job_id': job.job_id} if job else None, job=job,
+            )
 
-            # Determine base report type (remove '_signature' if present)
-            base_topic = topic_key.replace('_signature', '')
-            
-            if base_topic == SERVER_REPORT_TOPIC and not self.pdf_generator:
-                logger.info("")
-                logger.info(f"[STEP 4] Initializing Server PM PDF generator...")
-                self.pdf_generator = ServerPMPDFGenerator()
-            elif base_topic == CM_REPORT_TOPIC and not self.cm_pdf_generator:
-                logger.info("")
-                logger.info(f"[STEP 4] Initializing CM PDF generator...")
-                self.cm_pdf_generator = CMReportPDFGenerator()
-            elif base_topic == RTU_REPORT_TOPIC and not self.rtu_pdf_generator:
-                logger.info("")
-                logger.info(f"[STEP 4] Initializing RTU PM PDF generator...")
-                self.rtu_pdf_generator = RTUPMPDFGenerator()
+            self.get_db_manager()
 
-            # Determine API path based on report type
-            if base_topic == SERVER_REPORT_TOPIC:
-                api_path = f"/api/PMReportFormServer/{report_id}"
-            elif base_topic == CM_REPORT_TOPIC:
-                api_path = f"/api/ReportForm/CMReportForm/{report_id}"
-            else:
-                api_path = f"/api/ReportForm/RTUPMReportForm/{report_id}"
+            # Answer from a speculative pre-render if the report has not changed since
+            if await self.serve_prerendered(report_id, topic_key, job):
+                return
 
             logger.info("")
-            logger.info(f"[STEP 5] Calling API endpoint {api_path}")
-            api_data = await self.retrieve_data_from_api(api_path)
-            if not api_data:
-                logger.error("[STEP 5 FAILED] No data received from API")
-                await self.send_status_update(report_id, "failed", "Failed to retrieve data from API", topic_key=topic_key)
+            if job:
+                job.data_fetch_started_at = time.monotonic()
+                job.stage = 'data_acquisition'
+            try:
+                report_data, job_no = await self.acquire_report_data(report_id, topic_key, job)
+            except AcquisitionFailed as e:
+                logger.error(f"[STEP 5 FAILED] {str(e)}")
+                await self.send_status_update(report_id, "failed", "Failed to retrieve data from API", topic_key=topic_key, job=job)
                 return
+            if job:
+                job.cancel_token.raise_if_cancelled("data acquisition")
 
-            logger.info("")
-            logger.info(f"[STEP 6] Transforming API data for report type {base_topic}...")
-            if base_topic == SERVER_REPORT_TOPIC:
-                report_data = self.transform_api_data(api_data)
-            elif base_topic == CM_REPORT_TOPIC:
-                report_data = self.transform_cm_api_data(api_data)
-            else:
-                report_data = self.transform_rtu_api_data(api_data)
-            
-            # If this is a signature report, fetch signature images
-            if is_signature_report:
-                logger.info("")
-                logger.info(f"[STEP 6.5] Fetching signature images for final report...")
-                signature_images = await self.fetch_signature_images(report_id)
-                report_data['signatureImages'] = signature_images
-                logger.info(f"[SIGNATURE] Found {len(signature_images)} signature images")
-            
-            # Fetch Willowlynx section images for Server PM reports
-            if base_topic == SERVER_REPORT_TOPIC:
-                logger.info("")
-                logger.info(f"[STEP 6.6] Fetching Willowlynx section images...")
-                willowlynx_images = await self.fetch_willowlynx_images(report_id)
-                report_data['willowlynxImages'] = willowlynx_images
-                logger.info(f"[IMAGES] Found {sum(len(v) for v in willowlynx_images.values())} Willowlynx images")
-
-            job_no = (
-                report_data.get('reportForm', {}).get('jobNo')
-                or report_data.get('reportForm', {}).get('JobNo')
-                or report_id
-            )
             logger.info("")
             logger.info(f"[STEP 7] Using job number: {job_no}")
 
             logger.info("")
             logger.info(f"[STEP 8] Generating PDF output...")
-            pdf_type_suffix = "_FinalReport" if is_signature_report else ""
+            # Rendering is CPU-bound, the backend keeps it off the service event loop
+            render_kind, report_type = self.render_target(topic_key, report_data)
             
-            if base_topic == SERVER_REPORT_TOPIC:
-                pdf_path = self.pdf_generator.generate_comprehensive_pdf(
-                    report_data, job_no, f"Server_PM{pdf_type_suffix}"
-                )
-            elif base_topic == CM_REPORT_TOPIC:
-                pdf_path = self.cm_pdf_generator.generate_pdf(
-                    report_data, job_no, f"CM{pdf_type_suffix}"
-                )
-            else:
-                pdf_path = self.rtu_pdf_generator.generate_pdf(
-                    report_data, job_no, f"RTU_PM{pdf_type_suffix}"
+            if job:
+                job.stage = 'render'
+            try:
+                pdf_path = await self.renderer.render(
+                    render_kind, report_data, job_no, report_type,
+                    cancel_token=job.cancel_token if job else None,
+                    timeout=job.remaining_seconds() if job else None,
                 )
+            except RenderTimeoutError as e:
+                logger.error(f"[STEP 8 FAILED] {str(e)}")
+                await self.send_timeout_status(report_id, topic_key, job)
+                return
 
+            if job:
+                job.stage = 'publishing'
             if pdf_path and os.path.exists(pdf_path):
                 logger.info("")
                 logger.info(f"[STEP 8 SUCCESS] PDF generated successfully at: {pdf_path}")
-                await self.send_status_update(
-                    report_id,
-                    "completed",
-                    f"PDF generated successfully: {os.path.basename(pdf_path)}",
-                    file_name=os.path.basename(pdf_path),
-                    topic_key=topic_key,
-                )
+                await self.send_completed_status(report_id, topic_key, pdf_path, job)
+                if self.prerender_watcher:
+                    # The client already has a render of the current data
+                    self.prerender_watcher.forget(topic_key, report_id)
             else:
                 logger.error("[STEP 8 FAILED] PDF generation failed")
-                await self.send_status_update(report_id, "failed", "PDF generation failed", topic_key=topic_key)
+                await self.send_status_update(report_id, "failed", "PDF generation failed", topic_key=topic_key, job=job)
 
+        except asyncio.CancelledError:
+            if not (job and job.timed_out):
+                raise
+            logger.error(f"[TIMEOUT] {job} abandoned by the watchdog during {job.stage}")
+            await self.send_timeout_status(report_id, topic_key, job)
+        except RenderCancelled as e:
+            if job and job.interrupted:
+                logger.info(f"[DRAIN] {job} interrupted, it will be replayed after the reload")
+                return
+            if job and job.timed_out:
+                logger.error(f"[TIMEOUT] {job} stopped: {str(e)}")
+                await self.send_timeout_status(report_id, topic_key, job)
+                return
+            logger.info(f"[PREEMPT] {job or report_id} stopped: {str(e)}")
+            await self.send_status_update(
+                report_id,
+                "superseded",
+                "PDF generation aborted in favour of a newer request for the same report",
+                topic_key=topic_key,
+                extra={'job_id': job.job_id, 'superseded_by': job.superseded_by} if job else None,
+                job=job,
+            )
         except Exception as e:
             logger.error(f"Error processing PDF request for {report_id}: {str(e)}")
-            await self.send_status_update(report_id, "failed", f"Error: {str(e)}", topic_key=topic_key)
+            await self.send_status_update(report_id, "failed", f"Error: {str(e)}", topic_key=topic_key, job=job)
             
-    async def fetch_signature_images(self, report_id: str) -> Dict[str, str]:
+    async def acquire_report_data(self, report_id: str, topic_key: str,
+                                  job: Optional[RenderJob] = None,
+                                  not_before: Optional[float] = None) -> Tuple[Dict[str, Any], str]:
         """
-        Fetch signature images from database for final report generation.
+        Fetch and transform everything a render of report_id needs.
+        Cached API responses older than not_before (monotonic time) are not
+        used; it defaults to the time the job was received.
         
         Returns:
-            Dict with signature types as keys and file paths as values
-            e.g. {'AttendedBySignature': '/path/to/image.png', 'ApprovedBySignature': '/path/to/image2.png'}
+            (report_data, job_no)
+        Raises:
+            AcquisitionFailed: If the report data itself could not be fetched
         """
+        is_signature_report = 'signature' in topic_key
+        base_topic = topic_key.replace('_signature', '')
+
+        # Determine API path based on report type
+        if base_topic == SERVER_REPORT_TOPIC:
+            api_path = f"/api/PMReportFormServer/{report_id}"
+        elif base_topic == CM_REPORT_TOPIC:
+            api_path = f"/api/ReportForm/CMReportForm/{report_id}"
+        else:
+            api_path = f"/api/ReportForm/RTUPMReportForm/{report_id}"
+
+        # STEP 5, 6.5 and 6.6 are all keyed by report_id and run concurrently;
+        # only the transform (STEP 6) has to wait for the report payload
+        graph = AcquisitionGraph()
+
+        data_source = self.data_source_for(base_topic)
+        if not_before is None and job:
+            not_before = job.received_at
+
+        async def _fetch_api_data():
+            logger.info(f"[STEP 5] Calling API endpoint {api_path}")
+            api_data = await self.retrieve_data_from_api(api_path, not_before=not_before)
+            if not api_data:
+                raise AcquisitionFailed("No data received from API")
+            return api_data
+
+        async def _fetch_report_data():
+            if data_source == DATA_SOURCE_DB and not self.db_source_verified(base_topic):
+                # Until enough reports matched the API, compare every one and render
+                # from the database only when it matched
+                api_data, db_data = await asyncio.gather(
+                    _fetch_api_data(), self.fetch_report_data_from_db(base_topic, report_id)
+                )
+                if self.log_data_parity(report_id, api_data, db_data, base_topic):
+                    return db_data
+                logger.warning(f"[STEP 5] Database data for {report_id} differs from the API, rendering from the API")
+                return api_data
+            if data_source == DATA_SOURCE_DB:
+                logger.info(f"[STEP 5] Reading report {report_id} from the database")
+                db_data = await self.fetch_report_data_from_db(base_topic, report_id)
+                if db_data:
+                    return db_data
+                logger.warning(f"[STEP 5] No database data for {report_id}, falling back to the API")
+            elif data_source == DATA_SOURCE_PARITY:
+                api_data, db_data = await asyncio.gather(
+                    _fetch_api_data(), self.fetch_report_data_from_db(base_topic, report_id)
+                )
+                self.log_data_parity(report_id, api_data, db_data, base_topic)
+                return api_data
+            return await _fetch_api_data()
+
+        async def _transform(api_data):
+            logger.info("")
+            logger.info(f"[STEP 6] Transforming API data for report type {base_topic}...")
+            if base_topic == SERVER_REPORT_TOPIC:
+                return self.transform_api_data(api_data)
+            elif base_topic == CM_REPORT_TOPIC:
+                return self.transform_cm_api_data(api_data)
+            return self.transform_rtu_api_data(api_data)
+
+        graph.add('report_fetch', _fetch_report_data)
+        graph.add('transform', _transform, depends_on=['report_fetch'])
+        
+        # Signature and Willowlynx images come from one image manifest per job
+        if is_signature_report or base_topic == SERVER_REPORT_TOPIC:
+            logger.info(f"[STEP 6.5] Fetching image manifest...")
+            graph.add('image_manifest', lambda: self.fetch_image_manifest(report_id))
+        
+        async def _signature_images(manifest):
+            return self.signature_images_from_manifest(manifest, report_id)
+
+        async def _willowlynx_images(manifest):
+            return self.willowlynx_images_from_manifest(manifest, report_id)
+
+        # If this is a signature report, pick the signature images
+        if is_signature_report:
+            graph.add('signature_images', _signature_images, depends_on=['image_manifest'])
+        
+        # Pick the Willowlynx section images for Server PM reports
+        if base_topic == SERVER_REPORT_TOPIC:
+            graph.add('willowlynx_images', _willowlynx_images, depends_on=['image_manifest'])
+
         try:
-            if not self.db_manager:
-                self.db_manager = DatabaseManager(self.config.DATABASE_CONFIG)
-            
-            # Query to fetch signature images
-            query = """
-            SELECT 
-                rfi.ImageName,
-                rfi.StoredDirectory,
-                rit.ImageTypeName
+            results = await graph.run()
+        finally:
+            if job:
+                job.fetch_timings = dict(graph.timings)
+        logger.info(f"[TIMING] Data acquisition for {report_id}: {graph.timings}")
+
+        report_data = results['transform']
+        if 'signature_images' in results:
+            signature_images = results['signature_images']
+            report_data['signatureImages'] = signature_images
+            logger.info(f"[SIGNATURE] Found {len(signature_images)} signature images")
+        if 'willowlynx_images' in results:
+            willowlynx_images = results['willowlynx_images']
+            report_data['willowlynxImages'] = willowlynx_images
+            logger.info(f"[IMAGES] Found {sum(len(v) for v in willowlynx_images.values())} Willowlynx images")
+
+        job_no = (
+            report_data.get('reportForm', {}).get('jobNo')
+            or report_data.get('reportForm', {}).get('JobNo')
+            or report_id
+        )
+        return report_data, job_no
+
+    def render_target(self, topic_key: str, report_data: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
+        """Render kind and report type (file name prefix) for a topic; prepares report_data for it"""
+        base_topic = topic_key.replace('_signature', '')
+        pdf_type_suffix = "_FinalReport" if 'signature' in topic_key else ""
+        if base_topic == SERVER_REPORT_TOPIC:
+            if report_data is not None and self.reference_data:
+                # Status labels are resolved from this snapshot instead of hard-coded maps
+                report_data['referenceData'] = self.reference_data.snapshot()
+            return REPORT_KIND_SERVER_PM, f"Server_PM{pdf_type_suffix}"
+        elif base_topic == CM_REPORT_TOPIC:
+            return REPORT_KIND_CM, f"CM{pdf_type_suffix}"
+        return REPORT_KIND_RTU_PM, f"RTU_PM{pdf_type_suffix}"
+
+    def journal_event(self, job: RenderJob, event: str, detail: Optional[Dict[str, Any]] = None):
+        """Record a job transition in the journal, if enabled"""
+        if self.journal:
+            self.journal.record(job, event, detail)
+
+    def is_render_idle(self) -> bool:
+        """True when no client job is queued or rendering (pre-renders only run then)"""
+        if self.draining or not self.worker_pool:
+            return False
+        return self.worker_pool.queue_depth() == 0 and not self.worker_pool.running_jobs()
+
+    def report_topic_for_form_type(self, form_type_name: Optional[str]) -> Optional[str]:
+        """Base topic of a ReportFormTypes.Name, or None for report types this service doesn't render"""
+        name = (form_type_name or '').lower().replace(' ', '').replace('_', '')
+        if 'server' in name:
+            return SERVER_REPORT_TOPIC
+        if 'rtu' in name:
+            return RTU_REPORT_TOPIC
+        if name.startswith('cm') or 'corrective' in name:
+            return CM_REPORT_TOPIC
+        return None
+
+    async def poll_changed_reports(self, since: Optional[datetime]) -> Tuple[Optional[datetime], List[Tuple[str, str]]]:
+        """
+        Reports whose ReportForms.UpdatedDate is later than since (or within
+        PRERENDER_LOOKBACK_MINUTES on the first poll), as (topic_key, report_id)
+        for every topic in PRERENDER_TOPICS of their report type.
+        """
+        if since is None:
+            condition, watermark_param = "rf.UpdatedDate > DATEADD(minute, -?, GETDATE())", self.config.PRERENDER_LOOKBACK_MINUTES
+        else:
+            condition, watermark_param = "rf.UpdatedDate > ?", since
+        if self.reference_data and self.reference_data.is_loaded('report_form_types'):
+            # Form type names come from the reference-data cache
+            type_column, type_join = "rf.ReportFormTypeID", ""
+            type_name = lambda type_id: self.reference_data.label('report_form_types', type_id)
+        else:
+            type_column, type_join = "rft.Name", "LEFT JOIN ReportFormTypes rft ON rf.ReportFormTypeID = rft.ID"
+            type_name = lambda name: name
+        query = f"""
+        SELECT TOP (?) rf.ID, {type_column}, rf.UpdatedDate
+        FROM ReportForms rf
+        {type_join}
+        WHERE {condition}
+        ORDER BY rf.UpdatedDate
+        """
+        rows = await self.get_db_manager().execute_query(
+            query, (self.config.PRERENDER_POLL_BATCH_SIZE, watermark_param), mode=RESULT_TUPLES
+        )
+        watermark, changes = since, []
+        for report_id, form_type, updated_date in rows:
+            watermark = updated_date
+            form_type_name = type_name(form_type)
+            base_topic = self.report_topic_for_form_type(form_type_name)
+            if base_topic is None:
+                continue
+            for topic_key in self.config.PRERENDER_TOPICS:
+                if topic_key.replace('_signature', '') == base_topic:
+                    changes.append((topic_key, str(report_id)))
+        if changes:
+            logger.info(f"[PRERENDER] {len(changes)} renders queued for reports changed since {since or 'startup'}")
+        return watermark, changes
+
+    async def fetch_report_fingerprint(self, report_id: str) -> Optional[Tuple]:
+        """
+        What a pre-render is valid for: the report's UpdatedDate and a checksum
+        of its image rows, deleted ones included (uploading or replacing a
+        signature does not have to touch the report form, and a replacement
+        leaves the number of live images unchanged)
+        """
+        query = """
+        SELECT rf.UpdatedDate, images.ImageRows, images.ImageChecksum
+        FROM ReportForms rf
+        OUTER APPLY (
+            SELECT COUNT(*) AS ImageRows,
+                   CHECKSUM_AGG(CHECKSUM(rfi.ID, rfi.IsDeleted, rfi.ImageName)) AS ImageChecksum
             FROM ReportFormImages rfi
-            INNER JOIN ReportFormImageTypes rit ON rfi.ReportImageTypeID = rit.ID
-            WHERE rfi.ReportFormID = ?
-              AND rfi.IsDeleted = 0
-              AND rit.ImageTypeName IN ('AttendedBySignature', 'ApprovedBySignature')
-            ORDER BY rit.ImageTypeName
-            """
-            
-            # Execute query using database manager
-            import pyodbc
-            
-            # Build connection string based on config
-            server = self.config.DB_SERVER
-            database = self.config.DB_NAME
-            username = self.config.DB_USERNAME
-            password = self.config.DB_PASSWORD
-            driver = self.config.DB_DRIVER
-            
-            if username and password:
-                # Use SQL Server authentication
-                connection_string = (
-                    f"DRIVER={{{driver}}};"
-                    f"SERVER={server};"
-                    f"DATABASE={database};"
-                    f"UID={username};"
-                    f"PWD={password}"
-                )
+            WHERE rfi.ReportFormID = rf.ID
+        ) images
+        WHERE rf.ID = ?
+        """
+        rows = await self.get_db_manager().execute_query(query, (report_id,), mode=RESULT_TUPLES)
+        return tuple(rows.rows[0]) if rows else None
+
+    async def prerender_report(self, topic_key: str, report_id: str, cancel_token):
+        """Render a changed report ahead of its request and keep it in the pre-render cache"""
+        key = (topic_key, report_id)
+        # Taken before the data is fetched, so a change during the render invalidates it;
+        # API responses cached before the fingerprint may predate the change and are skipped
+        fingerprinted_at = time.monotonic()
+        fingerprint = await self.fetch_report_fingerprint(report_id)
+        if fingerprint is None or self.prerender_cache.fingerprint_of(key) == fingerprint:
+            return
+        report_data, job_no = await self.acquire_report_data(report_id, topic_key, not_before=fingerprinted_at)
+        cancel_token.raise_if_cancelled("data acquisition")
+        render_kind, report_type = self.render_target(topic_key, report_data)
+        # Speculative renders are not watched by the watchdog, so they carry their own deadline.
+        # They are written straight into the cache directory: a file in PDF_OUTPUT_DIR could take
+        # the same to-the-second name as a client render of the report, and be deleted with it.
+        pdf_path = await self.renderer.render(
+            render_kind, report_data, job_no, report_type,
+            cancel_token=cancel_token,
+            timeout=self.config.PDF_TIMEOUT_SECONDS,
+            output_dir=str(self.prerender_cache.directory),
+        )
+        if pdf_path and os.path.exists(pdf_path):
+            self.prerender_cache.store(key, fingerprint, pdf_path, job_no, report_type)
+            logger.info(f"[PRERENDER] Pre-rendered {report_id} ({topic_key})")
+
+    async def serve_prerendered(self, report_id: str, topic_key: str, job: Optional[RenderJob]) -> bool:
+        """Complete a request from the pre-render cache if the report is unchanged; True if served"""
+        key = (topic_key, report_id)
+        if not self.prerender_cache or self.prerender_cache.fingerprint_of(key) is None:
+            return False
+        try:
+            entry = self.prerender_cache.take(key, await self.fetch_report_fingerprint(report_id))
+            if entry is None:
+                logger.info(f"[PRERENDER] Pre-render of {report_id} is stale, rendering again")
+                return False
+            pdf_path = self.config.get_pdf_path(entry.job_no, entry.report_type)
+            shutil.move(entry.path, pdf_path)
+        except Exception as e:
+            logger.warning(f"[PRERENDER] Could not use pre-render of {report_id}: {str(e)}")
+            return False
+        if job:
+            job.stage = 'publishing'
+        logger.info(f"[PRERENDER] Serving {report_id} ({topic_key}) from a pre-rendered PDF: {pdf_path}")
+        await self.send_completed_status(report_id, topic_key, pdf_path, job, prerendered=True)
+        return True
+
+    async def send_completed_status(self, report_id: str, topic_key: str, pdf_path: str,
+                                    job: Optional[RenderJob], prerendered: bool = False):
+        """Report a finished PDF to the client"""
+        extra = None
+        if job:
+            extra = {
+                'job_id': job.job_id,
+                'requesters': len(job.requesters),
+                'fetch_timings': job.fetch_timings,
+            }
+            if prerendered:
+                extra['prerendered'] = True
+        await self.send_status_update(
+            report_id,
+            "completed",
+            f"PDF generated successfully: {os.path.basename(pdf_path)}",
+            file_name=os.path.basename(pdf_path),
+            topic_key=topic_key,
+            extra=extra,
+            job=job,
+        )
+
+    async def send_timeout_status(self, report_id: str, topic_key: str, job: Optional[RenderJob]):
+        """Report a job that overran PDF_TIMEOUT_SECONDS, with the stage it was stuck in"""
+        extra = None
+        if job:
+            extra = {
+                'job_id': job.job_id,
+                'stage': job.stage,
+                'elapsed_seconds': round(job.elapsed_seconds(), 2),
+            }
+        await self.send_status_update(
+            report_id,
+            "timeout",
+            f"PDF generation exceeded {self.config.PDF_TIMEOUT_SECONDS} seconds"
+            + (f" during {job.stage}" if job else ""),
+            topic_key=topic_key,
+            extra=extra,
+            job=job,
+        )
+
+    async def run_watchdog(self):
+        """Cancel jobs that overrun their deadline and reap render workers that ignore it"""
+        interval = max(0.5, self.config.PDF_WATCHDOG_INTERVAL_SECONDS)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                for job in self.worker_pool.running_jobs():
+                    if job.timed_out or job.interrupted or not job.is_overdue():
+                        continue
+                    logger.error(f"[WATCHDOG] {job} exceeded {self.config.PDF_TIMEOUT_SECONDS}s during {job.stage}, cancelling")
+                    job.timed_out = True
+                    job.cancel_token.cancel("timed out")
+                    if job.task and not job.task.done():
+                        job.task.cancel()
+                self.renderer.reap_stuck_workers(self.config.PDF_WATCHDOG_KILL_GRACE_SECONDS)
+                if self.db_manager:
+                    # Idle pooled connections are also evicted on checkout; this covers quiet periods.
+                    # Closing a pyodbc connection blocks, so it runs on the DB executor
+                    await self.db_manager.run(self.db_manager.pool.evict_idle)
+            except Exception as e:
+                logger.error(f"[WATCHDOG] Error checking job deadlines: {str(e)}")
+
+    def get_db_manager(self) -> DatabaseManager:
+        """The service's DatabaseManager, whose connection pool serves every DB access"""
+        if not self.db_manager:
+            logger.info("")
+            logger.info(f"[STEP 3] Initializing database manager...")
+            self.db_manager = DatabaseManager(self.config.DATABASE_CONFIG)
+        return self.db_manager
+
+    def data_source_for(self, base_topic: str) -> str:
+        """Where report data for a report type is read from (REPORT_DATA_SOURCE_*)"""
+        if base_topic == SERVER_REPORT_TOPIC:
+            return resolve_data_source(self.config.REPORT_DATA_SOURCE_SERVER_PM, supports_db=True)
+        # No database loader exists for CM and RTU PM reports yet
+        setting = self.config.REPORT_DATA_SOURCE_CM if base_topic == CM_REPORT_TOPIC else self.config.REPORT_DATA_SOURCE_RTU_PM
+        return resolve_data_source(setting, supports_db=False)
+    
+    def log_data_sources(self):
+        """Log the data source of each report type, warning about unsupported settings"""
+        settings = {
+            SERVER_REPORT_TOPIC: self.config.REPORT_DATA_SOURCE_SERVER_PM,
+            CM_REPORT_TOPIC: self.config.REPORT_DATA_SOURCE_CM,
+            RTU_REPORT_TOPIC: self.config.REPORT_DATA_SOURCE_RTU_PM,
+        }
+        for base_topic, setting in settings.items():
+            source = self.data_source_for(base_topic)
+            if source != (setting or DATA_SOURCE_API).strip().lower():
+                logger.warning(f"[DATA SOURCE] {base_topic}: '{setting}' is not supported, using '{source}'")
             else:
-                # Use Windows authentication
-                connection_string = (
-                    f"DRIVER={{{driver}}};"
-                    f"SERVER={server};"
-                    f"DATABASE={database};"
-                    f"Trusted_Connection=yes"
-                )
-            
-            logger.info(f"[DB] Connecting to: {server}/{database}")
-            connection = pyodbc.connect(connection_string)
-            
-            cursor = connection.cursor()
-            cursor.execute(query, report_id)
-            
-            signature_images = {}
-            base_path = self.config.IMAGE_BASE_PATH
-            
-            for row in cursor.fetchall():
-                image_name = row.ImageName
-                stored_directory = row.StoredDirectory
-                image_type = row.ImageTypeName
-                
-                # Construct full path
-                import os
-                if stored_directory:
-                    # If stored_directory is relative, combine with base path
-                    if not os.path.isabs(stored_directory):
-                        full_path = os.path.join(base_path, stored_directory, image_name)
-                    else:
-                        full_path = os.path.join(stored_directory, image_name)
-                else:
-                    # Fallback path
-                    full_path = os.path.join(base_path, report_id, "Signatures", image_name)
-                
-                signature_images[image_type] = full_path
-                logger.info(f"[SIGNATURE] Found {image_type}: {full_path}")
-            
-            cursor.close()
-            connection.close()
-            
-            return signature_images
+                logger.info(f"[DATA SOURCE] {base_topic}: {source}")
+    
+    async def fetch_report_data_from_db(self, base_topic: str, report_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Read report data straight from SQL Server, shaped like the API response.
+        Returns None (so the caller can fall back to the API) if that fails.
+        """
+        if base_topic != SERVER_REPORT_TOPIC:
+            return None
+        try:
+            db_data = await self.get_db_manager().get_server_pm_api_data_by_id(report_id)
+        except Exception as e:
+            logger.error(f"[DATA SOURCE] Database read of {report_id} failed: {str(e)}")
+            return None
+        if not db_data or not db_data.get('PMReportFormServerID'):
+            return None
+        return server_pm_api_payload(db_data, self.reference_data.label if self.reference_data else None)
+    
+    def db_source_verified(self, base_topic: str) -> bool:
+        """True once REPORT_DB_VERIFY_REPORTS reports in a row matched the API (db mode stops comparing)"""
+        return self.db_parity_streaks.get(base_topic, 0) >= self.config.REPORT_DB_VERIFY_REPORTS
+    
+    def log_data_parity(self, report_id: str, api_data: Any, db_data: Optional[Dict[str, Any]],
+                        base_topic: Optional[str] = None) -> bool:
+        """
+        Compare the API and database payloads of a report and log any differences.
+        Fields only the database has are ignored. Returns True if they match;
+        with base_topic, the result also extends or resets its match streak.
+        """
+        if not api_data:
+            return False
+        if not db_data:
+            logger.warning(f"[PARITY] {report_id}: no database payload to compare")
+            matches = False
+        else:
+            differences = parity_differences(
+                api_data, db_data, limit=self.config.REPORT_PARITY_MAX_DIFFERENCES, include_extra=False
+            )
+            matches = not differences
+            if matches:
+                logger.info(f"[PARITY] {report_id}: database payload matches the API")
+            else:
+                logger.warning(f"[PARITY] {report_id}: {len(differences)} differences between API and database payloads")
+                for difference in differences:
+                    logger.warning(f"[PARITY]   {difference}")
+        if base_topic:
+            streak = self.db_parity_streaks.get(base_topic, 0) + 1 if matches else 0
+            self.db_parity_streaks[base_topic] = streak
+            if streak == self.config.REPORT_DB_VERIFY_REPORTS:
+                logger.info(f"[PARITY] {base_topic}: {streak} reports in a row matched the API, database payloads verified")
+        return matches
+    
+    async def load_reference_data(self):
+        """Load the reference-data cache and keep it refreshed"""
+        if not self.config.REFERENCE_DATA_ENABLED:
+            return
+        self.reference_data = ReferenceDataCache(
+            self.get_db_manager(),
+            ttl_seconds=self.config.REFERENCE_DATA_TTL_SECONDS,
+            status_tables={
+                'yes_no_statuses': self.config.REFERENCE_YES_NO_STATUS_TABLE,
+                'result_statuses': self.config.REFERENCE_RESULT_STATUS_TABLE,
+            },
+        )
+        # Type names in the Server PM report query come from the cache as well
+        self.get_db_manager().reference_data = self.reference_data
+        try:
+            await self.reference_data.load()
+        except Exception as e:
+            logger.warning(f"[REFERENCE] Could not load reference data: {str(e)}")
+        missing = self.reference_data.missing_names(
+            'image_types', SIGNATURE_IMAGE_TYPES + tuple(WILLOWLYNX_IMAGE_TYPES)
+        )
+        if missing:
+            logger.warning(f"[REFERENCE] Image types not found in ReportFormImageTypes: {', '.join(missing)}")
+        self.reference_data.start_refresher()
+    
+    async def fetch_image_manifest(self, report_id: str) -> Dict[str, List[Tuple[str, Optional[str]]]]:
+        """
+        Fetch every image attached to a report in one query.
+        
+        The signature and Willowlynx sections are split out of this manifest,
+        so one round trip replaces a lookup per image family. It is fetched
+        once per job and shared by every stage that needs it.
+        
+        Returns:
+            Dict with ImageTypeName as keys and lists of (ImageName, StoredDirectory) as values
+        """
+        try:
+            if self.reference_data and self.reference_data.is_loaded('image_types'):
+                # Type names come from the reference-data cache
+                query = """
+                SELECT 
+                    rfi.ImageName,
+                    rfi.StoredDirectory,
+                    rfi.ReportImageTypeID
+                FROM ReportFormImages rfi
+                WHERE rfi.ReportFormID = ?
+                  AND rfi.IsDeleted = 0
+                ORDER BY rfi.ID
+                """
+                type_name = lambda type_id: self.reference_data.label('image_types', type_id)
+            else:
+                query = """
+                SELECT 
+                    rfi.ImageName,
+                    rfi.StoredDirectory,
+                    rit.ImageTypeName
+                FROM ReportFormImages rfi
+                INNER JOIN ReportFormImageTypes rit ON rfi.ReportImageTypeID = rit.ID
+                WHERE rfi.ReportFormID = ?
+                  AND rfi.IsDeleted = 0
+                ORDER BY rit.ImageTypeName
+                """
+                type_name = lambda name: name
+            
+            # Runs on the database manager's executor and connection pool
+            logger.info(f"[DB] Querying image manifest from: {self.config.DB_SERVER}/{self.config.DB_NAME}")
+            rows = await self.get_db_manager().execute_query(query, (report_id,), mode=RESULT_TUPLES)
+            
+            manifest = {}
+            for image_name, stored_directory, image_type in rows:
+                name = type_name(image_type)
+                if name is None:
+                    # A type added since the last refresh; none of the sections rendered here use it
+                    continue
+                manifest.setdefault(name, []).append((image_name, stored_directory))
+            logger.info(f"[IMAGES] Manifest for {report_id}: {len(rows)} images of {len(manifest)} types")
+            return manifest
             
         except Exception as e:
-            logger.error(f"Error fetching signature images: {str(e)}")
+            logger.error(f"Error fetching image manifest: {str(e)}")
             return {}
     
-    async def fetch_willowlynx_images(self, report_id: str) -> Dict[str, list]:
+    def resolve_image_path(self, image_name: str, stored_directory: Optional[str], fallback_directory: str) -> str:
+        """Full path of a stored image; fallback_directory (under IMAGE_BASE_PATH) is used when none was stored"""
+        base_path = self.config.IMAGE_BASE_PATH
+        if stored_directory:
+            # If stored_directory is relative, combine with base path
+            if not os.path.isabs(stored_directory):
+                return os.path.join(base_path, stored_directory, image_name)
+            return os.path.join(stored_directory, image_name)
+        return os.path.join(base_path, fallback_directory, image_name)
+    
+    def signature_images_from_manifest(self, manifest: Dict[str, list], report_id: str) -> Dict[str, str]:
+        """
+        Signature images for final report generation.
+        
+        Returns:
+            Dict with signature types as keys and file paths as values
+            e.g. {'AttendedBySignature': '/path/to/image.png', 'ApprovedBySignature': '/path/to/image2.png'}
+        """
+        signature_images = {}
+        for image_type in SIGNATURE_IMAGE_TYPES:
+            for image_name, stored_directory in manifest.get(image_type, []):
+                full_path = self.resolve_image_path(image_name, stored_directory, os.path.join(report_id, "Signatures"))
+                signature_images[image_type] = full_path
+                logger.info(f"[SIGNATURE] Found {image_type}: {full_path}")
+        return signature_images
+    
+    def willowlynx_images_from_manifest(self, manifest: Dict[str, list], report_id: str) -> Dict[str, list]:
         """
-        Fetch Willowlynx section images from database for PDF generation.
+        Willowlynx section images for Server PM reports.
         
         Returns:
             Dict with section names as keys and lists of image paths as values
@@ -481,184 +1106,107 @@ class ServerPMPDFService:
                 'sumpPitCCTV': ['/path/to/image4.png']
             }
         """
-        try:
-            # Query to fetch Willowlynx images
-            query = """
-            SELECT 
-                rfi.ImageName,
-                rfi.StoredDirectory,
-                rit.ImageTypeName
-            FROM ReportFormImages rfi
-            INNER JOIN ReportFormImageTypes rit ON rfi.ReportImageTypeID = rit.ID
-            WHERE rfi.ReportFormID = ?
-              AND rfi.IsDeleted = 0
-              AND rit.ImageTypeName IN (
-                  'WillowlynxProcessStatusCheck',
-                  'WillowlynxNetworkStatus',
-                  'WillowlynxRTUStatusCheck',
-                  'WillowlynxSumpPitCCTVCamera'
-              )
-            ORDER BY rit.ImageTypeName
-            """
-            
-            import pyodbc
-            
-            # Build connection string
-            server = self.config.DB_SERVER
-            database = self.config.DB_NAME
-            username = self.config.DB_USERNAME
-            password = self.config.DB_PASSWORD
-            driver = self.config.DB_DRIVER
-            
-            if username and password:
-                connection_string = (
-                    f"DRIVER={{{driver}}};"
-                    f"SERVER={server};"
-                    f"DATABASE={database};"
-                    f"UID={username};"
-                    f"PWD={password}"
-                )
-            else:
-                connection_string = (
-                    f"DRIVER={{{driver}}};"
-                    f"SERVER={server};"
-                    f"DATABASE={database};"
-                    f"Trusted_Connection=yes"
-                )
-            
-            logger.info(f"[DB] Fetching Willowlynx images from: {server}/{database}")
-            connection = pyodbc.connect(connection_string)
-            
-            cursor = connection.cursor()
-            cursor.execute(query, report_id)
-            
-            # Initialize empty lists for each section
-            willowlynx_images = {
-                'processStatus': [],
-                'networkStatus': [],
-                'rtuStatus': [],
-                'sumpPitCCTV': []
-            }
-            
-            base_path = self.config.IMAGE_BASE_PATH
-            
-            # Map image type names to dictionary keys
-            type_map = {
-                'WillowlynxProcessStatusCheck': 'processStatus',
-                'WillowlynxNetworkStatus': 'networkStatus',
-                'WillowlynxRTUStatusCheck': 'rtuStatus',
-                'WillowlynxSumpPitCCTVCamera': 'sumpPitCCTV'
-            }
-            
-            for row in cursor.fetchall():
-                image_name = row.ImageName
-                stored_directory = row.StoredDirectory
-                image_type = row.ImageTypeName
-                
-                # Construct full path
-                import os
-                if stored_directory:
-                    if not os.path.isabs(stored_directory):
-                        full_path = os.path.join(base_path, stored_directory, image_name)
-                    else:
-                        full_path = os.path.join(stored_directory, image_name)
-                else:
-                    full_path = os.path.join(base_path, report_id, image_name)
-                
-                # Add to appropriate section list
-                section_key = type_map.get(image_type)
-                if section_key:
-                    willowlynx_images[section_key].append(full_path)
-                    logger.info(f"[WILLOWLYNX] Found {image_type}: {full_path}")
-            
-            cursor.close()
-            connection.close()
-            
-            return willowlynx_images
-            
-        except Exception as e:
-            logger.error(f"Error fetching Willowlynx images: {str(e)}")
-            return {
-                'processStatus': [],
-                'networkStatus': [],
-                'rtuStatus': [],
-                'sumpPitCCTV': []
-            }
+        willowlynx_images = {
+            'processStatus': [],
+            'networkStatus': [],
+            'rtuStatus': [],
+            'sumpPitCCTV': []
+        }
+        for image_type, section_key in WILLOWLYNX_IMAGE_TYPES.items():
+            for image_name, stored_directory in manifest.get(image_type, []):
+                full_path = self.resolve_image_path(image_name, stored_directory, report_id)
+                willowlynx_images[section_key].append(full_path)
+                logger.info(f"[WILLOWLYNX] Found {image_type}: {full_path}")
+        return willowlynx_images
     
-    async def retrieve_data_from_api(self, api_path: str) -> Optional[Dict[str, Any]]:
-        """Retrieve data from API endpoint with JWT authentication"""
+    async def retrieve_data_from_api(self, api_path: str,
+                                     not_before: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve data from API endpoint with JWT authentication.
+        Served from the response cache when the API confirms it is unchanged
+        (304), or, for APIs without validators, when it was fetched within the
+        TTL and no earlier than not_before (monotonic time the request arrived).
+        """
+        cache = self.response_cache
+        if cache:
+            data = cache.fresh_hit(api_path, not_before)
+            if data is not None:
+                logger.info(f"[CACHE] Served {api_path} from cache ({cache.stats()})")
+                return data
         try:
-            # Ensure we have a valid token
-            if not self.is_token_valid():
+            # Ensure we have a valid token (waits on a sign-in already in flight)
+            token = await self.token_manager.get_token()
+            if not token:
                 logger.info("")
-                logger.info("[API] Token invalid or expired, authenticating...")
-                if not await self.authenticate_api():
-                    logger.info("")
-                    logger.error("[API] Failed to authenticate")
-                    return None
+                logger.error("[API] Failed to authenticate")
+                return None
             
             api_url = f"{self.config.API_BASE_URL}{api_path}"
             logger.info("")
             logger.info(f"[API] URL: {api_url}")
             
-            # Create SSL context that ignores certificate verification for localhost
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            
-            connector = aiohttp.TCPConnector(ssl=ssl_context)
-            timeout = aiohttp.ClientTimeout(total=self.config.API_TIMEOUT)
-            
             headers = {
                 'Content-Type': 'application/json',
-                'Authorization': f'Bearer {self.jwt_token}'
+                'Authorization': f'Bearer {token}'
             }
+            if cache:
+                headers.update(cache.conditional_headers(api_path))
             
             logger.info("")
             logger.info(f"[API] Making authenticated HTTP GET request...")
             logger.info(f"[API] Request timeout: {self.config.API_TIMEOUT} seconds")
-            logger.info(f"[API] SSL verification disabled for localhost")
+            if not self.config.API_SSL_VERIFY:
+                logger.info(f"[API] SSL verification disabled for localhost")
             
-            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-                async with session.get(api_url, headers=headers) as response:
-                    logger.info("")
-                    logger.info(f"[API] Response Status: {response.status}")
-                    
-                    if response.status == 200:
-                        data = await response.json()
-                        logger.info("")
-                        logger.info(f"[API SUCCESS] Data retrieved successfully (Size: {len(str(data))} chars)")
-                        logger.info(f"[API] Response Keys: {list(data.keys()) if isinstance(data, dict) else 'Not a dictionary'}")
-                        return data
-                    elif response.status == 401:
-                        logger.info("")
-                        logger.warning("[API] Unauthorized - token may be invalid, re-authenticating...")
-                        if await self.authenticate_api():
-                            # Retry with new token
-                            headers['Authorization'] = f'Bearer {self.jwt_token}'
-                            async with session.get(api_url, headers=headers) as retry_response:
-                                if retry_response.status == 200:
-                                    data = await retry_response.json()
-                                    logger.info("")
-                                    logger.info(f"[API SUCCESS] Data retrieved successfully after re-auth")
-                                    return data
-                                else:
-                                    error_text = await retry_response.text()
-                                    logger.info("")
-                                    logger.error(f"[API FAILED] Status code {retry_response.status} after re-auth")
-                                    logger.error(f"[API] Response: {error_text[:500]}...")
-                                    return None
-                        else:
-                            logger.info("")
-                            logger.error("[API] Re-authentication failed")
-                            return None
-                    else:
-                        error_text = await response.text()
-                        logger.info("")
-                        logger.error(f"[API FAILED] Status code {response.status}")
-                        logger.error(f"[API] Response: {error_text[:500]}...")  # First 500 chars
-                        return None
+            session = self.api_client.session
+            async with session.get(api_url, headers=headers) as response:
+                logger.info("")
+                logger.info(f"[API] Response Status: {response.status}")
                 
+                if response.status == 304 and cache:
+                    data = cache.revalidated(api_path)
+                    if data is not None:
+                        logger.info(f"[CACHE] {api_path} not modified, served from cache ({cache.stats()})")
+                        return data
+                if response.status == 200:
+                    data = await self._read_api_response(api_path, response)
+                    logger.info("")
+                    logger.info(f"[API SUCCESS] Data retrieved successfully (Size: {len(str(data))} chars)")
+                    logger.info(f"[API] Response Keys: {list(data.keys()) if isinstance(data, dict) else 'Not a dictionary'}")
+                    logger.info(f"[HTTP] Connection stats: {self.api_client.stats()}")
+                    return data
+                elif response.status == 401:
+                    logger.info("")
+                    logger.warning("[API] Unauthorized - token may be invalid, re-authenticating...")
+                else:
+                    error_text = await response.text()
+                    logger.info("")
+                    logger.error(f"[API FAILED] Status code {response.status}")
+                    logger.error(f"[API] Response: {error_text[:500]}...")  # First 500 chars
+                    return None
+            
+            # 401: refresh once (or join a refresh another job already started) and retry
+            token = await self.token_manager.refresh(stale_token=token)
+            if not token:
+                logger.info("")
+                logger.error("[API] Re-authentication failed")
+                return None
+            headers['Authorization'] = f'Bearer {token}'
+            async with session.get(api_url, headers=headers) as retry_response:
+                if retry_response.status == 304 and cache and cache.lookup(api_path):
+                    return cache.revalidated(api_path)
+                if retry_response.status == 200:
+                    data = await self._read_api_response(api_path, retry_response)
+                    logger.info("")
+                    logger.info(f"[API SUCCESS] Data retrieved successfully after re-auth")
+                    return data
+                else:
+                    error_text = await retry_response.text()
+                    logger.info("")
+                    logger.error(f"[API FAILED] Status code {retry_response.status} after re-auth")
+                    logger.error(f"[API] Response: {error_text[:500]}...")
+                    return None
+            
         except asyncio.TimeoutError:
             logger.info("")
             logger.error(f"[API TIMEOUT] Request timed out after {self.config.API_TIMEOUT} seconds")
@@ -672,6 +1220,17 @@ class ServerPMPDFService:
             logger.error(f"[UNEXPECTED API ERROR] {str(e)}")
             return None
             
+    async def _read_api_response(self, api_path: str, response) -> Any:
+        """Parse a 200 response, keeping the body and its validators in the cache"""
+        body = await response.text()
+        if self.response_cache:
+            self.response_cache.store(
+                api_path, body,
+                etag=response.headers.get('ETag'),
+                last_modified=response.headers.get('Last-Modified'),
+            )
+        return json.loads(body)
+
     def transform_api_data(self, api_data: Dict[str, Any]) -> Dict[str, Any]:
         """Transform API data to match PDF generator expectations"""
         try:
@@ -833,8 +1392,20 @@ class ServerPMPDFService:
             return api_data
             
     async def send_status_update(self, report_id: str, status: str, message: str,
-                                 file_name: Optional[str] = None, topic_key: str = SERVER_REPORT_TOPIC):
-        """Send status update via MQTT"""
+                                 file_name: Optional[str] = None, topic_key: str = SERVER_REPORT_TOPIC,
+                                 extra: Optional[Dict[str, Any]] = None, job: Optional[RenderJob] = None):
+        """Send status update via MQTT, remembering it as the last status of job"""
+        if job:
+            job.last_status = status
+        self.publish_status(report_id, status, message, file_name=file_name, topic_key=topic_key, extra=extra, job=job)
+
+    def publish_status(self, report_id: str, status: str, message: str,
+                       file_name: Optional[str] = None, topic_key: str = SERVER_REPORT_TOPIC,
+                       extra: Optional[Dict[str, Any]] = None, job: Optional[RenderJob] = None):
+        """
+        Publish a status update via MQTT (safe to call from any thread).
+        Statuses about a job carry its request_timestamp as an ordering key.
+        """
         try:
             # Handle both regular and signature topics
             if topic_key == SERVER_REPORT_TOPIC:
@@ -860,6 +1431,15 @@ class ServerPMPDFService:
             }
             if file_name:
                 status_message['file_name'] = file_name
+            if extra:
+                status_message.update(extra)
+            if job:
+                # Set by the requester, so it orders renders of one report across instances:
+                # a completed status older than one already accepted is stale and must be dropped
+                status_message['request_timestamp'] = job.timestamp
+            if self.config.MQTT_CLUSTER_MODE:
+                # Lets clients tell apart statuses from different instances for the same report
+                status_message['instance_id'] = self.config.MQTT_CLIENT_ID
             
             if self.mqtt_client and self.mqtt_client.is_connected():
                 logger.info(f"[MQTT] Publishing status to topic: {status_topic}")
@@ -898,25 +1478,75 @@ class ServerPMPDFService:
             logger.info(f"PDF output directory: {pdf_dir.absolute()}")
             logger.info(f"Image base path: {self.config.IMAGE_BASE_PATH}")
             
-            # Authenticate with API first
-            logger.info("Authenticating with API...")
-            if not await self.authenticate_api():
-                logger.error("Failed to authenticate with API. Service cannot start.")
-                return False
+            # One pooled HTTP session serves every API call for the lifetime of the service
+            self.api_client = ApiHttpClient(self.config)
+            await self.api_client.start()
+            
+            # Authenticate with API first (a persisted, still-valid token skips sign-in)
+            if not self.token_manager.load():
+                logger.info("Authenticating with API...")
+                if not await self.authenticate_api():
+                    logger.error("Failed to authenticate with API. Service cannot start.")
+                    return False
+            self.token_manager.start_refresher()
+            
+            # This loop serves every job for the lifetime of the service
+            self.loop = asyncio.get_running_loop()
+            
+            # Open the job journal so unfinished jobs can be replayed below
+            if self.config.PDF_JOURNAL_ENABLED:
+                self.journal = JobJournal(
+                    self.config.PDF_JOURNAL_PATH,
+                    commit_interval_ms=self.config.PDF_JOURNAL_COMMIT_INTERVAL_MS,
+                )
+                self.journal.open()
+                self.journal.compact(self.config.PDF_JOURNAL_RETENTION_DAYS)
+            
+            # Warm the database connection pool so the first job doesn't pay for the connect
+            try:
+                await self.get_db_manager().connect()
+            except Exception as e:
+                logger.warning(f"[DB] Could not pre-open database connections: {str(e)}")
+            
+            # Reference tables are answered from memory and refreshed in the background
+            await self.load_reference_data()
+            self.log_data_sources()
+            
+            # Start rendering before any message can arrive
+            self.start_rendering()
             
             # Setup and connect MQTT client
             self.setup_mqtt_client()
             
             logger.info(f"Connecting to MQTT broker: {self.config.MQTT_BROKER_HOST}:{self.config.MQTT_BROKER_PORT}")
-            self.mqtt_client.connect(
-                self.config.MQTT_BROKER_HOST, 
-                self.config.MQTT_BROKER_PORT, 
-                60  # keepalive timeout
-            )
+            if self.config.MQTT_CLUSTER_MODE:
+                # Caps QoS 1 deliveries the broker sends ahead of their acks. paho acks as soon as
+                # on_message returns, so this only smooths bursts; the instance's queued work is
+                # bounded by update_intake leaving the shared group when it is at capacity
+                connect_properties = Properties(PacketTypes.CONNECT)
+                connect_properties.ReceiveMaximum = max(
+                    1, self.config.PDF_MAX_CONCURRENT_JOBS + self.config.MQTT_CLUSTER_MAX_BACKLOG
+                )
+                logger.info(f"[CLUSTER] Joining shared subscription group '{self.config.MQTT_SHARED_GROUP}' as {self.config.MQTT_CLIENT_ID}")
+                self.mqtt_client.connect(
+                    self.config.MQTT_BROKER_HOST,
+                    self.config.MQTT_BROKER_PORT,
+                    60,  # keepalive timeout
+                    properties=connect_properties,
+                )
+            else:
+                self.mqtt_client.connect(
+                    self.config.MQTT_BROKER_HOST, 
+                    self.config.MQTT_BROKER_PORT, 
+                    60  # keepalive timeout
+                )
             
             # Start MQTT loop
             self.mqtt_client.loop_start()
             
+            # Pick up whatever the previous run left behind
+            self.replay_pending_jobs()
+            
             logger.info("")
             logger.info("Server PM PDF Service started successfully")
             logger.info("Waiting for MQTT messages...")
@@ -934,6 +1564,168 @@ class ServerPMPDFService:
         finally:
             await self.cleanup()
             
+    def start_rendering(self):
+        """Start the render backend, worker pool, debouncer and watchdog from the current config"""
+        # Warm up the render backend (thread pool or worker processes)
+        self.renderer = create_render_backend(self.config)
+        self.renderer.start()
+        
+        self.worker_pool = RenderWorkerPool(
+            self._process_job,
+            max_workers=self.config.PDF_MAX_CONCURRENT_JOBS,
+            max_queue_size=self.config.PDF_QUEUE_MAX_SIZE,
+            aging_seconds=self.config.PDF_PRIORITY_AGING_SECONDS,
+            job_timeout=self.config.PDF_TIMEOUT_SECONDS,
+        )
+        self.worker_pool.start()
+        self.watchdog_task = self.loop.create_task(self.run_watchdog())
+        self.debouncer = None
+        if self.config.PDF_DEBOUNCE_SECONDS > 0:
+            self.debouncer = RequestDebouncer(
+                self.config.PDF_DEBOUNCE_SECONDS,
+                on_release=self.submit_job,
+                on_superseded=self._on_job_superseded,
+            )
+        if self.config.PRERENDER_ENABLED:
+            if self.prerender_cache is None:
+                self.prerender_cache = PrerenderCache(
+                    self.config.PRERENDER_CACHE_DIR,
+                    max_entries=self.config.PRERENDER_CACHE_MAX_ENTRIES,
+                )
+                self.prerender_cache.open()
+            self.prerender_watcher = PrerenderWatcher(
+                self.poll_changed_reports,
+                self.prerender_report,
+                self.is_render_idle,
+                poll_interval=self.config.PRERENDER_POLL_INTERVAL_SECONDS,
+                max_cpu_fraction=self.config.PRERENDER_MAX_CPU_FRACTION,
+            )
+            self.prerender_watcher.start()
+
+    async def stop_rendering(self):
+        """Stop the pre-render watcher, watchdog, worker pool and render backend"""
+        if self.prerender_watcher:
+            self.prerender_watcher.stop()
+            self.prerender_watcher = None
+        if self.watchdog_task:
+            self.watchdog_task.cancel()
+            self.watchdog_task = None
+        if self.worker_pool:
+            await self.worker_pool.stop()
+        if self.renderer:
+            self.renderer.shutdown()
+
+    def replay_pending_jobs(self):
+        """
+        Re-admit jobs left unfinished by a drain or a crash (skipping the
+        debounce window). Jobs that keep failing to finish are given up on.
+        """
+        jobs = load_pending_jobs(self.config.PDF_PENDING_JOBS_FILE) + self.drain_backlog
+        self.drain_backlog = []
+        if self.journal:
+            # Terminal events recorded during the drain may still be queued for the writer
+            if self.journal.flush():
+                journaled = [RenderJob.from_record(record) for record in self.journal.unfinished_jobs()]
+                # After a crash, jobs that had already started go ahead of those still waiting
+                jobs += sorted(journaled, key=lambda job: job.attempts == 0)
+            else:
+                logger.warning("[JOURNAL] Journal did not flush in time, not replaying from it this time")
+        
+        replayed = {}
+        for job in jobs:
+            # The journal and the drain file usually both know a drained job
+            if job.job_id in replayed:
+                replayed[job.job_id].attempts = max(replayed[job.job_id].attempts, job.attempts)
+                continue
+            replayed[job.job_id] = job
+        if not replayed:
+            return
+        
+        logger.info(f"[JOURNAL] Replaying {len(replayed)} unfinished job(s) from the previous run")
+        for job in replayed.values():
+            if job.attempts >= self.config.PDF_JOURNAL_MAX_ATTEMPTS:
+                logger.error(f"[JOURNAL] Giving up on {job} after {job.attempts} attempts")
+                self.journal_event(job, EVENT_FAILED, {'reason': 'too many attempts'})
+                self.publish_status(
+                    job.report_id,
+                    "failed",
+                    "PDF generation was interrupted too many times, please try again",
+                    topic_key=job.topic_key,
+                    extra={'job_id': job.job_id, 'attempts': job.attempts},
+                    job=job,
+                )
+                continue
+            self.submit_job(job)
+
+    async def drain(self) -> List[RenderJob]:
+        """
+        Stop taking new messages and let running jobs finish within
+        PDF_DRAIN_GRACE_SECONDS. Jobs that did not get to render are
+        persisted to PDF_PENDING_JOBS_FILE and returned.
+        """
+        self.draining = True
+        if self.mqtt_client:
+            if not self.intake_paused:
+                self.unsubscribe_request_topics()
+            logger.info("[DRAIN] Unsubscribed from request topics")
+        
+        # Oldest work first, so it is replayed first: interrupted and queued jobs,
+        # then debounced ones, then messages delivered during the drain
+        leftover = await self.worker_pool.drain(self.config.PDF_DRAIN_GRACE_SECONDS) if self.worker_pool else []
+        if self.debouncer:
+            leftover += self.debouncer.flush()
+        leftover += self.drain_backlog
+        self.drain_backlog = []
+        
+        for job in leftover:
+            if self.inflight_jobs.get(job.key) is job:
+                del self.inflight_jobs[job.key]
+            self.publish_status(
+                job.report_id,
+                "queued",
+                "PDF service is restarting, the request will resume shortly",
+                topic_key=job.topic_key,
+                extra={'job_id': job.job_id, 'requeued': True},
+                job=job,
+            )
+        save_pending_jobs(self.config.PDF_PENDING_JOBS_FILE, leftover)
+        logger.info(f"[DRAIN] Drain complete, {len(leftover)} job(s) persisted to {self.config.PDF_PENDING_JOBS_FILE}")
+        return leftover
+
+    async def shutdown_for_restart(self):
+        """Drain, persist leftover jobs and release resources ahead of a process restart"""
+        await self.drain()
+        await self.cleanup()
+        if self.drain_backlog:
+            # Anything delivered between the drain and the disconnect
+            pending = load_pending_jobs(self.config.PDF_PENDING_JOBS_FILE) + self.drain_backlog
+            save_pending_jobs(self.config.PDF_PENDING_JOBS_FILE, pending)
+            self.drain_backlog = []
+
+    async def reload_in_place(self):
+        """
+        Drain, reload config and the generator modules, and resume with a
+        fresh render backend and worker pool. The MQTT connection, API
+        session and database connection are kept.
+        """
+        await self.drain()
+        await self.stop_rendering()
+        
+        for name in RELOADABLE_MODULES:
+            module = sys.modules.get(name)
+            if module is not None:
+                importlib.reload(module)
+                logger.info(f"[RELOAD] Reloaded {name}")
+        self.config = sys.modules['config'].config
+        
+        self.start_rendering()
+        self.draining = False
+        self.intake_paused = False
+        self.replay_pending_jobs()
+        if self.mqtt_client and not self.intake_paused:
+            self.subscribe_request_topics()
+        logger.info("[RELOAD] Service reloaded in place")
+
     async def cleanup(self):
         """Cleanup resources"""
         try:
@@ -944,12 +1736,25 @@ class ServerPMPDFService:
                 self.mqtt_client.loop_stop()
                 self.mqtt_client.disconnect()
                 
+            await self.stop_rendering()
+            
+            if self.journal:
+                self.journal.close()
+                
             if self.db_manager:
                 await self.db_manager.disconnect()
                 
             if self.session:
                 self.session.close()
                 
+            self.token_manager.stop()
+            
+            if self.reference_data:
+                self.reference_data.stop()
+                
+            if self.api_client:
+                await self.api_client.close()
+                
             logger.info("")
             logger.info("Cleanup completed")
             
@@ -961,29 +1766,45 @@ async def main():
     """Main entry point"""
     try:
         service = ServerPMPDFService()
+        start_refresh_listener(service)
         await service.start_service()
     except Exception as e:
         logger.info("")
         logger.error(f"Fatal error: {str(e)}")
         sys.exit(1)
 
-def start_refresh_listener():
-    """Listen for keyboard input to refresh the service"""
+def start_refresh_listener(service: ServerPMPDFService):
+    """
+    Listen for keyboard input to refresh the service.
+    'r' drains and restarts the process, 'l' drains and reloads config and
+    generators in place. Either way running jobs get a grace period and
+    queued jobs are carried over.
+    """
     def _listener():
         logger.info("")
-        logger.info("Press 'r' + Enter at any time to refresh the PDF service.")
+        logger.info("Press 'r' + Enter to restart or 'l' + Enter to reload the PDF service in place.")
         for line in sys.stdin:
-            if line.strip().lower() == 'r':
-                logger.info("")
-                logger.info("[REFRESH] Refresh command received. Restarting service...")
-                try:
+            command = line.strip().lower()
+            if command not in ('r', 'l'):
+                continue
+            if service.loop is None or service.draining:
+                logger.warning("[REFRESH] Service is not ready for a refresh yet")
+                continue
+            logger.info("")
+            try:
+                if command == 'r':
+                    logger.info("[REFRESH] Refresh command received. Draining before restart...")
+                    asyncio.run_coroutine_threadsafe(service.shutdown_for_restart(), service.loop).result()
+                    logger.info("[REFRESH] Restarting service...")
                     os.execv(sys.executable, [sys.executable] + sys.argv)
-                except Exception as exc:
-                    logger.error(f"Failed to restart service: {exc}")
+                else:
+                    logger.info("[REFRESH] Reload command received. Draining before reload...")
+                    asyncio.run_coroutine_threadsafe(service.reload_in_place(), service.loop).result()
+            except Exception as exc:
+                logger.error(f"Failed to refresh service: {exc}")
     thread = threading.Thread(target=_listener, daemon=True)
     thread.start()
 
 if __name__ == "__main__":
     # Run the service
-    start_refresh_listener()
     asyncio.run(main())
@@ -0,0 +1,233 @@
+"""
+Speculative pre-rendering.
+
+Final reports are requested while a user waits to close the job, so reports
+that changed recently are rendered ahead of time. A watcher polls
+ReportForms.UpdatedDate and renders changed reports one at a time, only
+while the service has no client work, straight into a cache directory (never
+PDF_OUTPUT_DIR, where client renders are written and cleaned up). Each cached
+PDF carries the report's fingerprint taken before its data was fetched; a
+request whose report still has that fingerprint is answered by moving the
+cached file into place instead of rendering.
+
+CPU use is capped with a duty cycle: after a render that took t seconds
+the watcher rests t * (1 - f) / f seconds, so pre-rendering keeps at most a
+fraction f of one render worker busy. A client request arriving mid-render
+cancels the speculative render, which is retried later.
+"""
+import asyncio
+import logging
+import os
+import shutil
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from render_control import CancellationToken, RenderCancelled
+
+logger = logging.getLogger(__name__)
+
+
+class PrerenderedReport:
+    """A cached speculative render"""
+
+    __slots__ = ('path', 'fingerprint', 'job_no', 'report_type', 'rendered_at')
+
+    def __init__(self, path: str, fingerprint: Hashable, job_no: str, report_type: str):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.job_no = job_no
+        self.report_type = report_type
+        self.rendered_at = time.monotonic()
+
+
+class PrerenderCache:
+    """LRU of pre-rendered PDFs on disk, keyed by (topic_key, report_id)"""
+
+    def __init__(self, directory: str, max_entries: int = 100):
+        self.directory = Path(directory)
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[Tuple[str, str], PrerenderedReport]" = OrderedDict()
+        self._counters = {
+            'stored': 0,
+            'hits': 0,
+            'stale': 0,
+            'evictions': 0,
+        }
+
+    def open(self):
+        """Create the cache directory and drop files left by a previous run (entries are not persisted)"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for leftover in self.directory.glob('*.pdf'):
+            self._remove_file(str(leftover))
+
+    def fingerprint_of(self, key: Tuple[str, str]) -> Optional[Hashable]:
+        entry = self._entries.get(key)
+        return entry.fingerprint if entry else None
+
+    def store(self, key: Tuple[str, str], fingerprint: Hashable, pdf_path: str, job_no: str, report_type: str):
+        """Move a freshly rendered PDF into the cache"""
+        cached_path = str(self.directory / f"{uuid.uuid4().hex}.pdf")
+        shutil.move(pdf_path, cached_path)
+        self.discard(key)
+        self._entries[key] = PrerenderedReport(cached_path, fingerprint, job_no, report_type)
+        self._counters['stored'] += 1
+        while len(self._entries) > self.max_entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._remove_file(evicted.path)
+            self._counters['evictions'] += 1
+
+    def take(self, key: Tuple[str, str], fingerprint: Hashable) -> Optional[PrerenderedReport]:
+        """
+        Remove and return the entry for key if it was rendered from data with
+        this fingerprint. The caller owns the returned file.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        if entry.fingerprint != fingerprint or not os.path.exists(entry.path):
+            self._remove_file(entry.path)
+            self._counters['stale'] += 1
+            return None
+        self._counters['hits'] += 1
+        return entry
+
+    def discard(self, key: Tuple[str, str]):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._remove_file(entry.path)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._counters)
+        stats['entries'] = len(self._entries)
+        return stats
+
+    @staticmethod
+    def _remove_file(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class PrerenderWatcher:
+    """Polls for changed reports and renders them in the background under a CPU budget"""
+
+    def __init__(self,
+                 poll_changes: Callable[[Optional[Any]], Awaitable[Tuple[Any, List[Tuple[str, str]]]]],
+                 render: Callable[[str, str, CancellationToken], Awaitable[None]],
+                 is_idle: Callable[[], bool],
+                 poll_interval: float = 30,
+                 max_cpu_fraction: float = 0.25,
+                 max_pending: int = 200):
+        """
+        Args:
+            poll_changes: Called with the watermark of the previous poll (None at first);
+                returns (new_watermark, [(topic_key, report_id), ...]) for reports changed since
+            render: Pre-renders one report, honouring the cancellation token
+            is_idle: True when no client request is queued or rendering
+            poll_interval: Seconds between polls
+            max_cpu_fraction: Share of one render worker pre-rendering may use (0-1]
+            max_pending: Reports waiting to be pre-rendered; the oldest are dropped beyond this
+        """
+        self.poll_changes = poll_changes
+        self.render = render
+        self.is_idle = is_idle
+        self.poll_interval = max(1.0, poll_interval)
+        self.max_cpu_fraction = min(1.0, max(0.01, max_cpu_fraction))
+        self.max_pending = max(1, max_pending)
+        self.watermark = None
+        self._pending: "OrderedDict[Tuple[str, str], None]" = OrderedDict()
+        self._wake = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._current: Optional[CancellationToken] = None
+        self._busy_seconds = 0.0
+        self._counters = {
+            'polls': 0,
+            'changes_seen': 0,
+            'rendered': 0,
+            'yielded': 0,
+            'failed': 0,
+            'dropped': 0,
+        }
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._run_poller()), loop.create_task(self._run_renderer())]
+        logger.info(
+            f"[PRERENDER] Watching for changed reports every {self.poll_interval}s "
+            f"(CPU budget {self.max_cpu_fraction:.0%} of one worker)"
+        )
+
+    def stop(self):
+        self.yield_to_requests()
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    def yield_to_requests(self):
+        """Cancel the speculative render in progress so client work gets the worker"""
+        if self._current is not None and not self._current.is_cancelled():
+            self._current.cancel("yielding to a client request")
+
+    def forget(self, topic_key: str, report_id: str):
+        """Drop a pending pre-render (e.g. the report was just rendered for a client)"""
+        self._pending.pop((topic_key, report_id), None)
+
+    async def _run_poller(self):
+        while True:
+            try:
+                watermark, changes = await self.poll_changes(self.watermark)
+                self._counters['polls'] += 1
+                for key in changes:
+                    self._pending.pop(key, None)
+                    self._pending[key] = None
+                    self._counters['changes_seen'] += 1
+                if watermark is not None:
+                    self.watermark = watermark
+                while len(self._pending) > self.max_pending:
+                    self._pending.popitem(last=False)
+                    self._counters['dropped'] += 1
+                if self._pending:
+                    self._wake.set()
+            except Exception as e:
+                logger.warning(f"[PRERENDER] Polling for changed reports failed: {str(e)}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def _run_renderer(self):
+        while True:
+            await self._wake.wait()
+            if not self._pending:
+                self._wake.clear()
+                continue
+            if not self.is_idle():
+                await asyncio.sleep(1.0)
+                continue
+
+            (topic_key, report_id), _ = self._pending.popitem(last=False)
+            token = self._current = CancellationToken()
+            started = time.monotonic()
+            try:
+                await self.render(topic_key, report_id, token)
+                self._counters['rendered'] += 1
+            except RenderCancelled:
+                # Retry once the service is idle again, unless a newer change queued it already
+                self._pending.setdefault((topic_key, report_id), None)
+                self._counters['yielded'] += 1
+            except Exception as e:
+                self._counters['failed'] += 1
+                logger.warning(f"[PRERENDER] Pre-render of {report_id} ({topic_key}) failed: {str(e)}")
+            finally:
+                self._current = None
+
+            busy = time.monotonic() - started
+            self._busy_seconds += busy
+            await asyncio.sleep(busy * (1 - self.max_cpu_fraction) / self.max_cpu_fraction)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._counters)
+        stats['pending'] = len(self._pending)
+        stats['busy_seconds'] = round(self._busy_seconds, 1)
+        return stats
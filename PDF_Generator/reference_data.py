@@ -0,0 +1,187 @@
+"""
+In-memory cache of SQL Server reference tables.
+
+Image types, report form types and the status lookup tables change
+rarely, so they are loaded once at startup, refreshed in the background
+every ttl_seconds and answered from memory. Queries that used to join them
+on every request (image manifest, pre-render poll, Server PM report) look
+the names up here instead, and renders receive an immutable snapshot
+through report_data (it has to survive pickling into render processes), so
+label resolution costs no round trip.
+"""
+import asyncio
+import logging
+import re
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from database_manager import RESULT_TUPLES
+
+logger = logging.getLogger(__name__)
+
+# Every query returns (ID, Name). A table that fails to load keeps its
+# previous values (or stays empty) and the generators fall back to their
+# built-in mappings.
+REFERENCE_QUERIES = {
+    'image_types': "SELECT ID, ImageTypeName FROM ReportFormImageTypes",
+    'report_form_types': "SELECT ID, Name FROM ReportFormTypes",
+    'pm_report_form_types': "SELECT ID, Name FROM PMReportFormTypes",
+}
+
+# The status lookup tables are not referenced anywhere else in this schema.
+# A configured table is used as given; otherwise the first of these names
+# that exists with ID and Name columns is used, and none means the built-in
+# status labels.
+STATUS_TABLE_CANDIDATES = {
+    'yes_no_statuses': ('YesNoStatuses', 'YesNoStatus'),
+    'result_statuses': ('ResultStatuses', 'ResultStatus'),
+    'server_disk_statuses': ('ServerDiskStatuses', 'ServerDiskStatus'),
+    'asa_firewall_statuses': ('ASAFirewallStatuses', 'ASAFirewallStatus'),
+}
+STATUS_TABLE_QUERY = "SELECT ID, Name FROM {table}"
+
+# Optionally schema-qualified, e.g. dbo.YesNoStatuses (names are put into SQL as they are)
+_TABLE_NAME = re.compile(r'^[\w\[\]]+(\.[\w\[\]]+)?$')
+
+
+def reference_key(value: Any) -> str:
+    """Lookup key for an ID: GUIDs are case-insensitive and ints may arrive as strings"""
+    return str(value).strip().lower()
+
+
+class ReferenceDataCache:
+    """TTL-refreshed copy of the reference tables, keyed by reference_key(ID)"""
+
+    def __init__(self, db_manager, ttl_seconds: float = 3600, status_tables: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            db_manager: DatabaseManager the tables are read through
+            ttl_seconds: Reload interval
+            status_tables: Cache name -> SQL table (ID, Name) for the status lookups;
+                names with no table are looked up in STATUS_TABLE_CANDIDATES
+        """
+        self.db_manager = db_manager
+        self.ttl_seconds = max(1, ttl_seconds)
+        self.queries = dict(REFERENCE_QUERIES)
+        self.status_tables: Dict[str, Optional[str]] = {}
+        for name in STATUS_TABLE_CANDIDATES:
+            table = (status_tables or {}).get(name) or None
+            if table and not _TABLE_NAME.match(table):
+                logger.warning(f"[REFERENCE] Ignoring invalid table name for {name}: '{table}'")
+                table = None
+            self.status_tables[name] = table
+        self._statuses_resolved = False
+        self._tables: Dict[str, Dict[str, str]] = {name: {} for name in (*self.queries, *STATUS_TABLE_CANDIDATES)}
+        self.loaded_at: Optional[float] = None
+        self._refresher: Optional[asyncio.Task] = None
+        self._counters = {
+            'loads': 0,
+            'table_failures': 0,
+        }
+
+    async def load(self) -> bool:
+        """(Re)load every table; returns False if any table failed"""
+        if not self._statuses_resolved:
+            await self._resolve_status_tables()
+        names = list(self.queries)
+        results = await asyncio.gather(
+            *(self.db_manager.execute_query(self.queries[name], mode=RESULT_TUPLES) for name in names),
+            return_exceptions=True,
+        )
+        tables = dict(self._tables)
+        ok = True
+        for name, result in zip(names, results):
+            if isinstance(result, BaseException):
+                ok = False
+                self._counters['table_failures'] += 1
+                logger.warning(f"[REFERENCE] Could not load {name}: {str(result)}")
+                continue
+            tables[name] = {
+                reference_key(row_id): label
+                for row_id, label in result
+                if row_id is not None and label is not None
+            }
+        # Replace the whole mapping so snapshots handed out earlier never change
+        self._tables = tables
+        self.loaded_at = time.monotonic()
+        self._counters['loads'] += 1
+        logger.info(
+            "[REFERENCE] Loaded reference data: "
+            + ", ".join(f"{name}={len(values)}" for name, values in tables.items())
+        )
+        return ok
+
+    async def _resolve_status_tables(self):
+        """Find the status tables that were not configured, among the candidate names"""
+        wanted = {
+            candidate: name
+            for name, candidates in STATUS_TABLE_CANDIDATES.items() if not self.status_tables[name]
+            for candidate in candidates
+        }
+        found = set()
+        if wanted:
+            query = """
+                SELECT TABLE_NAME FROM INFORMATION_SCHEMA.COLUMNS
+                WHERE TABLE_NAME IN ({}) AND COLUMN_NAME IN ('ID', 'Name')
+                GROUP BY TABLE_SCHEMA, TABLE_NAME
+                HAVING COUNT(*) = 2
+            """.format(', '.join('?' * len(wanted)))
+            try:
+                rows = await self.db_manager.execute_query(query, tuple(wanted), mode=RESULT_TUPLES)
+                found = {table.lower() for table in rows.column('TABLE_NAME')}
+            except Exception as e:
+                # Retried on the next load
+                logger.warning(f"[REFERENCE] Could not look up the status tables: {str(e)}")
+                return
+        for name, candidates in STATUS_TABLE_CANDIDATES.items():
+            if not self.status_tables[name]:
+                self.status_tables[name] = next((table for table in candidates if table.lower() in found), None)
+            if self.status_tables[name]:
+                self.queries[name] = STATUS_TABLE_QUERY.format(table=self.status_tables[name])
+            else:
+                logger.info(f"[REFERENCE] No table found for {name}; using the built-in status labels")
+        self._statuses_resolved = True
+
+    def is_loaded(self, table: str) -> bool:
+        """True once table holds rows, so lookups can replace a join"""
+        return bool(self._tables.get(table))
+
+    def snapshot(self) -> Dict[str, Dict[str, str]]:
+        """Current tables; treat as read-only"""
+        return self._tables
+
+    def label(self, table: str, row_id: Any) -> Optional[str]:
+        if row_id is None:
+            return None
+        return self._tables.get(table, {}).get(reference_key(row_id))
+
+    def missing_names(self, table: str, names: Iterable[str]) -> List[str]:
+        """Names the code relies on that are not present in a loaded table"""
+        values = self._tables.get(table)
+        if not values:
+            return []
+        known = set(values.values())
+        return [name for name in names if name not in known]
+
+    def start_refresher(self):
+        """Reload the tables every ttl_seconds for as long as the service runs"""
+        self._refresher = asyncio.get_running_loop().create_task(self._run_refresher())
+
+    async def _run_refresher(self):
+        while True:
+            await asyncio.sleep(self.ttl_seconds)
+            try:
+                await self.load()
+            except Exception as e:
+                logger.error(f"[REFERENCE] Reference data refresh failed: {str(e)}")
+
+    def stop(self):
+        if self._refresher:
+            self._refresher.cancel()
+            self._refresher = None
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._counters)
+        stats['tables'] = {name: len(values) for name, values in self._tables.items()}
+        stats['age_seconds'] = round(time.monotonic() - self.loaded_at, 1) if self.loaded_at else None
+        return stats
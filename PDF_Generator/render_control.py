@@ -0,0 +1,94 @@
+"""
+Cooperative cancellation for PDF renders.
+
+Generators call checkpoint() between sections and on every page; once the
+job's token is cancelled the next checkpoint raises RenderCancelled and the
+partial output is discarded. Tokens survive pickling, so the same checkpoints
+work inside process-pool workers through a small flag file.
+"""
+import asyncio
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RenderCancelled(Exception):
+    """Raised at a checkpoint once the render's job has been cancelled"""
+
+
+class CancellationToken:
+    """Thread-safe (and, with a flag file, process-safe) cancellation flag"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.reason = None
+        self.flag_path = None
+
+    def cancel(self, reason: str = "cancelled"):
+        """Request cancellation; running renders stop at their next checkpoint"""
+        self.reason = reason
+        self._event.set()
+        if self.flag_path:
+            try:
+                Path(self.flag_path).touch()
+            except OSError as e:
+                logger.warning(f"[CANCEL] Could not write cancel flag {self.flag_path}: {str(e)}")
+
+    def is_cancelled(self) -> bool:
+        if self._event.is_set():
+            return True
+        return bool(self.flag_path) and os.path.exists(self.flag_path)
+
+    def raise_if_cancelled(self, stage: Optional[str] = None):
+        if self.is_cancelled():
+            where = f" at {stage}" if stage else ""
+            raise RenderCancelled(f"Render {self.reason or 'cancelled'}{where}")
+
+    def enable_cross_process(self, flag_dir: str, name: str):
+        """Mirror cancellation into a flag file that worker processes can see"""
+        Path(flag_dir).mkdir(parents=True, exist_ok=True)
+        self.flag_path = str(Path(flag_dir) / f"{name}.cancel")
+        if self._event.is_set():
+            self.cancel(self.reason)
+
+    def release(self):
+        """Remove the flag file, if any"""
+        if self.flag_path:
+            try:
+                os.remove(self.flag_path)
+            except OSError:
+                pass
+
+    async def wait_cancelled(self, poll_interval: float = 0.2):
+        """Resolve once the token is cancelled"""
+        while not self.is_cancelled():
+            await asyncio.sleep(poll_interval)
+
+    def __getstate__(self):
+        # threading.Event cannot be pickled; workers rely on the flag file
+        return {'reason': self.reason, 'flag_path': self.flag_path}
+
+    def __setstate__(self, state):
+        self._event = threading.Event()
+        self.reason = state['reason']
+        self.flag_path = state['flag_path']
+
+
+def checkpoint(cancel_token: Optional[CancellationToken], stage: Optional[str] = None):
+    """Raise RenderCancelled if the token has been cancelled (no-op without a token)"""
+    if cancel_token is not None:
+        cancel_token.raise_if_cancelled(stage)
+
+
+def discard_partial_output(pdf_path):
+    """Delete a partially written PDF left behind by a cancelled render"""
+    if pdf_path and os.path.exists(str(pdf_path)):
+        try:
+            os.remove(str(pdf_path))
+            logger.info(f"[CANCEL] Removed partial PDF: {pdf_path}")
+        except OSError as e:
+            logger.warning(f"[CANCEL] Could not remove partial PDF {pdf_path}: {str(e)}")
@@ -0,0 +1,317 @@
+"""
+PDF rendering backends.
+
+thread  - renders on a thread pool inside the service process
+process - renders on warm worker processes so ReportLab's doc.build runs
+          outside the service's GIL; only the transformed report dict goes
+          in and only the output path comes back
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+from render_control import CancellationToken, RenderCancelled
+
+logger = logging.getLogger(__name__)
+
+REPORT_KIND_SERVER_PM = 'server_pm'
+REPORT_KIND_CM = 'cm'
+REPORT_KIND_RTU_PM = 'rtu_pm'
+
+# Generators keep per-render state on the instance, so every render thread
+# (and every worker process) gets its own set
+_local = threading.local()
+
+
+class RenderTimeoutError(Exception):
+    """Raised when a render does not finish within the configured timeout"""
+
+
+def _load_generators() -> Dict[str, Any]:
+    """Import and instantiate one generator per report kind"""
+    from Server_PM_Report.server_pm_pdf_generator import ServerPMPDFGenerator
+    from CM_Report.cm_pdf_generator import CMReportPDFGenerator
+    from RTU_PM_Report.rtu_pdf_generator import RTUPMPDFGenerator
+
+    return {
+        REPORT_KIND_SERVER_PM: ServerPMPDFGenerator(),
+        REPORT_KIND_CM: CMReportPDFGenerator(),
+        REPORT_KIND_RTU_PM: RTUPMPDFGenerator(),
+    }
+
+
+def _get_generators() -> Dict[str, Any]:
+    generators = getattr(_local, 'generators', None)
+    if generators is None:
+        generators = _local.generators = _load_generators()
+    return generators
+
+
+def _init_render_worker():
+    """Process pool initializer: preload the generators once per worker"""
+    _get_generators()
+    logger.info(f"[RENDER] Worker process {multiprocessing.current_process().name} ready")
+
+
+def _warm_up() -> bool:
+    return True
+
+
+def render_report(kind: str, report_data: Dict[str, Any], job_no: str, report_type: str,
+                  cancel_token: Optional[CancellationToken] = None,
+                  output_dir: Optional[str] = None) -> Optional[str]:
+    """
+    Render a report with the calling thread's (or process's) generators.
+
+    Args:
+        kind: One of REPORT_KIND_SERVER_PM, REPORT_KIND_CM, REPORT_KIND_RTU_PM
+        report_data: Transformed report dict
+        job_no: Job number used in the file name
+        report_type: Report type prefix used in the file name
+        cancel_token: Checked by the generator between sections and pages
+        output_dir: Directory to write the PDF to instead of PDF_OUTPUT_DIR
+
+    Returns:
+        Path of the generated PDF, or None if generation failed
+
+    Raises:
+        RenderCancelled: If the token was cancelled before the render finished
+    """
+    generator = _get_generators()[kind]
+    if kind == REPORT_KIND_SERVER_PM:
+        pdf_path = generator.generate_comprehensive_pdf(
+            report_data, job_no, report_type, cancel_token=cancel_token, output_dir=output_dir
+        )
+    else:
+        pdf_path = generator.generate_pdf(report_data, job_no, report_type, cancel_token=cancel_token, output_dir=output_dir)
+    return str(pdf_path) if pdf_path else None
+
+
+async def _await_render(future, cancel_token: Optional[CancellationToken], timeout: float):
+    """
+    Wait for a render future, giving up early on cancellation or timeout.
+    An abandoned render keeps running until its next checkpoint, where the
+    cancelled token makes it discard its partial output.
+    """
+    future = asyncio.ensure_future(future)
+    watchers = {future}
+    cancel_watch = None
+    if cancel_token is not None:
+        cancel_watch = asyncio.ensure_future(cancel_token.wait_cancelled())
+        watchers.add(cancel_watch)
+    try:
+        done, _ = await asyncio.wait(watchers, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        if cancel_watch:
+            cancel_watch.cancel()
+
+    if future in done:
+        return future.result()
+
+    future.cancel()
+    if cancel_watch in done:
+        raise RenderCancelled(f"Render {cancel_token.reason or 'cancelled'}")
+    if cancel_token is not None:
+        cancel_token.cancel("timed out")
+    raise RenderTimeoutError(f"Render did not finish within {timeout} seconds")
+
+
+class _AbandonedRenders:
+    """Renders we stopped waiting for, kept until their worker lets go of them"""
+
+    def __init__(self):
+        self._futures = {}
+
+    def add(self, future):
+        if not future.done():
+            self._futures[future] = time.monotonic()
+
+    def stuck(self, grace_seconds: float) -> int:
+        """Number of abandoned renders still running grace_seconds after being abandoned"""
+        now = time.monotonic()
+        for future in [f for f in self._futures if f.done()]:
+            del self._futures[future]
+        return sum(1 for abandoned_at in self._futures.values() if now - abandoned_at >= grace_seconds)
+
+    def clear(self):
+        self._futures.clear()
+
+
+def _effective_timeout(default: float, timeout: Optional[float]) -> float:
+    if timeout is None:
+        return default
+    return max(0.0, min(default, timeout))
+
+
+class ThreadRenderBackend:
+    """Render on a bounded thread pool inside the service process"""
+
+    mode = 'thread'
+
+    def __init__(self, max_workers: int, timeout: float):
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.executor = self._new_executor()
+        self._abandoned = _AbandonedRenders()
+
+    def _new_executor(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pdf-render")
+
+    def start(self):
+        logger.info(f"[RENDER] Thread render backend with {self.max_workers} threads")
+
+    async def render(self, kind: str, report_data: Dict[str, Any], job_no: str, report_type: str,
+                     cancel_token: Optional[CancellationToken] = None,
+                     timeout: Optional[float] = None,
+                     output_dir: Optional[str] = None) -> Optional[str]:
+        future = self.executor.submit(render_report, kind, report_data, job_no, report_type, cancel_token, output_dir)
+        try:
+            return await _await_render(
+                asyncio.wrap_future(future), cancel_token, _effective_timeout(self.timeout, timeout)
+            )
+        except (RenderTimeoutError, RenderCancelled, asyncio.CancelledError):
+            self._abandoned.add(future)
+            raise
+
+    def reap_stuck_workers(self, grace_seconds: float) -> int:
+        """
+        Replace the thread pool if abandoned renders ignore their cancel token.
+        Threads cannot be killed; the stuck ones are left to finish on the old
+        pool while new renders get a full complement of fresh threads.
+        """
+        stuck = self._abandoned.stuck(grace_seconds)
+        if not stuck:
+            return 0
+        logger.warning(f"[WATCHDOG] {stuck} render thread(s) stuck past their deadline, replacing the render thread pool")
+        old_executor, self.executor = self.executor, self._new_executor()
+        old_executor.shutdown(wait=False)
+        self._abandoned.clear()
+        return stuck
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+
+class ProcessRenderBackend:
+    """Render on warm worker processes, recycled after a fixed number of jobs"""
+
+    mode = 'process'
+
+    def __init__(self, max_workers: int, max_jobs_per_worker: int, timeout: float):
+        self.max_workers = max(1, max_workers)
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.timeout = timeout
+        self.executor = None
+        self._abandoned = _AbandonedRenders()
+        # Cancel flags shared with the worker processes
+        self.flag_dir = os.path.join(tempfile.gettempdir(), f"controltower_pdf_cancel_{os.getpid()}")
+
+    def start(self):
+        self.executor = self._new_executor()
+
+        # Spawn and preload the workers now rather than on the first request
+        for _ in range(self.max_workers):
+            self.executor.submit(_warm_up)
+        logger.info(
+            f"[RENDER] Process render backend with {self.max_workers} workers "
+            f"(max {self.max_jobs_per_worker or 'unlimited'} jobs per worker)"
+        )
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # spawn matches Windows behaviour everywhere and is required for
+        # max_tasks_per_child
+        options = {
+            'max_workers': self.max_workers,
+            'mp_context': multiprocessing.get_context('spawn'),
+            'initializer': _init_render_worker,
+        }
+        if self.max_jobs_per_worker > 0:
+            if sys.version_info >= (3, 11):
+                options['max_tasks_per_child'] = self.max_jobs_per_worker
+            else:
+                logger.warning("[RENDER] Worker recycling needs Python 3.11+, workers will not be recycled")
+        return ProcessPoolExecutor(**options)
+
+    async def render(self, kind: str, report_data: Dict[str, Any], job_no: str, report_type: str,
+                     cancel_token: Optional[CancellationToken] = None,
+                     timeout: Optional[float] = None,
+                     output_dir: Optional[str] = None) -> Optional[str]:
+        if cancel_token is not None:
+            cancel_token.enable_cross_process(self.flag_dir, f"{os.getpid()}_{id(cancel_token):x}")
+        started = time.monotonic()
+        executor = self.executor
+        try:
+            return await self._submit(executor, kind, report_data, job_no, report_type, cancel_token, timeout, output_dir)
+        except BrokenProcessPool:
+            if self.executor is executor:
+                raise
+            # The watchdog replaced the pool under us while reaping a stuck worker
+            logger.warning(f"[RENDER] Render pool was replaced mid-render, retrying {job_no} once")
+            remaining = _effective_timeout(self.timeout, timeout) - (time.monotonic() - started)
+            return await self._submit(
+                self.executor, kind, report_data, job_no, report_type, cancel_token, remaining, output_dir
+            )
+
+    async def _submit(self, executor, kind, report_data, job_no, report_type, cancel_token, timeout, output_dir=None):
+        future = executor.submit(render_report, kind, report_data, job_no, report_type, cancel_token, output_dir)
+        if cancel_token is not None:
+            # Keep the flag until the worker is really done, even if we stop waiting
+            future.add_done_callback(lambda _: cancel_token.release())
+        try:
+            return await _await_render(
+                asyncio.wrap_future(future), cancel_token, _effective_timeout(self.timeout, timeout)
+            )
+        except (RenderTimeoutError, RenderCancelled, asyncio.CancelledError):
+            self._abandoned.add(future)
+            raise
+
+    def reap_stuck_workers(self, grace_seconds: float) -> int:
+        """
+        Kill the worker processes if abandoned renders ignore their cancel
+        token, and continue on a freshly warmed pool. Healthy renders caught
+        on the old pool are retried once by render().
+        """
+        stuck = self._abandoned.stuck(grace_seconds)
+        if not stuck:
+            return 0
+        logger.warning(f"[WATCHDOG] {stuck} render worker(s) stuck past their deadline, restarting the render processes")
+        old_executor = self.executor
+        self.executor = self._new_executor()
+        for _ in range(self.max_workers):
+            self.executor.submit(_warm_up)
+        # ProcessPoolExecutor has no public way to kill a busy worker
+        for process in list((getattr(old_executor, '_processes', None) or {}).values()):
+            if process.is_alive():
+                process.terminate()
+        old_executor.shutdown(wait=False, cancel_futures=True)
+        self._abandoned.clear()
+        return stuck
+
+    def shutdown(self):
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def create_render_backend(config):
+    """Build the render backend selected by config.PDF_RENDER_MODE"""
+    mode = (config.PDF_RENDER_MODE or 'thread').lower()
+    if mode == 'process':
+        return ProcessRenderBackend(
+            max_workers=config.PDF_RENDER_PROCESSES,
+            max_jobs_per_worker=config.PDF_RENDER_MAX_JOBS_PER_WORKER,
+            timeout=config.PDF_RENDER_TIMEOUT_SECONDS,
+        )
+    if mode != 'thread':
+        logger.warning(f"[RENDER] Unknown PDF_RENDER_MODE '{mode}', falling back to thread")
+    return ThreadRenderBackend(
+        max_workers=config.PDF_MAX_CONCURRENT_JOBS,
+        timeout=config.PDF_RENDER_TIMEOUT_SECONDS,
+    )
@@ -0,0 +1,196 @@
+"""
+Report data sources.
+
+Report data normally comes from the .NET API. For Server PM reports it can
+also be read straight from SQL Server through DatabaseManager, shaped like
+the API response (camelCase keys, JSON-compatible values, sections nested
+as header DTOs with their detail lists, status names next to status IDs) so
+the same transform_* step and generators apply. The parity mode fetches
+both, renders from the API and logs where the database payload differs,
+which is how the database path is validated before switching a report type
+to it.
+"""
+import uuid
+from datetime import date, datetime, time as dt_time
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional
+
+DATA_SOURCE_API = 'api'
+DATA_SOURCE_DB = 'db'
+DATA_SOURCE_PARITY = 'parity'
+DATA_SOURCES = (DATA_SOURCE_API, DATA_SOURCE_DB, DATA_SOURCE_PARITY)
+
+# Status IDs the API returns with their name alongside:
+# ID field -> (name field, reference-data table)
+STATUS_NAME_FIELDS = {
+    'resultStatusID': ('resultStatusName', 'result_statuses'),
+    'yesNoStatusID': ('yesNoStatusName', 'yes_no_statuses'),
+    'serverDiskStatusID': ('serverDiskStatusName', 'server_disk_statuses'),
+    'asaFirewallStatusID': ('asaFirewallStatusName', 'asa_firewall_statuses'),
+}
+
+# Columns of DatabaseManager's main Server PM query, by the API object they belong to
+_REPORT_FORM_COLUMNS = {
+    'ReportFormID': 'id',
+    'JobNo': 'jobNo',
+    'SystemNameWarehouseID': 'systemNameWarehouseID',
+    'StationNameWarehouseID': 'stationNameWarehouseID',
+    'CreatedDate': 'createdDate',
+    'UpdatedDate': 'updatedDate',
+    'SystemDescription': 'systemDescription',
+    'StationName': 'stationName',
+    'ReportFormTypeName': 'reportFormTypeName',
+}
+_PM_REPORT_FORM_SERVER_COLUMNS = {
+    'PMReportFormServerID': 'id',
+    'ReportFormID': 'reportFormID',
+    'PMReportFormTypeID': 'pmReportFormTypeID',
+    'PMReportFormTypeName': 'pmReportFormTypeName',
+    'ProjectNo': 'projectNo',
+    'Customer': 'customer',
+    'ReportTitle': 'reportTitle',
+    'DateOfService': 'dateOfService',
+    'AttendedBy': 'attendedBy',
+    'WitnessedBy': 'witnessedBy',
+    'StartDate': 'startDate',
+    'CompletionDate': 'completionDate',
+    'ApprovedBy': 'approvedBy',
+    'SignOffRemarks': 'remarks',
+}
+# pmReportFormServer fields the API repeats under signOffData
+_SIGN_OFF_FIELDS = ('attendedBy', 'witnessedBy', 'startDate', 'completionDate', 'approvedBy', 'remarks')
+
+
+def to_camel_case(name: str) -> str:
+    """Column name as the API serializes it (System.Text.Json camelCase: 'CPUUsage' -> 'cpuUsage')"""
+    if not name or not name[0].isupper():
+        return name
+    chars = list(name)
+    for i in range(len(chars)):
+        if i == 1 and not chars[i].isupper():
+            break
+        has_next = i + 1 < len(chars)
+        # Stop before the first letter of the next word
+        if i > 0 and has_next and not chars[i + 1].isupper():
+            if chars[i + 1] == ' ':
+                chars[i] = chars[i].lower()
+            break
+        chars[i] = chars[i].lower()
+    return ''.join(chars)
+
+
+def to_json_value(value: Any) -> Any:
+    """Convert a driver value to what the API's JSON would have carried"""
+    if isinstance(value, (datetime, date, dt_time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+    return value
+
+
+def api_record(row: Dict[str, Any], status_label: Optional[Callable[[str, Any], Optional[str]]] = None) -> Dict[str, Any]:
+    """
+    A database row as an API DTO: camelCase keys, JSON values, nested detail
+    lists converted the same way and a name after every known status ID
+    (status_label(table, id) resolves it; None leaves the names empty).
+    """
+    record = {}
+    for column, value in row.items():
+        if isinstance(value, list):
+            record[column] = [api_record(item, status_label) for item in value]
+            continue
+        key = to_camel_case(column)
+        record[key] = to_json_value(value)
+        if key in STATUS_NAME_FIELDS:
+            name_key, table = STATUS_NAME_FIELDS[key]
+            record[name_key] = status_label(table, value) if status_label and value is not None else None
+    return record
+
+
+def server_pm_api_payload(db_data: Dict[str, Any],
+                          status_label: Optional[Callable[[str, Any], Optional[str]]] = None) -> Dict[str, Any]:
+    """Shape DatabaseManager.get_server_pm_api_data_by_id output like the Server PM API response"""
+    pm_report_form_server = {
+        key: to_json_value(db_data.get(column)) for column, key in _PM_REPORT_FORM_SERVER_COLUMNS.items()
+    }
+    pm_report_form_server['signOffData'] = {key: pm_report_form_server[key] for key in _SIGN_OFF_FIELDS}
+    payload = {
+        'reportForm': {
+            key: to_json_value(db_data.get(column)) for column, key in _REPORT_FORM_COLUMNS.items()
+        },
+        'pmReportFormServer': pm_report_form_server,
+    }
+    for collection, rows in (db_data.get('sections') or {}).items():
+        payload[collection] = [api_record(row, status_label) for row in rows]
+    return payload
+
+
+def _normalize(value: Any) -> Any:
+    value = to_json_value(value)
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        text = value.strip()
+        try:
+            # Date strings differ in precision and offset notation between the two sources
+            return datetime.fromisoformat(text).replace(tzinfo=None)
+        except ValueError:
+            pass
+        # GUIDs are upper-case from the driver and lower-case in the API's JSON
+        return text.lower()
+    return value
+
+
+def parity_differences(api_data: Any, db_data: Any, path: str = '', limit: int = 50,
+                       include_extra: bool = True) -> List[str]:
+    """
+    Differences between an API payload and its database counterpart,
+    as 'path: description' strings (at most limit of them). With
+    include_extra=False, fields only the database payload has are not
+    reported: the generators only read what the API returns.
+    """
+    differences: List[str] = []
+    _compare(api_data, db_data, path or '$', differences, limit, include_extra)
+    return differences
+
+
+def _compare(api_value: Any, db_value: Any, path: str, differences: List[str], limit: int, include_extra: bool):
+    if len(differences) >= limit:
+        return
+    if isinstance(api_value, dict) and isinstance(db_value, dict):
+        for key, value in api_value.items():
+            if key not in db_value:
+                differences.append(f"{path}.{key}: missing from database payload")
+            else:
+                _compare(value, db_value[key], f"{path}.{key}", differences, limit, include_extra)
+            if len(differences) >= limit:
+                return
+        for key in sorted(db_value.keys() - api_value.keys()) if include_extra else ():
+            differences.append(f"{path}.{key}: not in API payload")
+            if len(differences) >= limit:
+                return
+    elif isinstance(api_value, list) and isinstance(db_value, list):
+        if len(api_value) != len(db_value):
+            differences.append(f"{path}: {len(api_value)} items from API, {len(db_value)} from database")
+        for index, (api_item, db_item) in enumerate(zip(api_value, db_value)):
+            _compare(api_item, db_item, f"{path}[{index}]", differences, limit, include_extra)
+            if len(differences) >= limit:
+                return
+    elif _normalize(api_value) != _normalize(db_value):
+        differences.append(f"{path}: API {api_value!r} != database {db_value!r}")
+
+
+def resolve_data_source(setting: Optional[str], supports_db: bool) -> str:
+    """Validated data source for a report type; types without a database loader use the API"""
+    source = (setting or DATA_SOURCE_API).strip().lower()
+    if source not in DATA_SOURCES:
+        raise ValueError(f"Unknown report data source '{setting}' (expected one of {', '.join(DATA_SOURCES)})")
+    if source != DATA_SOURCE_API and not supports_db:
+        return DATA_SOURCE_API
+    return source
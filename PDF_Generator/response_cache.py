@@ -0,0 +1,130 @@
+"""
+Conditional-fetch cache for report payloads from the API.
+
+Entries are keyed by API path (endpoint + report id) and hold the raw JSON
+body, so every hit is parsed into a fresh dict that the caller may mutate.
+If the API sent an ETag or Last-Modified, the entry is revalidated with
+If-None-Match / If-Modified-Since and a 304 serves it from cache. Without
+validators an entry is only reused for a short TTL, and only for requests
+that arrived before it was fetched, so a render never sees data older than
+its own request.
+"""
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CachedResponse:
+    """A cached API response body with its validators"""
+
+    __slots__ = ('body', 'etag', 'last_modified', 'stored_at')
+
+    def __init__(self, body: str, etag: Optional[str], last_modified: Optional[str]):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = time.monotonic()
+
+    @property
+    def has_validators(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+    @property
+    def size(self) -> int:
+        return len(self.body)
+
+    def data(self) -> Any:
+        return json.loads(self.body)
+
+
+class ResponseCache:
+    """Size-bounded LRU of API responses with hit/miss counters"""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float):
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max(1, max_bytes)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self._counters = {
+            'hits': 0,
+            'revalidated': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0,
+        }
+
+    def lookup(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def fresh_hit(self, key: str, not_before: Optional[float] = None) -> Optional[Any]:
+        """
+        Serve an entry without contacting the API, if that is safe.
+
+        Only entries without validators qualify: they are reused within the
+        TTL, and only if fetched at or after not_before (when the request
+        being served was received).
+        """
+        entry = self.lookup(key)
+        if entry is None or entry.has_validators:
+            return None
+        age = time.monotonic() - entry.stored_at
+        if age > self.ttl_seconds or (not_before is not None and entry.stored_at < not_before):
+            return None
+        self._counters['hits'] += 1
+        return entry.data()
+
+    def conditional_headers(self, key: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for revalidating an entry"""
+        entry = self.lookup(key)
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def revalidated(self, key: str) -> Optional[Any]:
+        """Handle a 304: refresh the entry's age and return its data"""
+        entry = self.lookup(key)
+        if entry is None:
+            return None
+        entry.stored_at = time.monotonic()
+        self._counters['revalidated'] += 1
+        return entry.data()
+
+    def store(self, key: str, body: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Cache a 200 response and evict least recently used entries over the limits"""
+        self._counters['misses'] += 1
+        self.discard(key)
+        if len(body) > self.max_bytes:
+            return
+        self._entries[key] = CachedResponse(body, etag, last_modified)
+        self._bytes += len(body)
+        self._counters['stores'] += 1
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self._counters['evictions'] += 1
+
+    def discard(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._counters)
+        stats['entries'] = len(self._entries)
+        stats['bytes'] = self._bytes
+        served = stats['hits'] + stats['revalidated']
+        total = served + stats['misses']
+        stats['hit_ratio'] = round(served / total, 3) if total else 0.0
+        return stats
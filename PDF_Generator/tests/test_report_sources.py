@@ -0,0 +1,76 @@
+"""
+Offline parity check of the Server PM database source.
+
+server_pm_api_response.json is a Server PM API response and
+server_pm_db_rows.json the rows DatabaseManager.get_server_pm_api_data_by_id
+returns for the same report, with the status tables the reference-data
+cache would hold. Run from PDF_Generator: python -m pytest tests
+"""
+import copy
+import json
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from report_sources import parity_differences, server_pm_api_payload  # noqa: E402
+
+FIXTURES = Path(__file__).resolve().parent / 'fixtures'
+
+
+def _load(name):
+    with open(FIXTURES / name, encoding='utf-8') as f:
+        return json.load(f)
+
+
+class ServerPMPayloadParityTest(unittest.TestCase):
+
+    def setUp(self):
+        self.api_response = _load('server_pm_api_response.json')
+        db_rows = _load('server_pm_db_rows.json')
+        self.report = db_rows['report']
+        reference_data = db_rows['referenceData']
+        self.status_label = lambda table, status_id: reference_data.get(table, {}).get(str(status_id).strip().lower())
+
+    def test_database_payload_matches_recorded_api_response(self):
+        payload = server_pm_api_payload(self.report, self.status_label)
+        self.assertEqual(parity_differences(self.api_response, payload, include_extra=False), [])
+
+    def test_sections_are_nested_like_the_api(self):
+        payload = server_pm_api_payload(self.report, self.status_label)
+        health = payload['pmServerHealths'][0]
+        self.assertEqual([d['resultStatusName'] for d in health['details']], ['Pass', 'Fail'])
+        usage = payload['pmServerCPUAndMemoryUsages'][0]
+        self.assertEqual(usage['memoryUsageDetails'][0]['memoryUsagePercentage'], '41')
+        self.assertEqual(usage['cpuUsageDetails'][0]['cpuUsagePercentage'], '12')
+        self.assertEqual(payload['pmServerNetworkHealths'][0]['yesNoStatusName'], 'Yes')
+        self.assertEqual(payload['pmReportFormServer']['signOffData']['attendedBy'], 'A. Tan')
+
+    def test_unresolved_status_names_are_reported(self):
+        payload = server_pm_api_payload(self.report)
+        differences = parity_differences(self.api_response, payload, include_extra=False)
+        self.assertIn("$.pmServerHealths[0].details[0].resultStatusName: API 'Pass' != database None", differences)
+
+    def test_missing_detail_rows_are_reported(self):
+        report = copy.deepcopy(self.report)
+        report['sections']['pmServerTimeSyncs'][0]['details'].pop()
+        payload = server_pm_api_payload(report, self.status_label)
+        self.assertEqual(
+            parity_differences(self.api_response, payload, include_extra=False),
+            ['$.pmServerTimeSyncs[0].details: 2 items from API, 1 from database'],
+        )
+
+    def test_database_only_fields_are_optional(self):
+        report = copy.deepcopy(self.report)
+        report['sections']['pmServerHealths'][0]['CreatedBy'] = 'admin'
+        payload = server_pm_api_payload(report, self.status_label)
+        self.assertEqual(parity_differences(self.api_response, payload, include_extra=False), [])
+        self.assertEqual(
+            parity_differences(self.api_response, payload),
+            ['$.pmServerHealths[0].createdBy: not in API payload'],
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()